@@ -0,0 +1,128 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+import pandas as pd
+
+# Gemeinsamer Logger-Baum aller Module: "forex", "forex.signal", "forex.data", "forex.backtest", ...
+ROOT_LOGGER_NAME = 'forex'
+DEFAULT_FORMAT = '[%(levelname)s] %(message)s'
+# Standard-Level über Umgebungsvariable einstellbar, z.B. FOREX_LOG_LEVEL=INFO für Batch-Läufe.
+# DEBUG entspricht dem bisherigen Verhalten (alle debug_print-Ausgaben sichtbar).
+DEFAULT_LEVEL = os.environ.get('FOREX_LOG_LEVEL', 'DEBUG').upper()
+
+# Aktive capture_output-Handler: (Logger-Name, Thread-ID) -> Handler. Allgemeine Handler überspringen diese Einträge.
+_captures = {}
+_captures_lock = threading.Lock()
+
+
+class CallbackHandler(logging.Handler):
+    """Leitet formatierte Log-Einträge an eine Funktion weiter (z.B. print oder ForexApp.log_message)."""
+
+    def __init__(self, callback, fmt=DEFAULT_FORMAT, level=logging.NOTSET):
+        super().__init__(level)
+        self.callback = callback
+        self.setFormatter(logging.Formatter(fmt))
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class LazyPayload:
+    """
+    Hängt Daten an eine Log-Nachricht an, formatiert sie aber erst, wenn der Eintrag tatsächlich
+    ausgegeben wird: DataFrames als head().to_string(), alles andere über str().
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        if isinstance(self.data, pd.DataFrame):
+            return self.data.head().to_string()
+        return str(self.data)
+
+
+class _NotCapturedFilter(logging.Filter):
+    """Für allgemeine Handler: lässt Einträge aus Threads weg, deren Ausgabe gerade capture_output umleitet."""
+
+    def __init__(self, logger_name):
+        super().__init__()
+        self.logger_name = logger_name
+
+    def filter(self, record):
+        return (self.logger_name, record.thread) not in _captures
+
+
+def get_logger(name=None):
+    """Logger unterhalb von "forex", z.B. get_logger('signal') -> "forex.signal"."""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}" if name else ROOT_LOGGER_NAME)
+
+
+def set_output_callback(callback, logger_name=None, fmt=DEFAULT_FORMAT):
+    """
+    Ersetzt den CallbackHandler eines Loggers (Standard: "forex") durch einen für callback.
+    callback=None entfernt ihn. Gibt den neuen Handler zurück.
+    """
+    logger = get_logger(logger_name)
+    for handler in list(logger.handlers):
+        if isinstance(handler, CallbackHandler):
+            logger.removeHandler(handler)
+    if callback is None:
+        return None
+    handler = CallbackHandler(callback, fmt=fmt)
+    handler.addFilter(_NotCapturedFilter(logger.name))
+    logger.addHandler(handler)
+    return handler
+
+
+@contextmanager
+def capture_output(callback, logger_name=None, fmt=DEFAULT_FORMAT):
+    """
+    Leitet für die Dauer des with-Blocks alle Einträge des aktuellen Threads an logger_name (Standard "forex",
+    also inkl. "forex.signal", "forex.data", "forex.portfolio") an callback statt an dessen allgemeine Handler.
+    Einträge anderer Threads bleiben unberührt, sodass mehrere Backtester nebeneinander laufen können.
+    Verschachtelt gilt der innerste Block; danach wird der vorherige Zustand wiederhergestellt.
+    """
+    logger = get_logger(logger_name)
+    key = (logger.name, threading.get_ident())
+    handler = CallbackHandler(callback, fmt=fmt)
+    handler.addFilter(lambda record: record.thread == key[1] and _captures.get(key) is handler)
+    with _captures_lock:
+        previous = _captures.get(key)
+        _captures[key] = handler
+    logger.addHandler(handler)
+    try:
+        yield handler
+    finally:
+        logger.removeHandler(handler)
+        with _captures_lock:
+            if previous is None:
+                _captures.pop(key, None)
+            else:
+                _captures[key] = previous
+
+
+def set_log_level(level, logger_name=None):
+    """Setzt das Level, z.B. set_log_level('INFO') für Produktionsläufe ohne Debug-Formatierung."""
+    get_logger(logger_name).setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def log_with_data(logger, level, message, data=None):
+    """Loggt message und optional data (lazy formatiert, mit Trennlinie wie bisher bei debug_print)."""
+    if not logger.isEnabledFor(level):
+        return
+    if data is None:
+        logger.log(level, '%s', message)
+    else:
+        logger.log(level, '%s\n%s\n--------------------', message, LazyPayload(data))
+
+
+_root_logger = get_logger()
+_root_logger.setLevel(DEFAULT_LEVEL)
+_root_logger.propagate = False # Nicht zusätzlich über das Python-Root-Logging ausgeben
+set_output_callback(print)
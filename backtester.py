@@ -1,22 +1,29 @@
+import logging
 import pandas as pd
 from datetime import datetime, timedelta
 from data_manager import DataManager
-from signal_analyzer import SignalAnalyzer, compare_gdp_momentum # Importiere compare_gdp_momentum
-from portfolio_manager import Portfolio
+from signal_analyzer import SignalAnalyzer, Signal, compare_gdp_momentum, richte_signal_aus
+from portfolio_manager import Portfolio, SHARED_PRICE_CACHE, price_source_key
+from app_logging import get_logger, capture_output
+from result_cache import RESULT_CACHE
 
 class Backtester:
-    def __init__(self, gui_log_callback=print):
-        self.data_manager = DataManager()
+    def __init__(self, gui_log_callback=print, data_provider=None):
+        # data_provider: z.B. ReplayDataProvider für wiederholbare Offline-Läufe (Standard: live)
+        self.data_manager = DataManager(data_provider=data_provider)
         self.signal_analyzer = None # Wird mit spezifischen Configs initialisiert
         self.gui_log_callback = gui_log_callback # Für Nachrichten an die GUI
-
-    def log(self, message):
-        # Um sicherzustellen, dass der Callback aufgerufen werden kann, auch wenn er von Tkinter kommt
-        # und der Backtester in einem Thread läuft, prüfen wir, ob der Callback direkt aufrufbar ist
-        # oder ob wir ihn über root.after planen müssen (was hier nicht direkt möglich ist ohne root).
+        # Während run_backtest leitet capture_output alle Einträge dieses Threads ("forex.backtest" sowie
+        # SignalAnalyzer, DataManager und Portfolio) an gui_log_callback dieser Instanz; andere Instanzen
+        # und Threads behalten ihre Ausgabe. Das Level kommt vom "forex"-Logger (app_logging.set_log_level),
+        # bei INFO entfallen die täglichen Debug-Zeilen samt Formatierung.
         # Für den Moment gehen wir davon aus, dass gui_log_callback Thread-sicher ist oder
         # von der GUI entsprechend gehandhabt wird.
-        self.gui_log_callback(f"[Backtester] {message}")
+        self.logger = get_logger('backtest')
+        self.logger.propagate = False # Eigenes Format, nicht zusätzlich über den "forex"-Handler
+
+    def log(self, message):
+        self.logger.info(message)
 
     def run_backtest(self,
                      forex_pair_config, # Dict mit Infos zum Währungspaar
@@ -28,7 +35,14 @@ class Backtester:
                      initial_cash=10000,
                      benchmark_ticker="^SPX",
                      trade_amount_percent=0.10):
-
+        with capture_output(self.gui_log_callback, 'backtest', fmt='[Backtester] %(message)s'), \
+                capture_output(self.gui_log_callback):
+            return self._run_backtest(forex_pair_config, start_date_str, end_date_str, analyzer_config_dict,
+                                      gdp_long_threshold, gdp_short_threshold, initial_cash, benchmark_ticker,
+                                      trade_amount_percent)
+
+    def _run_backtest(self, forex_pair_config, start_date_str, end_date_str, analyzer_config_dict,
+                      gdp_long_threshold, gdp_short_threshold, initial_cash, benchmark_ticker, trade_amount_percent):
         self.log("Backtest gestartet.")
         self.log(f"Forex Paar: {forex_pair_config['display']}, Zeitraum: {start_date_str} bis {end_date_str}")
         self.log(f"Startkapital: {initial_cash}, Positionsgröße: {trade_amount_percent*100:.2f}% des Kapitals")
@@ -45,13 +59,10 @@ class Backtester:
             return None, None
 
         # 0. SignalAnalyzer initialisieren
-        self.signal_analyzer = SignalAnalyzer(config=analyzer_config_dict)
-        # Den Debug-Callback des SignalAnalyzers auf den des Backtesters setzen
-        # Damit die internen Logs des SignalAnalyzers auch über die GUI geloggt werden.
-        # Wichtig: signal_analyzer.set_debug_output_callback ist eine globale Funktion im signal_analyzer Modul
-        from signal_analyzer import set_debug_output_callback as analyzer_set_debug_callback
-        analyzer_set_debug_callback(self.log)
-        self.log("SignalAnalyzer initialisiert und Debug-Callback gesetzt.")
+        # Logs von SignalAnalyzer, DataManager und Portfolio gehen während des Laufs ebenfalls an gui_log_callback
+        self.signal_analyzer = SignalAnalyzer(config=analyzer_config_dict, seasonality_cache=self.data_manager.seasonality_cache,
+                                              result_cache=RESULT_CACHE) # Teilt Ergebnisse mit der GUI-Analyse
+        self.log("SignalAnalyzer initialisiert.")
 
         # 1. Portfolios initialisieren
         # Wichtig: backtest_start_date und backtest_end_date müssen datetime Objekte sein
@@ -63,12 +74,16 @@ class Backtester:
         # Ticker für yfinance
         # forex_pair_config['pair_code'] SOLLTE bereits der vollständige yfinance-Ticker sein (z.B. "EURUSD=X")
         trading_ticker_yf = forex_pair_config['pair_code']
-        self.log(f"DEBUG: Direkt nach Zuweisung - forex_pair_config['pair_code']: '{forex_pair_config['pair_code']}', trading_ticker_yf: '{trading_ticker_yf}'")
+        self.logger.debug("Direkt nach Zuweisung - forex_pair_config['pair_code']: '%s', trading_ticker_yf: '%s'", forex_pair_config['pair_code'], trading_ticker_yf)
 
         ticker_for_dm_call = trading_ticker_yf # Neue Variable für den direkten Aufruf
         self.log(f"Lade Forex-Daten für Signalerzeugung mit ticker_for_dm_call: ({ticker_for_dm_call})...")
         # Daten für Signalerzeugung
-        forex_data_for_signals = self.data_manager.get_historical_price_data(ticker_for_dm_call, start_date_str, end_date_str)
+        # Über den gemeinsamen Kurs-Cache, sodass das Strategie-Portfolio dieselben Kurse ohne erneuten Abruf nutzt
+        forex_data_for_signals = SHARED_PRICE_CACHE.frame(
+            ticker_for_dm_call, start_date_str, end_date_str,
+            lambda: self.data_manager.get_historical_price_data(ticker_for_dm_call, start_date_str, end_date_str),
+            source=price_source_key(self.data_manager))
         if forex_data_for_signals.empty:
             self.log(f"Keine Forex-Daten für {trading_ticker_yf} im Zeitraum gefunden. Backtest abgebrochen.")
             return None, None
@@ -81,11 +96,8 @@ class Backtester:
         bip_col_country1 = bip_data_tuple[1]
         bip_col_country2 = bip_data_tuple[2]
 
-        gdp_momentum_signal_aligned_to_forex = pd.Series(dtype=object) # Initialize as object for 'long'/'short'
-        if forex_data_for_signals.index.empty:
-             gdp_momentum_signal_aligned_to_forex = pd.Series(dtype=object, name="GDP_Momentum_Signal_Aligned") # Empty series if no index
-        else:
-             gdp_momentum_signal_aligned_to_forex = pd.Series(index=forex_data_for_signals.index, data=None, name="GDP_Momentum_Signal_Aligned", dtype=object)
+        # Neutrales int8-Signal (Signal.NEUTRAL), solange kein GDP-Momentum berechnet werden kann
+        gdp_momentum_signal_aligned_to_forex = richte_signal_aus(None, forex_data_for_signals.index, name="GDP_Momentum_Signal_Aligned")
 
 
         if bip_data_df.empty or not bip_col_country1 or not bip_col_country2:
@@ -98,31 +110,33 @@ class Backtester:
             gdp_mom_a, gdp_mom_b, gdp_mom_diff, gdp_signal_raw = compare_gdp_momentum(
                 gdp_series_a=gdp_series_a, gdp_series_b=gdp_series_b,
                 n_periods_growth=n_periods_gdp_growth,
-                long_threshold=gdp_long_threshold, short_threshold=gdp_short_threshold
+                long_threshold=gdp_long_threshold, short_threshold=gdp_short_threshold,
+                result_cache=RESULT_CACHE
             )
             if gdp_signal_raw is not None and not gdp_signal_raw.empty:
-                # Reindex auf den Forex-Datenindex. Fülle vorwärts, dann rückwärts.
-                temp_aligned = gdp_signal_raw.reindex(forex_data_for_signals.index, method='ffill')
-                temp_aligned = temp_aligned.bfill() # füllt NaNs am Anfang
-                gdp_momentum_signal_aligned_to_forex = temp_aligned
-                gdp_momentum_signal_aligned_to_forex.name = "GDP_Momentum_Signal_Aligned"
+                # As-of-Join auf den Forex-Datenindex: ein Quartalssignal gilt erst ab seiner Veröffentlichung
+                publication_lag = self.data_manager.get_gdp_publication_lag(country1, country2)
+                gdp_momentum_signal_aligned_to_forex = richte_signal_aus(
+                    gdp_signal_raw, forex_data_for_signals.index, name="GDP_Momentum_Signal_Aligned",
+                    publikationsverzug=publication_lag)
                 self.log("GDP Momentum Signale berechnet und an Forex-Daten angeglichen.")
             else:
-                self.log("Keine GDP Momentum Rohsignale erhalten. Verwende neutrales Signal (None).")
+                self.log("Keine GDP Momentum Rohsignale erhalten. Verwende neutrales Signal (0).")
 
         self.log("Berechne Saisonalität...")
-        saisonalitaet_series = self.signal_analyzer.berechne_saisonalitaet(forex_data_for_signals)
+        saisonalitaet_series = self.signal_analyzer.berechne_saisonalitaet(forex_data_for_signals, ticker=trading_ticker_yf)
         self.log("Saisonalität berechnet.")
 
         self.log("Generiere Handelssignale...")
         final_signals = self.signal_analyzer.generiere_signale(
             forex_daten_idx=forex_data_for_signals.index,
             saisonalitaet_raw=saisonalitaet_series,
-            gdp_momentum_signal_aligned=gdp_momentum_signal_aligned_to_forex # Kann 'long', 'short', None enthalten
+            gdp_momentum_signal_aligned=gdp_momentum_signal_aligned_to_forex # int8: 1, -1, 0
         )
         self.log(f"Handelssignale generiert. {len(final_signals[final_signals != 0])} aktive Signale gefunden.")
         if not final_signals.empty:
-            self.log(f"Verteilung der generierten final_signals im Backtester:\n{final_signals.value_counts(dropna=False).to_string()}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Verteilung der generierten final_signals im Backtester:\n%s", final_signals.value_counts(dropna=False).to_string())
         else:
             self.log("Generierte final_signals Serie ist leer im Backtester.")
 
@@ -154,6 +168,9 @@ class Backtester:
              forex_data_for_signals.index = pd.to_datetime(forex_data_for_signals.index)
 
         loop_days_pd = forex_data_for_signals.index[(forex_data_for_signals.index >= start_date) & (forex_data_for_signals.index <= end_date)]
+        # Verlaufspuffer einmal auf alle Handelstage (plus finalen Eintrag am Enddatum) dimensionieren
+        strategy_portfolio.history.reserve(len(loop_days_pd) + 1)
+        benchmark_portfolio.history.reserve(len(loop_days_pd) + 1)
 
         for current_pd_ts_date in loop_days_pd:
             dt_current_date = current_pd_ts_date.to_pydatetime()
@@ -162,8 +179,10 @@ class Backtester:
             if benchmark_ticker:
                 benchmark_portfolio.record_portfolio_value(dt_current_date)
 
-            signal_today = final_signals.get(current_pd_ts_date, 0)
-            self.log(f"Datum: {dt_current_date.strftime('%Y-%m-%d')}, Rohsignal: {signal_today}, Vorh. Positionen: {list(strategy_portfolio.positions.keys())}, Cash: {strategy_portfolio.cash:.2f}")
+            signal_today = final_signals.get(current_pd_ts_date, Signal.NEUTRAL)
+            if self.logger.isEnabledFor(logging.DEBUG): # Eine Zeile pro Handelstag, nur bei DEBUG formatieren
+                self.logger.debug("Datum: %s, Rohsignal: %s, Vorh. Positionen: %s, Cash: %.2f", dt_current_date.strftime('%Y-%m-%d'),
+                                  signal_today, list(strategy_portfolio.positions.keys()), strategy_portfolio.cash)
 
 
             # Freitags-Logik: Alle offenen Positionen (Long oder Short) schließen
@@ -172,10 +191,10 @@ class Backtester:
                 for ticker_in_positions in list(strategy_portfolio.positions.keys()):
                     pos_details = strategy_portfolio.positions.get(ticker_in_positions)
                     if pos_details: # Zusätzliche Sicherheitsprüfung
-                        if pos_details['type'] == 'long':
+                        if pos_details.type == 'long':
                             self.log(f"{dt_current_date.strftime('%Y-%m-%d')} (Freitag): Schließe Long-Position in {ticker_in_positions} aufgrund Wochenschluss.")
                             strategy_portfolio.close_long_position(ticker_in_positions, dt_current_date)
-                        elif pos_details['type'] == 'short':
+                        elif pos_details.type == 'short':
                             self.log(f"{dt_current_date.strftime('%Y-%m-%d')} (Freitag): Decke Short-Position in {ticker_in_positions} aufgrund Wochenschluss.")
                             strategy_portfolio.cover_short_position(ticker_in_positions, dt_current_date)
 
@@ -186,9 +205,9 @@ class Backtester:
                  self.log(f"{dt_current_date.strftime('%Y-%m-%d')}: Investmentbetrag ({amount_to_invest_abs:.2f}) zu klein, kein Trade.")
 
             else:
-                if signal_today == 1: # Kaufsignal (Long)
+                if signal_today == Signal.LONG: # Kaufsignal (Long)
                     # Wenn eine Short-Position besteht, diese zuerst schließen
-                    if trading_ticker_yf in strategy_portfolio.positions and strategy_portfolio.positions[trading_ticker_yf]['type'] == 'short':
+                    if trading_ticker_yf in strategy_portfolio.positions and strategy_portfolio.positions[trading_ticker_yf].type == 'short':
                         self.log(f"{dt_current_date.strftime('%Y-%m-%d')}: Kaufsignal für {trading_ticker_yf}. Schließe bestehende Short-Position zuerst.")
                         strategy_portfolio.cover_short_position(trading_ticker_yf, dt_current_date)
 
@@ -202,9 +221,9 @@ class Backtester:
                     else:
                         self.log(f"{dt_current_date.strftime('%Y-%m-%d')}: Kaufsignal für {trading_ticker_yf}, aber bereits in Long-Position oder Short-Schließung fehlgeschlagen.")
 
-                elif signal_today == -1: # Verkaufssignal (Short)
+                elif signal_today == Signal.SHORT: # Verkaufssignal (Short)
                     # Wenn eine Long-Position besteht, diese zuerst schließen
-                    if trading_ticker_yf in strategy_portfolio.positions and strategy_portfolio.positions[trading_ticker_yf]['type'] == 'long':
+                    if trading_ticker_yf in strategy_portfolio.positions and strategy_portfolio.positions[trading_ticker_yf].type == 'long':
                         self.log(f"{dt_current_date.strftime('%Y-%m-%d')}: Verkaufssignal für {trading_ticker_yf}. Schließe bestehende Long-Position zuerst.")
                         strategy_portfolio.close_long_position(trading_ticker_yf, dt_current_date)
 
@@ -0,0 +1,365 @@
+"""
+Benchmarks für wiederkehrende Performance-Prüfungen (kein Netzwerkzugriff nötig).
+
+Aufruf:
+    python benchmarks.py                 # alle Benchmarks
+    python benchmarks.py startup         # nur ausgewählte Benchmarks
+    python benchmarks.py startup --max-import-seconds 1.0
+    python benchmarks.py saisonalitaet    # Saisonalität gegen die bisherige Schleife
+    python benchmarks.py gdp              # BIP-Momentum: Panel, Schwellen-Sweep und As-of-Join gegen Einzelaufrufe
+    python benchmarks.py cooldown         # Signal-Cooldown (bis 10^6 Zeilen) gegen die bisherige Schleife
+    python benchmarks.py result_cache     # Analyse-Pipeline ohne/mit ResultCache (Speicher und Festplatte)
+    python benchmarks.py portfolio        # Kursabfragen/s, inkrementelle Bewertung, Verlaufspuffer
+    python benchmarks.py price_cache      # Prozessweiter Kurs-Cache über viele Portfolios, LRU unter Speicherbudget
+
+Mit Grenzwerten endet das Skript mit Exit-Code 1, wenn ein Messwert darüber liegt,
+sodass Regressionen z.B. in einem Skript vor dem Commit auffallen.
+Die Äquivalenzprüfungen gegen die bisherigen Implementierungen stehen in test_equivalence.py (pytest);
+synthetische Daten und Referenz-Implementierungen kommen aus conftest.py (benötigt pytest).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from app_logging import capture_output
+from conftest import (synthetic_prices, saisonalitaet_referenz, synthetic_gdp_matrix, synthetic_signals,
+                      cooldown_referenz, analyse_pipeline, preis_referenz, StaticPriceSource, bewertungslauf,
+                      kurs_cache_laeufe)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+# Module, die ein Headless-Import von backtester NICHT laden soll
+HEAVY_MODULES = ('yfinance', 'pandas_datareader', 'matplotlib')
+
+
+def _report(name, seconds_list):
+    print(f"  {name}: min {min(seconds_list) * 1000:.1f} ms, median {statistics.median(seconds_list) * 1000:.1f} ms "
+          f"({len(seconds_list)} Läufe)")
+
+
+def bench_import_backtester(repeats=5):
+    """Misst `import backtester` jeweils in einem frischen Interpreter (kalter Modul-Cache)."""
+    code = ("import sys, time\n"
+            "t = time.perf_counter()\n"
+            "import backtester\n"
+            "elapsed = time.perf_counter() - t\n"
+            f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print(elapsed, ','.join(heavy))\n")
+    timings = []
+    heavy_loaded = set()
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip().splitlines()[-1]
+        elapsed, heavy = output.split(' ', 1) if ' ' in output else (output, '')
+        timings.append(float(elapsed))
+        heavy_loaded.update(m for m in heavy.split(',') if m)
+    _report("import backtester", timings)
+    if heavy_loaded:
+        print(f"  WARNUNG: import backtester lädt {sorted(heavy_loaded)}")
+    return min(timings)
+
+
+def bench_forex_app_construction(repeats=3):
+    """Misst den Aufbau von ForexApp (ohne mainloop). Wird ohne Display übersprungen."""
+    import tkinter as tk
+    from forex_gui_app import ForexApp
+
+    timings = []
+    for _ in range(repeats):
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            print(f"  ForexApp-Aufbau übersprungen (kein Display): {e}")
+            return None
+        try:
+            root.withdraw()
+            t = time.perf_counter()
+            ForexApp(root)
+            timings.append(time.perf_counter() - t)
+        finally:
+            root.destroy()
+    _report("ForexApp(root)", timings)
+    return min(timings)
+
+
+def run_startup(args):
+    print("Startzeit:")
+    failures = []
+    import_seconds = bench_import_backtester()
+    if args.max_import_seconds is not None and import_seconds > args.max_import_seconds:
+        failures.append(f"import backtester {import_seconds:.3f}s > {args.max_import_seconds}s")
+    app_seconds = bench_forex_app_construction()
+    if args.max_app_seconds is not None and app_seconds is not None and app_seconds > args.max_app_seconds:
+        failures.append(f"ForexApp(root) {app_seconds:.3f}s > {args.max_app_seconds}s")
+    return failures
+
+
+def _timeit(func, repeats=5):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        t = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - t)
+    return result, timings
+
+
+def run_saisonalitaet(args):
+    from app_logging import set_log_level
+    from signal_analyzer import SignalAnalyzer
+    set_log_level('INFO') # Debug-Formatierung nicht mitmessen
+    analyzer = SignalAnalyzer()
+    failures = []
+
+    print("Saisonalität (ISO-Woche):")
+    einzel = synthetic_prices(n_days=5000).rename(columns={'P0=X': 'Schlusskurs'})
+    _, t_ref = _timeit(lambda: saisonalitaet_referenz(einzel))
+    _, t_kernel = _timeit(lambda: analyzer.berechne_saisonalitaet(einzel))
+    _report("Referenz (Schleife), 1 Paar", t_ref)
+    _report("berechne_saisonalitaet, 1 Paar", t_kernel)
+
+    universum = synthetic_prices(n_days=5000, n_pairs=28, seed=1, holiday_share=0.02)
+    _, t_matrix = _timeit(lambda: analyzer.berechne_saisonalitaet_universum(universum))
+    def pro_paar():
+        return {ticker: saisonalitaet_referenz(universum[[ticker]].dropna().rename(columns={ticker: 'Schlusskurs'}))
+                for ticker in universum.columns}
+    _, t_spalten = _timeit(pro_paar, repeats=1)
+    _report("Referenz pro Paar, 28 Paare", t_spalten)
+    _report("berechne_saisonalitaet_universum, 28 Paare", t_matrix)
+
+    print("Saisonalität (expandierend, ohne Look-ahead):")
+    from signal_analyzer import SeasonalityState
+    expandierend = SignalAnalyzer(config={'SAISONALITAET_MODUS': 'expandierend'})
+    _, t_batch = _timeit(lambda: expandierend.berechne_saisonalitaet(einzel))
+    _report("berechne_saisonalitaet (Batch), 1 Paar", t_batch)
+    zustand = SeasonalityState()
+    t = time.perf_counter()
+    for datum, kurs in einzel['Schlusskurs'].items():
+        zustand.update(datum, kurs)
+    pro_bar = (time.perf_counter() - t) / len(einzel)
+    print(f"  SeasonalityState.update: {pro_bar * 1e6:.1f} µs pro Kurs")
+    return failures
+
+
+def run_gdp(args):
+    from app_logging import set_log_level
+    from signal_analyzer import compare_gdp_momentum, compare_gdp_momentum_panel
+    set_log_level('INFO')
+    failures = []
+
+    print("BIP-Momentum (20 Länder, alle 380 Paare):")
+    gdp_matrix = synthetic_gdp_matrix()
+    laender = list(gdp_matrix.columns)
+    paare = [(a, b) for a in laender for b in laender if a != b]
+    panel, t_panel = _timeit(lambda: compare_gdp_momentum_panel(gdp_matrix))
+    _, t_paare = _timeit(lambda: {(a, b): compare_gdp_momentum(gdp_matrix[a], gdp_matrix[b]) for a, b in paare}, repeats=1)
+    _report("compare_gdp_momentum pro Paar", t_paare)
+    _report("compare_gdp_momentum_panel", t_panel)
+
+    print("BIP-Schwellen-Sweep (100 Kombinationen, 1 Paar):")
+    from signal_analyzer import berechne_gdp_momentum_differenz
+    gdp_a, gdp_b = gdp_matrix[laender[0]], gdp_matrix[laender[1]]
+    schwellen = [(long_t, short_t) for long_t in np.linspace(0, 90, 10) for short_t in np.linspace(-90, 0, 10)]
+    einzeln, t_einzeln = _timeit(lambda: [compare_gdp_momentum(gdp_a, gdp_b, long_threshold=l, short_threshold=k)[3]
+                                          for l, k in schwellen], repeats=1)
+    _, t_sweep = _timeit(lambda: berechne_gdp_momentum_differenz(gdp_a, gdp_b).sweep(schwellen))
+    _report("compare_gdp_momentum pro Kombination", t_einzeln)
+    _report("berechne_gdp_momentum_differenz + sweep", t_sweep)
+
+    print("As-of-Join GDP-Signal auf Werktage (Veröffentlichungsverzug 120 Tage):")
+    from signal_analyzer import richte_signal_aus, richte_signale_aus
+    signal = einzeln[len(einzeln) // 2]
+    tage = pd.bdate_range(signal.index[0] - pd.Timedelta(days=200), signal.index[-1] + pd.Timedelta(days=200))
+    verzug = pd.Timedelta(days=120)
+    alt_objekt = signal.map({1: 'long', -1: 'short', 0: None}).astype(object)
+    _, t_alt = _timeit(lambda: alt_objekt.reindex(tage, method='ffill').bfill())
+    _, t_neu = _timeit(lambda: richte_signal_aus(signal, tage, publikationsverzug=verzug))
+    _report("bisher: reindex(ffill) + bfill auf object-Serie", t_alt)
+    _report("richte_signal_aus (int8, As-of-Join)", t_neu)
+
+    # Viele Paare auf einmal, jedes mit eigenem Verzug
+    paar_signale = pd.DataFrame({f"{a}/{b}": signale for (a, b), signale in panel.signale_fuer_paare(paare).items()})
+    verzuege = {spalte: pd.Timedelta(days=90 + 10 * (i % 6)) for i, spalte in enumerate(paar_signale.columns)}
+    _, t_einzeln = _timeit(lambda: [richte_signal_aus(paar_signale[spalte], tage, publikationsverzug=verzuege[spalte])
+                                    for spalte in paar_signale.columns], repeats=1)
+    _, t_alle = _timeit(lambda: richte_signale_aus(paar_signale, tage, publikationsverzug=verzuege))
+    _report(f"richte_signal_aus pro Paar ({len(paar_signale.columns)} Paare)", t_einzeln)
+    _report("richte_signale_aus, alle Paare", t_alle)
+    return failures
+
+
+def run_cooldown(args):
+    from app_logging import set_log_level
+    from signal_analyzer import SignalAnalyzer
+    set_log_level('INFO')
+    failures = []
+    analyzer = SignalAnalyzer()
+
+    print("Signal-Cooldown (20.000 Zeilen):")
+    signale = synthetic_signals(20_000, seed=1)['Paar0']
+    _, t_alt = _timeit(lambda: cooldown_referenz(signale, 5), repeats=1)
+    _, t_neu = _timeit(lambda: analyzer.apply_signal_cooldown(signale, 5))
+    _report("Schleife mit .loc", t_alt)
+    _report("apply_signal_cooldown", t_neu)
+
+    print("Signal-Cooldown (10^6 Stundenwerte, 1 Paar bzw. Panel mit 8 Paaren):")
+    panel = synthetic_signals(1_000_000, n_pairs=8, seed=2, freq='h')
+    _, t_alt = _timeit(lambda: cooldown_referenz(panel['Paar0'], 5), repeats=1)
+    _, t_neu = _timeit(lambda: analyzer.apply_signal_cooldown(panel['Paar0'], 5))
+    _, t_panel = _timeit(lambda: analyzer.apply_signal_cooldown(panel, 5))
+    _report("Schleife mit .loc, 1 Paar", t_alt)
+    _report("apply_signal_cooldown, 1 Paar", t_neu)
+    _report("apply_signal_cooldown, Panel (8 Paare)", t_panel)
+    return failures
+
+
+def run_result_cache(args):
+    import tempfile
+    from app_logging import set_log_level
+    from result_cache import ResultCache
+    set_log_level('INFO')
+    failures = []
+
+    print("Analyse-Pipeline (20 Jahre Tageskurse, 1 Paar):")
+    forex_daten = synthetic_prices(n_days=5200).rename(columns={'P0=X': 'Schlusskurs'})
+    gdp_matrix = synthetic_gdp_matrix(n_countries=2)
+    gdp_a, gdp_b = gdp_matrix['Land0'], gdp_matrix['Land1']
+    _, t_ohne = _timeit(lambda: analyse_pipeline(None, forex_daten, gdp_a, gdp_b))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(base_path=cache_dir)
+        _, t_kalt = _timeit(lambda: analyse_pipeline(cache, forex_daten, gdp_a, gdp_b), repeats=1)
+        _, t_warm = _timeit(lambda: analyse_pipeline(cache, forex_daten, gdp_a, gdp_b))
+        neu_gestartet = ResultCache(base_path=cache_dir) # leerer Speicher, gleiche Festplattenstufe
+        _, t_platte = _timeit(lambda: analyse_pipeline(neu_gestartet, forex_daten, gdp_a, gdp_b), repeats=1)
+    _report("ohne Cache", t_ohne)
+    _report("ResultCache, erster Lauf", t_kalt)
+    _report("ResultCache, Wiederholung (Speicher)", t_warm)
+    _report("ResultCache, neuer Prozess (Festplatte)", t_platte)
+    return failures
+
+
+def run_portfolio(args):
+    from portfolio_manager import Portfolio, PortfolioHistory
+    failures = []
+    kurse = synthetic_prices(n_days=5000, n_pairs=1, seed=7)
+    frame = kurse[['P0=X']].rename(columns={'P0=X': 'Schlusskurs'})
+    # Kalendertage inkl. Wochenenden und Tage vor dem ersten Kurs
+    rng = np.random.default_rng(7)
+    tage = pd.date_range(frame.index[0] - pd.Timedelta(days=5), frame.index[-1], freq='D')
+    abfragen = list(tage[rng.integers(0, len(tage), 20_000)])
+    print("Portfolio-Kursabfragen (5000 Geschäftstage, 20.000 Abfragen):")
+
+    # Ohne SHARED_PRICE_CACHE: die synthetischen Ticker sollen keine prozessweiten Einträge hinterlassen
+    portfolio = Portfolio(10000.0, StaticPriceSource({'P0=X': frame}), frame.index[0], frame.index[-1] + pd.Timedelta(days=1),
+                          shared_price_cache=None)
+    with capture_output(lambda meldung: None): # Hinweise für Tage vor dem ersten Kurs nicht mitmessen
+        portfolio.get_current_price('P0=X', abfragen[0]) # Cache füllen
+        _, t_neu = _timeit(lambda: [portfolio.get_current_price('P0=X', tag) for tag in abfragen], repeats=3)
+    _, t_alt = _timeit(lambda: [preis_referenz(frame, tag) for tag in abfragen[:2000]], repeats=1)
+    print(f"  Kursabfragen alt (Maske + tail): {2000 / min(t_alt):,.0f}/s")
+    print(f"  Kursabfragen neu (searchsorted): {len(abfragen) / min(t_neu):,.0f}/s")
+
+    # Bewertung wie in der Backtest-Schleife: record_portfolio_value und danach calculate_total_value
+    # für die Positionsgröße am selben Tag, 20 offene Positionen, jeden fünften Tag ein Trade
+    mehrere = synthetic_prices(n_days=2500, n_pairs=20, seed=8)
+    # Kalendertage: an Wochenenden gilt derselbe Kursindex-Eintrag wie am Freitag
+    tage = [tag.to_pydatetime() for tag in pd.date_range(mehrere.index[0], mehrere.index[-1], freq='D')]
+    print("Portfolio-Bewertung (20 Positionen, 2500 Geschäftstage als Kalendertage, Trade an jedem fünften Tag):")
+    _, t_voll = _timeit(lambda: bewertungslauf(mehrere, tage, voll_neu=True), repeats=3)
+    _, t_inkr = _timeit(lambda: bewertungslauf(mehrere, tage, voll_neu=False), repeats=3)
+    _report("Bewertung, jedes Mal alle Positionen", t_voll)
+    _report("Bewertung, inkrementell mit Datums-Memo", t_inkr)
+
+    # Verlauf über 10^5 Tage: bisher eine Liste von {'date', 'value'}-Dicts und ein DataFrame am Ende,
+    # jetzt vorab dimensionierte Spalten (inkl. Cash, Exposure, Drawdown) und ein Frame auf den Puffern
+    verlaufstage = pd.date_range('1900-01-01', periods=100_000, freq='D')
+    tage_py = list(verlaufstage.to_pydatetime())
+    tage_ns = verlaufstage.asi8.tolist()
+    werte = (10000.0 + np.cumsum(rng.normal(0, 10, len(tage_py)))).tolist()
+    print("Portfolio-Verlauf (10^5 Tage):")
+
+    def verlauf_alt():
+        historie = []
+        for tag, wert in zip(tage_py, werte):
+            historie.append({'date': tag, 'value': wert})
+        return pd.DataFrame(historie)
+
+    def verlauf_neu():
+        historie = PortfolioHistory(len(tage_ns))
+        for tag, wert in zip(tage_ns, werte):
+            historie.append(tag, wert, wert, 0.0)
+        return historie.to_frame()
+
+    for name, func in (("Verlauf alt (Liste von Dicts)", verlauf_alt), ("Verlauf neu (Arrays)", verlauf_neu)):
+        tracemalloc.start()
+        _, t_verlauf = _timeit(func, repeats=1)
+        spitze = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {name}: {t_verlauf[0] * 1000:.1f} ms, Speicherspitze {spitze / 2**20:.1f} MiB")
+    historie = PortfolioHistory(4)
+    historie.append(tage_ns[0], werte[0], werte[0], 0.0)
+    frame = historie.to_frame()
+    geteilt = all(np.shares_memory(frame[name].to_numpy(), historie.column(name)) for name in PortfolioHistory.COLUMNS)
+    print(f"  Verlaufs-Frame auf den Puffern (keine Kopie): {'ja' if geteilt else 'nein (pandas < 2.0 kopiert die float-Spalten)'}")
+    return failures
+
+
+def run_price_cache(args):
+    from portfolio_manager import SharedPriceCache
+    failures = []
+    kurse = synthetic_prices(n_days=5000, n_pairs=20, seed=9)
+    frames = {ticker: kurse[[ticker]].rename(columns={ticker: 'Schlusskurs'}) for ticker in kurse.columns}
+    print("Gemeinsamer Kurs-Cache (50 Läufe mit Strategie- und Benchmark-Portfolio, 20 Ticker):")
+    (abrufe_ohne, _), t_ohne = _timeit(lambda: kurs_cache_laeufe(StaticPriceSource(frames), None), repeats=1)
+    cache = SharedPriceCache()
+    (abrufe_mit, _), t_mit = _timeit(lambda: kurs_cache_laeufe(StaticPriceSource(frames), cache), repeats=1)
+    _report(f"100 Portfolios x 20 Ticker, je Portfolio eigener Abruf ({abrufe_ohne} Abrufe)", t_ohne)
+    _report(f"100 Portfolios x 20 Ticker, SharedPriceCache ({abrufe_mit} Abrufe)", t_mit)
+    print(f"  Statistik: {cache.stats()}")
+    return failures
+
+
+BENCHMARKS = {
+    'startup': run_startup,
+    'saisonalitaet': run_saisonalitaet,
+    'gdp': run_gdp,
+    'cooldown': run_cooldown,
+    'result_cache': run_result_cache,
+    'portfolio': run_portfolio,
+    'price_cache': run_price_cache,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance-Benchmarks des Forex-Signal-Generators.")
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"Auszuführende Benchmarks: {', '.join(BENCHMARKS)} (Standard: alle)")
+    parser.add_argument('--max-import-seconds', type=float, default=None,
+                        help="Grenzwert für `import backtester` (Minimum über alle Läufe)")
+    parser.add_argument('--max-app-seconds', type=float, default=None,
+                        help="Grenzwert für den Aufbau von ForexApp")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unbekannte Benchmarks: {', '.join(unknown)}")
+
+    failures = []
+    for name in args.names or list(BENCHMARKS):
+        failures.extend(BENCHMARKS[name](args))
+
+    if failures:
+        print("Grenzwerte überschritten:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
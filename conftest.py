@@ -0,0 +1,178 @@
+"""
+Gemeinsame pytest-Fixtures und Testdaten: synthetische Kurs-, BIP- und Signalreihen sowie die bisherigen
+Implementierungen als Referenz für die Äquivalenzprüfungen. benchmarks.py misst mit denselben Daten.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_logging import capture_output, set_log_level, DEFAULT_LEVEL
+
+
+@pytest.fixture(autouse=True, scope='module')
+def _ohne_debug_ausgabe():
+    set_log_level('INFO') # Debug-Formatierung großer Serien nicht mitlaufen lassen
+    yield
+    set_log_level(DEFAULT_LEVEL)
+
+
+@pytest.fixture(scope='module')
+def einzel():
+    return synthetic_prices(n_days=5000).rename(columns={'P0=X': 'Schlusskurs'})
+
+
+@pytest.fixture(scope='module')
+def gdp_matrix():
+    return synthetic_gdp_matrix()
+
+
+def synthetic_prices(n_days=5000, n_pairs=1, seed=0, holiday_share=0.0):
+    """Zufällige Kursreihen (Geschäftstage) als DataFrame Datum x Ticker, optional mit NaN-Lücken."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2000-01-03', periods=n_days, name='Datum')
+    kurse = np.exp(np.cumsum(rng.normal(0, 0.006, (n_days, n_pairs)), axis=0))
+    if holiday_share:
+        kurse[rng.random(kurse.shape) < holiday_share] = np.nan
+        kurse[0] = 1.0
+    return pd.DataFrame(kurse, index=index, columns=[f"P{i}=X" for i in range(n_pairs)])
+
+
+def saisonalitaet_referenz(forex_daten):
+    """Bisherige Implementierung (groupby + Maske pro Woche) als Referenz für die Äquivalenzprüfung."""
+    forex_returns = forex_daten['Schlusskurs'].pct_change()
+    wochenmittel = forex_returns.groupby(forex_daten.index.isocalendar().week).mean()
+    signal = pd.Series(index=forex_daten.index, dtype=float, name="Saisonalitaet")
+    wochen = forex_daten.index.isocalendar().week
+    for woche, wert in wochenmittel.items():
+        signal[wochen == woche] = wert
+    return signal.fillna(0)
+
+
+def synthetic_gdp_matrix(n_quarters=100, n_countries=20, seed=0):
+    """Zufällige BIP-Matrix (Quartale x Länder) mit gemeinsamem Zeitraum und einer Lücke."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2000-01-01', periods=n_quarters, freq='QS')
+    werte = np.cumprod(1 + rng.normal(0.005, 0.01, (n_quarters, n_countries)), axis=0)
+    gdp_matrix = pd.DataFrame(werte, index=index, columns=[f"Land{i}" for i in range(n_countries)])
+    gdp_matrix.iloc[n_quarters // 3, 1] = np.nan
+    return gdp_matrix
+
+
+def synthetic_signals(n_rows, n_pairs=1, seed=0, freq='B'):
+    """Zufällige int8-Signale auf einem regelmäßigen Index (freq) oder unregelmäßigen Zeitstempeln (freq=None)."""
+    rng = np.random.default_rng(seed)
+    if freq is None:
+        index = pd.DatetimeIndex(np.datetime64('1990-01-01', 'ns') + np.cumsum(rng.integers(1, 3 * 86400, n_rows)).astype('timedelta64[s]'))
+    else:
+        # 10^6 Werktage passen nicht in den Nanosekunden-Bereich, dafür z.B. freq='h'
+        index = pd.date_range('1900-01-01', periods=n_rows, freq=freq)
+    werte = rng.choice(np.array([-1, 0, 0, 0, 1], dtype=np.int8), size=(n_rows, n_pairs))
+    return pd.DataFrame(werte, index=index, columns=[f"Paar{i}" for i in range(n_pairs)])
+
+
+def cooldown_referenz(signal_series, cooldown_days):
+    """Bisherige Implementierung von SignalAnalyzer.apply_signal_cooldown (Schleife mit .loc)."""
+    filtered_signals = pd.Series(0, index=signal_series.index, name=signal_series.name)
+    last_active_signal_date = pd.Timestamp.min
+    for current_signal_date in signal_series[signal_series != 0].index:
+        if current_signal_date >= last_active_signal_date + pd.Timedelta(days=cooldown_days):
+            filtered_signals.loc[current_signal_date] = signal_series.loc[current_signal_date]
+            last_active_signal_date = current_signal_date
+    return filtered_signals
+
+
+def cooldown_referenz_numpy(zeitstempel, signale, cooldown_ns):
+    """Dieselbe Schleife auf Arrays (schnellere Referenz für die Panel-Spalten)."""
+    ergebnis = np.zeros_like(signale)
+    letztes = None
+    for i in np.flatnonzero(signale):
+        if letztes is None or zeitstempel[i] >= letztes + cooldown_ns:
+            ergebnis[i] = signale[i]
+            letztes = zeitstempel[i]
+    return ergebnis
+
+
+def analyse_pipeline(result_cache, forex_daten, gdp_a, gdp_b):
+    """Analyse wie in ForexApp._run_analyse_prozess: Saisonalität, GDP-Momentum, Ausrichtung, Signale, Cooldown."""
+    from signal_analyzer import SignalAnalyzer, compare_gdp_momentum, richte_signal_aus
+    analyzer = SignalAnalyzer(result_cache=result_cache)
+    saisonalitaet = analyzer.berechne_saisonalitaet(forex_daten, ticker='P0=X')
+    gdp_signal = compare_gdp_momentum(gdp_a, gdp_b, result_cache=result_cache)[3]
+    ausgerichtet = richte_signal_aus(gdp_signal, forex_daten.index, publikationsverzug=pd.Timedelta(days=120))
+    signale = analyzer.generiere_signale(forex_daten.index, saisonalitaet, ausgerichtet)
+    return analyzer.apply_signal_cooldown(signale, cooldown_days=5)
+
+
+def preis_referenz(price_data_df, date):
+    """Bisherige Suche in Portfolio.get_current_price (Maske über den ganzen Frame + tail(1)) als Referenz."""
+    relevant_data = price_data_df[price_data_df.index <= date]
+    if relevant_data.empty:
+        return None
+    return float(relevant_data.tail(1)['Schlusskurs'].iloc[0])
+
+
+class StaticPriceSource:
+    """Minimaler DataManager-Ersatz für Portfolio: liefert feste Kursreihen pro Ticker und zählt die Abrufe."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = 0
+
+    def get_historical_price_data(self, ticker, start_date, end_date):
+        self.calls += 1
+        frame = self.frames[ticker]
+        return frame[(frame.index >= start_date) & (frame.index < end_date)]
+
+
+def bewertung_referenz(portfolio, tag):
+    """Bisherige calculate_total_value: bei jedem Aufruf alle Positionen neu bepreisen."""
+    wert = portfolio.cash
+    for ticker, details in portfolio.positions.items():
+        kurs = portfolio.get_current_price(ticker, tag)
+        wert += details.shares * kurs if details.type == 'long' else (details.entry_price - kurs) * details.shares
+    return wert
+
+
+def bewertungslauf(kurse, tage, voll_neu):
+    """
+    Bewertung wie in der Backtest-Schleife: record_portfolio_value und danach calculate_total_value für
+    die Positionsgröße am selben Tag, eine Position pro Ticker, jeden fünften Tag ein Trade.
+    voll_neu: stattdessen bewertung_referenz. Gibt (Werte, Verlaufswerte) zurück.
+    """
+    from portfolio_manager import Portfolio
+    frames = {ticker: kurse[[ticker]].rename(columns={ticker: 'Schlusskurs'}) for ticker in kurse.columns}
+    portfolio = Portfolio(1e6, StaticPriceSource(frames), kurse.index[0], kurse.index[-1] + pd.Timedelta(days=1),
+                          shared_price_cache=None)
+    werte, historie = [], []
+    with capture_output(lambda meldung: None):
+        for ticker in frames:
+            portfolio.open_long_position(ticker, 1000.0, tage[0])
+        for i, tag in enumerate(tage):
+            if voll_neu:
+                historie.append(bewertung_referenz(portfolio, tag))
+                werte.append(bewertung_referenz(portfolio, tag))
+            else:
+                portfolio.record_portfolio_value(tag)
+                historie.append(portfolio.history.column('value')[-1])
+                werte.append(portfolio.calculate_total_value(tag))
+            if i % 5 == 4:
+                ticker = kurse.columns[i % len(kurse.columns)]
+                portfolio.close_long_position(ticker, tag)
+                portfolio.open_long_position(ticker, 1000.0, tag)
+    return werte, historie
+
+
+def kurs_cache_laeufe(quelle, shared_price_cache, n_laeufe=50, start='2000-01-03', ende='2019-01-01',
+                      tag=pd.Timestamp('2010-06-30')):
+    """
+    Wie viele Backtests nacheinander: je Lauf ein Strategie- und ein Benchmark-Portfolio über alle Ticker
+    der Quelle (StaticPriceSource). Gibt (Anzahl Abrufe der Quelle, Kurse am tag pro Portfolio) zurück.
+    """
+    from portfolio_manager import Portfolio
+    kurse_am_tag = []
+    with capture_output(lambda meldung: None): # "[Portfolio] Caching prices ..." nicht mitmessen
+        for _ in range(n_laeufe):
+            for _ in range(2):
+                portfolio = Portfolio(10000.0, quelle, start, ende, shared_price_cache=shared_price_cache)
+                kurse_am_tag.append([portfolio.get_current_price(ticker, tag) for ticker in quelle.frames])
+    return quelle.calls, kurse_am_tag
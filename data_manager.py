@@ -1,32 +1,65 @@
+import logging
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, date # Added date for DataReader
-import pandas_datareader.data as pdr_web # For fetching live GDP data
+from data_providers import LiveDataProvider
+from app_logging import get_logger, log_with_data
+from data_store import PriceStore, GdpSeriesCache, CountryGdpRegistry, SingleFlight, PriceMatrix, SeasonalityCubeCache, PointInTimeGdpStore, PRICE_STORE_PATH, GDP_CACHE_PATH, GDP_CACHE_TTL_HOURS, PRICE_MATRIX_PATH, GDP_VINTAGE_PATH
 
 # Pfade zu den BIP-Daten CSV-Dateien
 BIP_DATA_LIVE_CSV = 'bip_data_live.csv'
 BIP_DATA_FALLBACK_CSV = 'bip_data.csv' # Die bereits existierende Datei für den Fallback
 PROVISIONAL_GDP_DATA_PATH = 'data/gdp_provisional/' # <--- NEUE Konstante
+# Veröffentlichungsverzug (Tage ab Beobachtungsdatum) für Länder ohne eigenen Eintrag
+DEFAULT_GDP_PUBLICATION_LAG_DAYS = 150
+# FRED-Abrufzeitraum: standardmäßig die letzten GDP_HISTORY_YEARS Jahre. GDP_FULL_HISTORY_START als
+# DataManager(gdp_history_start=...) lädt die gesamte Historie (die ältesten Quartalsreihen beginnen 1947).
+GDP_HISTORY_YEARS = 15
+GDP_FULL_HISTORY_START = '1947-01-01'
 
-# Importiere debug_print (oder verwende einen lokalen Stub)
-# Dies setzt voraus, dass die ForexApp den Callback für signal_analyzer.debug_print setzt,
-# und dieser dann global für DataManager-Aufrufe aus dem Analyseprozess verfügbar ist.
-# Eine robustere Lösung wäre, dem DataManager auch einen Logger zu übergeben.
-try:
-    from signal_analyzer import debug_print
-except ImportError:
-    print("WARNUNG: signal_analyzer.debug_print nicht gefunden, nutze Standard-Print für DataManager-Logs.")
-    def debug_print(message, data=None): # Lokaler Fallback-Logger
-        log_message = f"[DM STUB DEBUG] {message}"
-        if data is not None and isinstance(data, pd.DataFrame):
-            log_message += f"\n{data.head().to_string()}\n--------------------"
-        elif data is not None:
-            log_message += f"\n{str(data)}\n--------------------"
-        print(log_message)
+# Logs laufen über den Logger "forex.data" (gleicher Handler/Callback wie der SignalAnalyzer, siehe app_logging)
+logger = get_logger('data')
+
+def debug_print(message, data=None):
+    """Debug-Ausgabe des DataManagers; Daten werden nur bei aktivem DEBUG-Level formatiert."""
+    log_with_data(logger, logging.DEBUG, message, data)
+
+
+# Prozessweites Register der BIP-Serien pro Land, geteilt von allen DataManager-Instanzen
+# (GUI und Backtester besitzen jeweils eigene DataManager).
+GDP_REGISTRY = CountryGdpRegistry()
+# Prozessweite Point-in-Time-Tabelle der BIP-Werte (Veröffentlichungsstände), gespeist beim Laden eines Landes
+GDP_VINTAGES = PointInTimeGdpStore(GDP_VINTAGE_PATH)
+# Prozessweite Zusammenfassung gleichzeitiger Abrufe (z.B. Analyse- und Backtest-Thread fragen
+# denselben Ticker parallel an): pro Schlüssel läuft nur ein Download, alle Aufrufer erhalten dasselbe Ergebnis.
+IN_FLIGHT_REQUESTS = SingleFlight()
 
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, price_store_path=PRICE_STORE_PATH, gdp_cache_path=GDP_CACHE_PATH,
+                 gdp_cache_ttl_hours=GDP_CACHE_TTL_HOURS, gdp_registry=None, data_provider=None,
+                 synthesize_crosses=False, gdp_publication_lag_days=None, gdp_vintage_store=None,
+                 gdp_history_start=None):
+        """
+        price_store_path: Verzeichnis des lokalen Kursspeichers. None deaktiviert den Speicher
+                          (jeder Aufruf lädt dann direkt via yfinance).
+        gdp_cache_path: Verzeichnis des BIP-Caches für FRED-Serien. None deaktiviert den Cache.
+        gdp_cache_ttl_hours: Wie lange eine abgerufene FRED-Serie als aktuell gilt.
+        gdp_registry: Register der BIP-Serien pro Land. Standardmäßig das prozessweite GDP_REGISTRY.
+        data_provider: Quelle für Kurse (download_prices) und FRED-BIP-Serien (fetch_gdp_series), z.B.
+                       RecordingDataProvider zum Aufzeichnen oder ReplayDataProvider für Offline-Läufe.
+                       Standard: LiveDataProvider (yfinance / pandas_datareader).
+        synthesize_crosses: Wenn True, werden Kreuzkurse ohne USD (z.B. EURJPY=X) aus den USD-Legs
+                            berechnet statt separat geladen (siehe get_cross_rate_data).
+        gdp_publication_lag_days: Abweichende Veröffentlichungsverzüge in Tagen pro Land, z.B. {"USA": 0}
+                                  (ergänzt bzw. überschreibt self.gdp_publication_lag_days).
+        gdp_vintage_store: Point-in-Time-Tabelle der BIP-Werte (PointInTimeGdpStore). Standardmäßig das
+                           prozessweite GDP_VINTAGES; FRED-Abrufe und provisorische CSVs speisen sie.
+        gdp_history_start: Beginn des Abrufzeitraums für FRED-Serien. None (Standard): die letzten
+                           GDP_HISTORY_YEARS Jahre wie bisher. GDP_FULL_HISTORY_START lädt die gesamte
+                           Historie, damit die Point-in-Time-Tabelle auch frühe Quartale enthält; das
+                           verlängert auch die Serien für get_bip_data (und damit die Skalierung in
+                           compare_gdp_momentum).
+        """
         # Importiere os hier, um sicherzustellen, dass es im Kontext der Klasse verfügbar ist,
         # falls die globale Importierung oben nicht ausreicht oder für Klarheit.
         import os
@@ -101,6 +134,66 @@ class DataManager:
         }
         self.oecd_base_url = "https://stats.oecd.org/SDMX-JSON/data"
 
+        # Ungefährer Veröffentlichungsverzug der BIP-Quartalswerte in Tagen, gerechnet ab dem Datum der
+        # Beobachtung (FRED: Quartalsanfang), also ca. 90 Tage Quartal plus Zeit bis zur ersten Schätzung.
+        # Ein Quartalssignal gilt erst ab Datum + Verzug (siehe get_gdp_publication_lag).
+        self.gdp_publication_lag_days = {
+            "USA": 120,           # Advance Estimate ca. 30 Tage nach Quartalsende
+            "Eurozone": 120,      # Preliminary Flash ca. 30 Tage nach Quartalsende
+            "UK": 135,
+            "Japan": 135,
+            "Canada": 150,
+            "Australia": 155,
+            "Switzerland": 150,
+            "South Korea": 120,
+            "Mexico": 120,
+            "China": 110,
+            "Brazil": 150,
+            "India": 150,
+            "Indonesia": 125,
+            "Russia": 135,
+            "South Africa": 150,
+            "Turkey": 150,
+            "Saudi Arabia": 180,
+        }
+        if gdp_publication_lag_days:
+            self.gdp_publication_lag_days.update(gdp_publication_lag_days)
+
+        # USD-Legs für synthetische Kreuzkurse: Währung -> (yfinance-Ticker, invertiert).
+        # invertiert=False: Kurs ist "USD pro Einheit" (z.B. EURUSD=X), True: "Einheiten pro USD" (z.B. JPY=X = USD/JPY).
+        self.usd_leg_tickers = {
+            "EUR": ("EURUSD=X", False),
+            "GBP": ("GBPUSD=X", False),
+            "AUD": ("AUDUSD=X", False),
+            "JPY": ("JPY=X", True),
+            "CHF": ("CHF=X", True),
+            "CAD": ("CAD=X", True),
+            "BRL": ("BRL=X", True),
+            "CNY": ("CNY=X", True),
+            "INR": ("INR=X", True),
+            "IDR": ("IDR=X", True),
+            "MXN": ("MXN=X", True),
+            "RUB": ("RUB=X", True),
+            "SAR": ("SAR=X", True),
+            "ZAR": ("ZAR=X", True),
+            "KRW": ("KRW=X", True),
+            "TRY": ("TRY=X", True),
+        }
+        self.synthesize_crosses = synthesize_crosses
+
+        self.data_provider = data_provider if data_provider is not None else LiveDataProvider()
+        # Lokaler Kursspeicher: wird vor jedem yfinance-Abruf gelesen, nur fehlende Zeiträume werden geladen
+        self.price_store = PriceStore(price_store_path) if price_store_path else None
+        # Saisonalitäts-Würfel pro Ticker liegen neben den Kursen im Kursspeicher
+        self.seasonality_cache = SeasonalityCubeCache(price_store_path) if price_store_path else None
+        # Persistenter BIP-Cache pro FRED-Serie: wird vor dem Abruf über den Provider gelesen
+        self.gdp_cache = GdpSeriesCache(gdp_cache_path, ttl_hours=gdp_cache_ttl_hours) if gdp_cache_path else None
+        # BIP-Serien pro Land werden einmal geladen und für alle Paare wiederverwendet
+        self.gdp_registry = gdp_registry if gdp_registry is not None else GDP_REGISTRY
+        # Veröffentlichungsstände pro Land für Abfragen "was war an Tag X bekannt"
+        self.gdp_vintage_store = gdp_vintage_store if gdp_vintage_store is not None else GDP_VINTAGES
+        self.gdp_history_start = pd.Timestamp(gdp_history_start).date() if gdp_history_start is not None else None
+
 
         debug_print("[DataManager] DataManager initialisiert.") # Geändert zu debug_print
 
@@ -109,6 +202,7 @@ class DataManager:
         Versucht, eine provisorische BIP-CSV-Datei für ein bestimmtes Land zu laden.
         country_name_internal: Der interne Name des Landes (z.B. "Saudi Arabia", "Argentina")
         target_col_name: Der erwartete Spaltenname im resultierenden DataFrame (z.B. "BIP_SAR")
+        Eine optionale Spalte 'Veroeffentlicht' (Veröffentlichungsdatum je Zeile) wird mit zurückgegeben.
         """
         filename_country_part = country_name_internal.lower().replace(" ", "_")
         provisional_csv_path = f"{PROVISIONAL_GDP_DATA_PATH}bip_data_{filename_country_part}.csv"
@@ -123,15 +217,18 @@ class DataManager:
             daten = pd.read_csv(provisional_csv_path, parse_dates=['Datum'])
             daten.set_index('Datum', inplace=True)
 
+            release_col = PointInTimeGdpStore.RELEASE_COLUMN
+            value_columns = [col for col in daten.columns if col != release_col]
             if target_col_name not in daten.columns:
                 debug_print(f"[DataManager] FEHLER: Erforderliche Spalte '{target_col_name}' nicht in provisorischer CSV {provisional_csv_path} gefunden. Verfügbare Spalten: {daten.columns.tolist()}")
-                if len(daten.columns) == 1: # Nur eine Datenspalte (neben Index)
-                    debug_print(f"[DataManager] Nutze erste Datenspalte '{daten.columns[0]}' als '{target_col_name}'.")
-                    daten.rename(columns={daten.columns[0]: target_col_name}, inplace=True)
+                if len(value_columns) == 1: # Nur eine Datenspalte (neben Index und Veröffentlichung)
+                    debug_print(f"[DataManager] Nutze erste Datenspalte '{value_columns[0]}' als '{target_col_name}'.")
+                    daten.rename(columns={value_columns[0]: target_col_name}, inplace=True)
                 else:
                     return None # Mehrdeutige Daten
 
-            gdp_series = daten[[target_col_name]].copy() # Nur die relevante Spalte
+            # Nur die relevante Spalte, plus Veröffentlichungsdaten, falls die CSV sie enthält
+            gdp_series = daten[[target_col_name] + ([release_col] if release_col in daten.columns else [])].copy()
             gdp_series.sort_index(inplace=True)
 
             debug_print(f"[DataManager] Provisorische BIP-Daten für '{country_name_internal}' erfolgreich aus {provisional_csv_path} geladen. {len(gdp_series)} Einträge.")
@@ -142,12 +239,28 @@ class DataManager:
             return None
 
     def _fetch_gdp_from_fred(self, series_id, series_name, start_date_dt, end_date_dt):
-        """Helper to fetch specific GDP data series from FRED."""
-        print(f"[DataManager] Attempting to fetch GDP data for '{series_name}' (ID: {series_id}) from FRED ({start_date_dt} to {end_date_dt})...")
+        """
+        Helper to fetch specific GDP data series from FRED. Concurrent calls for the same series
+        and window share one request.
+        """
+        request_key = ('fred', type(self.data_provider).__name__, series_id, str(start_date_dt), str(end_date_dt))
+        return IN_FLIGHT_REQUESTS.do(request_key, self._fetch_gdp_from_fred_uncoalesced,
+                                     series_id, series_name, start_date_dt, end_date_dt)
+
+    def _fetch_gdp_from_fred_uncoalesced(self, series_id, series_name, start_date_dt, end_date_dt):
+        """Fetches a GDP series from FRED, consulting the GDP cache first."""
+        if self.gdp_cache is not None:
+            cached_series = self.gdp_cache.get(series_id, start_date_dt, end_date_dt)
+            if cached_series is not None and not cached_series.empty:
+                cache_meta = self.gdp_cache.get_meta(series_id) or {}
+                logger.info("[DataManager] GDP data for '%s' (ID: %s) served from cache (as of %s). %s entries.", series_name, series_id, cache_meta.get('as_of'), len(cached_series))
+                return cached_series
+
+        logger.info("[DataManager] Attempting to fetch GDP data for '%s' (ID: %s) from FRED (%s to %s)...", series_name, series_id, start_date_dt, end_date_dt)
         try:
-            gdp_data = pdr_web.DataReader(series_id, 'fred', start_date_dt, end_date_dt)
-            if gdp_data.empty:
-                print(f"[DataManager] No data received from FRED for {series_id}.")
+            gdp_data = self.data_provider.fetch_gdp_series(series_id, start_date_dt, end_date_dt)
+            if gdp_data is None or gdp_data.empty:
+                logger.warning("[DataManager] No data received from FRED for %s.", series_id)
                 return None
 
             # DataReader for FRED returns a DataFrame, series_id is usually the column name
@@ -157,9 +270,9 @@ class DataManager:
             elif not gdp_data.columns.empty : # Fallback if exact series_id not in columns (e.g. sometimes with single series)
                 gdp_series = gdp_data[[gdp_data.columns[0]]].copy()
                 gdp_series.rename(columns={gdp_data.columns[0]: series_name}, inplace=True)
-                print(f"[DataManager] FRED data for {series_id} found in column '{gdp_data.columns[0]}', renamed to '{series_name}'.")
+                logger.info("[DataManager] FRED data for %s found in column '%s', renamed to '%s'.", series_id, gdp_data.columns[0], series_name)
             else:
-                 print(f"[DataManager] FRED data for {series_id} is an empty DataFrame or has no columns.")
+                 logger.warning("[DataManager] FRED data for %s is an empty DataFrame or has no columns.", series_id)
                  return None
 
             if not isinstance(gdp_series.index, pd.DatetimeIndex):
@@ -171,10 +284,12 @@ class DataManager:
             gdp_series = gdp_series.resample('QS').ffill()
             gdp_series = gdp_series.dropna() # Drop any NaNs after resampling/ffill, esp. at start.
 
-            print(f"[DataManager] GDP data for '{series_name}' (ID: {series_id}) successfully fetched from FRED. {len(gdp_series)} entries.")
+            logger.info("[DataManager] GDP data for '%s' (ID: %s) successfully fetched from FRED. %s entries.", series_name, series_id, len(gdp_series))
+            if self.gdp_cache is not None:
+                self.gdp_cache.put(series_id, gdp_series, start_date_dt, end_date_dt)
             return gdp_series # Return DataFrame with one column
         except Exception as e:
-            print(f"[DataManager] Error fetching GDP data from FRED for {series_id} ('{series_name}'): {e}")
+            logger.error("[DataManager] Error fetching GDP data from FRED for %s ('%s'): %s", series_id, series_name, e)
             return None
 
     # OECD fetching would be more complex and is stubbed out for now.
@@ -185,8 +300,9 @@ class DataManager:
 
     def get_forex_data(self, forex_pair_ticker, start_date, end_date): # Parameter umbenannt für Klarheit
         """
-        Lädt historische Forex-Daten für das angegebene Paar und den Zeitraum mittels yfinance.
+        Lädt historische Forex-Daten für das angegebene Paar und den Zeitraum.
         forex_pair_ticker: Kann der Basiscode (z.B. "EURUSD") oder der volle yf-Ticker ("EURUSD=X") sein.
+        Liest zuerst aus dem lokalen Kursspeicher, nur fehlende Zeiträume werden via yfinance geladen.
         """
         # Stelle sicher, dass der Ticker das Suffix "=X" hat, aber nicht doppelt.
         if isinstance(forex_pair_ticker, str) and forex_pair_ticker.upper().endswith("=X"):
@@ -197,46 +313,178 @@ class DataManager:
             debug_print(f"[DataManager] FEHLER: forex_pair_ticker hat unerwarteten Typ: {type(forex_pair_ticker)}. Wert: {forex_pair_ticker}")
             return pd.DataFrame()
 
-        debug_print(f"[DataManager] Lade Forex-Daten für {ticker} von {start_date} bis {end_date} via yfinance.")
+        debug_print(f"[DataManager] Lade Forex-Daten für {ticker} von {start_date} bis {end_date}.")
+        forex_data_final = self._get_close_prices(ticker, start_date, end_date)
+        if forex_data_final.empty:
+            debug_print(f"[DataManager] Keine Forex-Daten für {ticker} im Zeitraum {start_date}-{end_date} gefunden.")
+            return pd.DataFrame()
+
+        logger.info("[DataManager] Forex-Daten für %s erfolgreich geladen. %s Einträge.", ticker, len(forex_data_final))
+        debug_print(f"[DataManager] Forex-Daten für {ticker}, Head:", forex_data_final)
+        return forex_data_final
+
+    def _download_close_prices(self, ticker, start_date, end_date):
+        """
+        Lädt Kurse eines Tickers über den Kurs-Provider als DataFrame mit 'Schlusskurs'-Spalte
+        und 'Datum'-Index. Gibt bei Fehlern None zurück (im Gegensatz zu einem leeren DataFrame,
+        der "keine Daten im Zeitraum" bedeutet).
+        """
+        downloaded = self._download_close_prices_batch([ticker], start_date, end_date)
+        return downloaded.get(ticker)
+
+    def _download_close_prices_batch(self, tickers, start_date, end_date):
+        """
+        Ein gebündelter Provider-Aufruf für mehrere Ticker. Gibt {ticker: DataFrame} zurück;
+        fehlgeschlagene Ticker fehlen im Ergebnis.
+        """
         try:
-            # Lade Daten, progress=False um Terminal-Ausgaben zu reduzieren
-            daten = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
+            return self.data_provider.download_prices(tickers, start_date, end_date)
+        except Exception as e:
+            debug_print(f"[DataManager] FEHLER beim Laden von Kursdaten für {tickers}: {e}")
+            import traceback # Für detaillierteren Fehler
+            debug_print(traceback.format_exc())
+            return {}
 
-            if daten.empty:
-                debug_print(f"[DataManager] Keine Forex-Daten für {ticker} im Zeitraum {start_date}-{end_date} gefunden.")
-                return pd.DataFrame()
+    def price_source_key(self):
+        """
+        Herkunft der Kurse dieser Instanz: Provider-Typ, Speicherort und Kreuzkurs-Synthese. Gehört zu jedem
+        prozessweiten Schlüssel (In-Flight-Abrufe, SharedPriceCache), damit unterschiedlich konfigurierte
+        DataManager-Instanzen keine Ergebnisse teilen.
+        """
+        store_path = self.price_store.base_path if self.price_store is not None else None
+        return (type(self.data_provider).__name__, store_path, self.synthesize_crosses)
 
-            # yfinance liefert typischerweise 'Close'. 'Adj Close' ist bei Forex seltener relevant.
-            # Die Analysefunktion erwartet 'Schlusskurs'.
-            price_col_options = ['Close', 'Adj Close'] # Präferiere 'Close' für Forex
-            selected_price_col = None
-            for col_option in price_col_options:
-                if col_option in daten.columns:
-                    selected_price_col = col_option
-                    break
-
-            if not selected_price_col:
-                print(f"[DataManager] FEHLER: Weder 'Close' noch 'Adj Close' Spalte in yfinance-Daten für {ticker} gefunden.")
-                print(f"[DataManager] Verfügbare Spalten: {daten.columns.tolist()}")
-                return pd.DataFrame()
+    def _price_request_key(self, kind, tickers, start_date, end_date):
+        return (kind, *self.price_source_key(), tuple(tickers), str(start_date), str(end_date))
 
-            # Nur die relevante Preissplate auswählen und umbenennen
-            forex_data_final = daten[[selected_price_col]].copy()
-            forex_data_final.rename(columns={selected_price_col: 'Schlusskurs'}, inplace=True)
-            forex_data_final.index.name = 'Datum' # Sicherstellen, dass der Index 'Datum' heißt
+    def _get_close_prices(self, ticker, start_date, end_date):
+        """
+        Liefert 'Schlusskurs'-Daten für [start_date, end_date) aus dem lokalen Kursspeicher.
+        Nur noch nicht abgedeckte Teilzeiträume werden über den Provider nachgeladen und eingefügt.
+        Gleichzeitige Anfragen für (ticker, start, end) warten auf denselben Abruf.
+        """
+        return IN_FLIGHT_REQUESTS.do(self._price_request_key('prices', [ticker], start_date, end_date),
+                                     self._get_close_prices_uncoalesced, ticker, start_date, end_date)
 
-            print(f"[DataManager] Forex-Daten für {ticker} erfolgreich geladen. {len(forex_data_final)} Einträge. Head:\n{forex_data_final.head()}")
-            return forex_data_final
-        except Exception as e:
-            print(f"[DataManager] FEHLER beim Laden von Forex-Daten für {ticker} via yfinance: {e}")
+    def _get_close_prices_uncoalesced(self, ticker, start_date, end_date):
+        if self.synthesize_crosses:
+            pair = self.parse_forex_ticker(ticker)
+            if pair and "USD" not in pair and all(curr in self.usd_leg_tickers for curr in pair):
+                return self.get_cross_rate_data(pair[0], pair[1], start_date, end_date)
+        return self.get_bulk_price_data([ticker], start_date, end_date).get(ticker, pd.DataFrame())
+
+    def parse_forex_ticker(self, ticker):
+        """
+        Zerlegt einen yfinance-Forex-Ticker in (Basis, Quote): "EURJPY=X" -> ("EUR", "JPY"),
+        "JPY=X" -> ("USD", "JPY"). Gibt None für andere Ticker (z.B. "^SPX") zurück.
+        """
+        if not isinstance(ticker, str) or not ticker.upper().endswith("=X"):
+            return None
+        code = ticker.upper()[:-2]
+        if len(code) == 6:
+            return code[:3], code[3:]
+        if len(code) == 3:
+            return "USD", code
+        return None
+
+    def get_usd_leg_tickers(self, currencies=None):
+        """Gibt die yfinance-Ticker der USD-Legs zurück (alle oder nur für die angegebenen Währungen)."""
+        currencies = self.usd_leg_tickers.keys() if currencies is None else currencies
+        return [self.usd_leg_tickers[curr][0] for curr in currencies if curr in self.usd_leg_tickers]
+
+    def get_cross_rate_data(self, base_curr, quote_curr, start_date, end_date):
+        """
+        Berechnet den Kurs base_curr/quote_curr aus USD-Legs, z.B. EUR/JPY = (USD pro EUR) / (USD pro JPY).
+        Die Legs werden gebündelt aus dem Kursspeicher geladen (nur fehlende Zeiträume werden abgerufen)
+        und auf einen gemeinsamen Handelskalender (Tage, an denen alle Legs notieren) ausgerichtet.
+        Für 17 Währungen genügen so 16 Downloads statt bis zu 136 Paaren.
+        Gibt denselben 'Schlusskurs'-DataFrame wie get_forex_data zurück (leer, falls ein Leg fehlt).
+        """
+        base_curr = base_curr.upper()
+        quote_curr = quote_curr.upper()
+        currencies = [curr for curr in (base_curr, quote_curr) if curr != "USD"]
+        missing = [curr for curr in currencies if curr not in self.usd_leg_tickers]
+        if missing:
+            debug_print(f"[DataManager] FEHLER: Kein USD-Leg für Währung(en) {missing} konfiguriert.")
+            return pd.DataFrame()
+
+        leg_data = self.get_bulk_price_data(self.get_usd_leg_tickers(currencies), start_date, end_date)
+
+        usd_per_unit = {}
+        for curr in currencies:
+            leg_ticker, inverted = self.usd_leg_tickers[curr]
+            leg_frame = leg_data.get(leg_ticker, pd.DataFrame())
+            if leg_frame.empty:
+                debug_print(f"[DataManager] Keine Daten für USD-Leg {leg_ticker} ({curr}). Kreuzkurs {base_curr}/{quote_curr} nicht berechenbar.")
+                return pd.DataFrame()
+            leg_close = leg_frame['Schlusskurs']
+            usd_per_unit[curr] = 1.0 / leg_close if inverted else leg_close
+
+        # Gemeinsamer Handelskalender: nur Tage, an denen alle benötigten Legs einen Kurs haben
+        legs = pd.concat(usd_per_unit, axis=1, join='inner').dropna()
+        base_values = legs[base_curr] if base_curr != "USD" else 1.0
+        quote_values = legs[quote_curr] if quote_curr != "USD" else 1.0
+        cross_rate = base_values / quote_values
+        if not isinstance(cross_rate, pd.Series): # Nur bei USD/USD denkbar
             return pd.DataFrame()
 
+        cross_data = cross_rate.to_frame('Schlusskurs')
+        cross_data.index.name = 'Datum'
+        debug_print(f"[DataManager] Kreuzkurs {base_curr}/{quote_curr} aus USD-Legs berechnet. {len(cross_data)} Einträge.")
+        return cross_data
+
+    def get_bulk_price_data(self, tickers, start_date, end_date):
+        """
+        Lädt Schlusskurse für viele Ticker (z.B. alle pair_codes aus FOREX_PAIRS_CONFIG plus "^SPX").
+        Ticker mit demselben fehlenden Zeitraum werden in EINEM Provider-Aufruf gebündelt geladen,
+        statt pro Ticker eine blockierende Anfrage zu stellen.
+        Gibt ein Dict {ticker: DataFrame mit 'Schlusskurs'} zurück (leerer DataFrame bei fehlenden Daten).
+        """
+        tickers = list(dict.fromkeys(tickers)) # Duplikate entfernen, Reihenfolge behalten
+        if self.price_store is None:
+            downloaded = self._download_close_prices_batch(tickers, start_date, end_date)
+            return {ticker: downloaded.get(ticker, pd.DataFrame()) for ticker in tickers}
+
+        # Ticker nach identischen fehlenden Zeiträumen gruppieren -> ein Batch-Aufruf pro Gruppe und Zeitraum
+        batches = {}
+        for ticker in tickers:
+            missing_ranges = tuple(self.price_store.missing_ranges(ticker, start_date, end_date))
+            if missing_ranges:
+                batches.setdefault(missing_ranges, []).append(ticker)
+            else:
+                debug_print(f"[DataManager] Kursdaten für {ticker} ({start_date} bis {end_date}) vollständig im lokalen Speicher.")
+
+        for missing_ranges, batch_tickers in batches.items():
+            for range_start, range_end in missing_ranges:
+                range_start_str = range_start.strftime('%Y-%m-%d')
+                range_end_str = range_end.strftime('%Y-%m-%d')
+                debug_print(f"[DataManager] Lade fehlenden Zeitraum {range_start_str} bis {range_end_str} für {len(batch_tickers)} Ticker: {batch_tickers}")
+                downloaded = IN_FLIGHT_REQUESTS.do(self._price_request_key('download', batch_tickers, range_start_str, range_end_str),
+                                                   self._download_close_prices_batch, batch_tickers, range_start_str, range_end_str)
+                for ticker in batch_tickers:
+                    if ticker not in downloaded:
+                        continue # Fehler beim Abruf -> Zeitraum nicht als abgedeckt markieren
+                    self.price_store.merge(ticker, downloaded[ticker], range_start, range_end)
+
+        return {ticker: self.price_store.read(ticker, start_date, end_date) for ticker in tickers}
+
+    def build_price_matrix(self, tickers, start_date, end_date, matrix_path=PRICE_MATRIX_PATH):
+        """
+        Baut aus dem lokalen Kursspeicher (fehlende Zeiträume werden vorher geladen) eine
+        memory-mapped Matrix (Datum x Ticker) für das gesamte Universum, z.B. alle Paare aus
+        FOREX_PAIRS_CONFIG. Worker können sie mit PriceMatrix(matrix_path) ohne Kopie öffnen.
+        """
+        price_frames = self.get_bulk_price_data(tickers, start_date, end_date)
+        price_matrix = PriceMatrix.build(price_frames, matrix_path)
+        debug_print(f"[DataManager] Kursmatrix unter {matrix_path} erstellt: {price_matrix.values.shape[0]} Tage x {price_matrix.values.shape[1]} Ticker.")
+        return price_matrix
+
     def _load_bip_csv(self, csv_path, target_col_country1, target_col_country2, is_fallback=False):
         """
         Hilfsfunktion zum Laden und Verarbeiten einer BIP-CSV-Datei.
         target_col_country1/2 sind die Spaltennamen, die am Ende im DataFrame stehen sollen (z.B. BIP_USA).
         """
-        print(f"[DataManager] Lade BIP-Daten aus CSV: {csv_path} (Fallback={is_fallback})")
+        logger.info("[DataManager] Lade BIP-Daten aus CSV: %s (Fallback=%s)", csv_path, is_fallback)
         daten = pd.read_csv(csv_path, parse_dates=['Datum'])
         daten.set_index('Datum', inplace=True)
 
@@ -262,124 +510,210 @@ class DataManager:
 
             if rename_map:
                 relevant_bip_data.rename(columns=rename_map, inplace=True)
-                print(f"[DataManager] Spalten im Fallback-DataFrame umbenannt: {rename_map}")
+                logger.info("[DataManager] Spalten im Fallback-DataFrame umbenannt: %s", rename_map)
 
-        print(f"[DataManager] BIP-Daten aus {csv_path} erfolgreich verarbeitet. {len(relevant_bip_data)} Einträge. Head:\n{relevant_bip_data.head()}")
+        logger.info("[DataManager] BIP-Daten aus %s erfolgreich verarbeitet. %s Einträge.", csv_path, len(relevant_bip_data))
+        debug_print(f"[DataManager] BIP-Daten aus {csv_path}, Head:", relevant_bip_data)
         return relevant_bip_data
 
+    def _load_generic_gdp_column(self, target_col_name):
+        """Lädt eine einzelne Länderspalte (z.B. BIP_EUR) aus der generischen BIP_DATA_LIVE_CSV."""
+        if not self.os_path_exists(BIP_DATA_LIVE_CSV):
+            return None
+        try:
+            daten = pd.read_csv(BIP_DATA_LIVE_CSV, parse_dates=['Datum'])
+            daten.set_index('Datum', inplace=True)
+        except Exception as e:
+            debug_print(f"[DataManager] Allgemeiner Fehler beim Laden von generischen CSV-BIP-Daten: {e}")
+            return None
+        if target_col_name not in daten.columns:
+            return None
+        return daten[target_col_name].sort_index()
+
+    def _load_country_gdp(self, country_name):
+        """
+        Lädt die BIP-Serie eines Landes: API (FRED), sonst provisorische CSV, sonst generische CSV.
+        Gibt einen Registereintrag (siehe CountryGdpRegistry) zurück oder None.
+        """
+        target_col_name = self.bip_csv_column_names.get(country_name)
+        if not target_col_name:
+            return None
+
+        # Weiter Zeitraum für API-Abrufe (letzte 15 Jahre bzw. ab gdp_history_start); die Filterung nach
+        # Forex-Zeitraum passiert später.
+        api_end_date = date.today()
+        api_start_date = self.gdp_history_start or date(api_end_date.year - GDP_HISTORY_YEARS, api_end_date.month, api_end_date.day)
+
+        if country_name in self.gdp_api_map:
+            api_details = self.gdp_api_map[country_name]
+            gdp_series_df = None # Wird ein DataFrame mit einer Spalte sein
+            if api_details["source"] == "fred":
+                gdp_series_df = self._fetch_gdp_from_fred(api_details["id"], api_details["name"], api_start_date, api_end_date)
+            # Elif für "oecd" etc. könnte hier folgen
+
+            if gdp_series_df is not None and not gdp_series_df.empty:
+                logger.info("[DataManager] BIP-Daten für %s erfolgreich von API (%s) geladen.", country_name, api_details['source'])
+                self._record_gdp_vintage(country_name, gdp_series_df.iloc[:, 0])
+                return {'series': gdp_series_df.iloc[:, 0].rename(target_col_name),
+                        'origin': 'api',
+                        'source': f"{api_details['source']}:{api_details['id']}",
+                        'loaded_at': datetime.now()}
+            logger.warning("[DataManager] BIP-Daten für %s werden aus CSV geladen (API nicht konfiguriert oder Fehler).", country_name)
+
+        debug_print(f"[DataManager] Versuche provisorische CSV-Daten für {country_name}, da API-Daten nicht verfügbar/abgerufen.")
+        provisional_gdp_df = self._load_provisional_gdp_csv(country_name, target_col_name)
+        if provisional_gdp_df is not None and not provisional_gdp_df.empty:
+            filename_country_part = country_name.lower().replace(" ", "_")
+            self._record_gdp_vintage(country_name, provisional_gdp_df.iloc[:, 0],
+                                     release_dates=provisional_gdp_df.get(PointInTimeGdpStore.RELEASE_COLUMN))
+            return {'series': provisional_gdp_df.iloc[:, 0].rename(target_col_name),
+                    'origin': 'provisional',
+                    'source': f"{PROVISIONAL_GDP_DATA_PATH}bip_data_{filename_country_part}.csv",
+                    'loaded_at': datetime.now()}
+
+        generic_series = self._load_generic_gdp_column(target_col_name)
+        if generic_series is not None and not generic_series.dropna().empty:
+            debug_print(f"[DataManager] Nutze Daten aus generischem CSV für {country_name} ({target_col_name}).")
+            return {'series': generic_series.rename(target_col_name),
+                    'origin': 'generic_csv',
+                    'source': BIP_DATA_LIVE_CSV,
+                    'loaded_at': datetime.now()}
+
+        debug_print(f"[DataManager] Keine API-, provisorischen oder generischen CSV-Daten für {country_name} gefunden.")
+        return None
+
+    def _record_gdp_vintage(self, country_name, gdp_series, release_dates=None):
+        """Trägt eine geladene BIP-Serie in die Point-in-Time-Tabelle ein (Fehler beim Speichern sind nicht fatal)."""
+        if self.gdp_vintage_store is None:
+            return
+        try:
+            new_rows = self.gdp_vintage_store.record(country_name, gdp_series,
+                                                     publication_lag=self.get_gdp_publication_lag(country_name),
+                                                     release_dates=release_dates)
+            if new_rows:
+                debug_print(f"[DataManager] {new_rows} neue BIP-Stände für {country_name} in der Point-in-Time-Tabelle.")
+        except Exception as e:
+            debug_print(f"[DataManager] FEHLER beim Eintragen der BIP-Stände für {country_name}: {e}")
+
+    def get_gdp_as_of(self, country_name, as_of_date):
+        """
+        BIP-Werte eines Landes, wie sie am as_of_date bekannt waren (PointInTimeGdpStore.as_of):
+        DataFrame mit Index 'Datum' (Referenzquartal) und den Spalten 'Wert', 'Veroeffentlicht' und
+        'Geschaetzt'. ValueError, wenn as_of_date vor dem ersten erfassten Stand liegt.
+        """
+        self.get_country_gdp(country_name) # Stellt sicher, dass das Land geladen und eingetragen ist
+        return self.gdp_vintage_store.as_of(country_name, as_of_date)
+
+    def get_country_gdp(self, country_name):
+        """
+        Gibt den Registereintrag (Serie plus Quellen-Metadaten) für ein Land zurück oder None.
+        Die Serie wird pro Prozess nur einmal geladen.
+        """
+        return self.gdp_registry.get_or_load(country_name, self._load_country_gdp)
+
+    def get_gdp_matrix(self, country_names):
+        """
+        BIP-Matrix (Quartale x Länder) für viele Länder auf einmal, z.B. für compare_gdp_momentum_panel.
+        Spalten sind die Ländernamen; Länder ohne Datenquelle fehlen in der Matrix.
+        """
+        country_series = {}
+        for country_name in dict.fromkeys(country_names):
+            entry = self.get_country_gdp(country_name)
+            if entry is None:
+                debug_print(f"[DataManager] Keine BIP-Daten für {country_name}, Land fehlt in der BIP-Matrix.")
+                continue
+            country_series[country_name] = entry['series']
+        if not country_series:
+            return pd.DataFrame()
+        gdp_matrix = pd.concat(country_series, axis=1, join='outer').sort_index()
+        debug_print(f"[DataManager] BIP-Matrix erstellt: {gdp_matrix.shape[0]} Quartale x {gdp_matrix.shape[1]} Länder.")
+        return gdp_matrix
+
     def get_bip_data(self, country1_name, country2_name):
         """
         Lädt BIP-Daten für die zwei angegebenen Länder.
-        Versucht API-Abruf für konfigurierte Länder, sonst Fallback auf CSV.
+        Die Serien pro Land kommen aus dem BIP-Register (API, provisorische CSV oder generische CSV);
+        hier wird nur noch das Paar-DataFrame zusammengesetzt. Fehlt ein Land, greift die alte
+        paarbezogene Fallback-CSV (BIP_Land_A/BIP_Land_B).
         Gibt ein DataFrame mit den BIP-Daten und die Namen der verwendeten Spalten zurück.
         """
-        print(f"[DataManager] Ermittle BIP-Daten für Länder: {country1_name} und {country2_name}.")
+        logger.info("[DataManager] Ermittle BIP-Daten für Länder: %s und %s.", country1_name, country2_name)
 
         # Ziel-Spaltennamen für das finale DataFrame (z.B. BIP_USA, BIP_EUR)
         target_col_name1 = self.bip_csv_column_names.get(country1_name)
         target_col_name2 = self.bip_csv_column_names.get(country2_name)
 
         if not target_col_name1 or not target_col_name2:
-            print(f"[DataManager] FEHLER: Keine BIP-Spaltenzuordnung für {country1_name} oder {country2_name} gefunden.")
+            logger.error("[DataManager] FEHLER: Keine BIP-Spaltenzuordnung für %s oder %s gefunden.", country1_name, country2_name)
             return pd.DataFrame(), None, None
 
-        series_data = {} # Store fetched series here, keyed by target_col_name
+        entries = [self.get_country_gdp(country1_name), self.get_country_gdp(country2_name)]
 
-        # Definiere Start- und Enddatum für API-Abrufe (z.B. letzte 10-15 Jahre)
-        # Diese Daten müssen als datetime.date oder datetime.datetime übergeben werden.
-        # Die ForexApp verwendet Strings, daher hier Konvertierung oder Anpassung nötig.
-        # Für einen generischen Abruf hier, nehmen wir einen weiten Zeitraum.
-        # Die eigentliche Filterung nach Forex-Zeitraum passiert später.
-        api_end_date = date.today()
-        api_start_date = date(api_end_date.year - 15, api_end_date.month, api_end_date.day)
-
-
-        for i, country_name_iter in enumerate([country1_name, country2_name]):
-            target_col_name_iter = target_col_name1 if i == 0 else target_col_name2
-            fetched_from_api = False
-
-            if country_name_iter in self.gdp_api_map:
-                api_details = self.gdp_api_map[country_name_iter]
-                gdp_series_df = None # Wird ein DataFrame mit einer Spalte sein
-                if api_details["source"] == "fred":
-                    gdp_series_df = self._fetch_gdp_from_fred(api_details["id"], api_details["name"], api_start_date, api_end_date)
-                # Elif für "oecd" etc. könnte hier folgen
-
-                if gdp_series_df is not None and not gdp_series_df.empty:
-                    # API-Daten erfolgreich abgerufen, benenne die Spalte auf den Zielnamen um (z.B. BIP_USA)
-                    # _fetch_gdp_from_fred gibt bereits einen DataFrame mit einer Spalte zurück, die api_details["name"] heißt.
-                    # Wir wollen es auf target_col_name_iter umbenennen.
-                    series_data[target_col_name_iter] = gdp_series_df.iloc[:, 0].rename(target_col_name_iter)
-                    fetched_from_api = True
-                    print(f"[DataManager] BIP-Daten für {country_name_iter} erfolgreich von API ({api_details['source']}) geladen.")
-
-            if not fetched_from_api:
-                print(f"[DataManager] BIP-Daten für {country_name_iter} werden aus CSV geladen (API nicht konfiguriert oder Fehler).")
-                # Markiere, dass CSV benötigt wird, aber lade es erst, wenn klar ist, ob beide aus CSV kommen oder gemischt wird.
-                # Fürs Erste setzen wir None, um CSV-Ladung unten auszulösen, falls diese Serie nicht aus API kam.
-            # if target_col_name_iter not in series_data: # Nur setzen, wenn nicht schon aus API geladen
-            #      series_data[target_col_name_iter] = None # Signalisiert, dass CSV-Fallback benötigt wird
-            # Die Logik wurde geändert: series_data wird direkt befüllt oder bleibt leer, wenn nichts gefunden.
-
-            if not fetched_from_api: # Wenn nicht von API geladen (entweder kein Eintrag in gdp_api_map oder API-Abruf fehlgeschlagen)
-                debug_print(f"[DataManager] Versuche provisorische CSV-Daten für {country_name_iter}, da API-Daten nicht verfügbar/abgerufen.")
-                provisional_gdp_df = self._load_provisional_gdp_csv(country_name_iter, target_col_name_iter)
-                if provisional_gdp_df is not None and not provisional_gdp_df.empty:
-                    series_data[target_col_name_iter] = provisional_gdp_df.iloc[:, 0].rename(target_col_name_iter)
-                    debug_print(f"[DataManager] Provisorische BIP-Daten für {country_name_iter} erfolgreich geladen.")
-                else:
-                    # Wenn weder API noch provisorische CSV erfolgreich waren, markieren für generischen CSV-Fallback
-                    debug_print(f"[DataManager] Keine API- oder provisorischen CSV-Daten für {country_name_iter} gefunden. Markiere für generischen Fallback.")
-                    if target_col_name_iter not in series_data:
-                         series_data[target_col_name_iter] = None # Signalisiert Notwendigkeit für generischen Fallback
-
-
-        # Generischer CSV-Fallback (BIP_DATA_LIVE_CSV / BIP_DATA_FALLBACK_CSV)
-        # Diese Logik greift jetzt nur noch, wenn für eines der Länder series_data[target_col_name_iter] immer noch None ist
-        generic_csv_bip_df = None
-        needs_generic_csv_fallback = any(s is None for s in series_data.values())
-
-        if needs_generic_csv_fallback:
-            debug_print(f"[DataManager] Versuche generischen CSV-Fallback (live/fallback CSVs), da spezifische Daten für mindestens ein Land fehlen.")
+        fallback_bip_df = None
+        if any(entry is None for entry in entries):
+            debug_print(f"[DataManager] Versuche Fallback-CSV ({BIP_DATA_FALLBACK_CSV}), da spezifische Daten für mindestens ein Land fehlen.")
             try:
-                generic_csv_bip_df = self._load_bip_csv(BIP_DATA_LIVE_CSV, target_col_name1, target_col_name2, is_fallback=False)
-            except FileNotFoundError:
-                debug_print(f"[DataManager] 'Live' BIP-Datei ({BIP_DATA_LIVE_CSV}) nicht gefunden. Versuche Fallback-CSV.")
-                try:
-                    generic_csv_bip_df = self._load_bip_csv(BIP_DATA_FALLBACK_CSV, target_col_name1, target_col_name2, is_fallback=True)
-                except Exception as e_fallback_csv:
-                    debug_print(f"[DataManager] FEHLER auch beim Laden von Fallback-BIP-Daten ({BIP_DATA_FALLBACK_CSV}): {e_fallback_csv}")
-                    # Keine Aktion hier, da wir unten prüfen, ob Daten vorhanden sind
-            except Exception as e_csv:
-                debug_print(f"[DataManager] Allgemeiner Fehler beim Laden von generischen CSV-BIP-Daten: {e_csv}")
-
-        # Kombiniere API, provisorische CSV und generische CSV Daten
+                fallback_bip_df = self._load_bip_csv(BIP_DATA_FALLBACK_CSV, target_col_name1, target_col_name2, is_fallback=True)
+            except Exception as e_fallback_csv:
+                debug_print(f"[DataManager] FEHLER auch beim Laden von Fallback-BIP-Daten ({BIP_DATA_FALLBACK_CSV}): {e_fallback_csv}")
+
         final_bip_data_list = []
-        for i, target_col_name_iter in enumerate([target_col_name1, target_col_name2]):
-            country_name_iter = country1_name if i == 0 else country2_name # Für Logging
-            if series_data.get(target_col_name_iter) is not None: # API oder provisorische CSV Daten haben Vorrang
-                debug_print(f"[DataManager] Nutze API/provisorische Daten für {country_name_iter} ({target_col_name_iter}).")
-                final_bip_data_list.append(series_data[target_col_name_iter])
-            elif generic_csv_bip_df is not None and target_col_name_iter in generic_csv_bip_df: # Fallback auf generische CSV
-                debug_print(f"[DataManager] Nutze Daten aus generischem CSV für {country_name_iter} ({target_col_name_iter}).")
-                final_bip_data_list.append(generic_csv_bip_df[target_col_name_iter])
+        for country_name_iter, target_col_name_iter, entry in zip([country1_name, country2_name],
+                                                                  [target_col_name1, target_col_name2], entries):
+            if entry is not None:
+                debug_print(f"[DataManager] Nutze BIP-Daten für {country_name_iter} ({target_col_name_iter}) aus Register (Herkunft: {entry['origin']}, Quelle: {entry['source']}).")
+                final_bip_data_list.append(entry['series'])
+            elif fallback_bip_df is not None and target_col_name_iter in fallback_bip_df:
+                debug_print(f"[DataManager] Nutze Daten aus Fallback-CSV für {country_name_iter} ({target_col_name_iter}).")
+                final_bip_data_list.append(fallback_bip_df[target_col_name_iter])
             else:
                 debug_print(f"[DataManager] FEHLER: Keine Datenquelle (API, provisorisch, oder generisch CSV) für {country_name_iter} ({target_col_name_iter}) gefunden.")
                 return pd.DataFrame(), None, None
 
-        if len(final_bip_data_list) == 2:
-            # pd.concat auf axis=1, um die Series zu einem DataFrame zu verbinden
-            # Stellt sicher, dass der Index (Datum) ausgerichtet wird.
-            # join='outer' behält alle Datenpunkte, ffill/bfill könnte danach angewendet werden,
-            # aber compare_gdp_momentum macht seine eigene Synchronisierung.
-            final_bip_df = pd.concat(final_bip_data_list, axis=1, join='outer')
-            final_bip_df.sort_index(inplace=True)
-            print(f"[DataManager] Finale BIP-Daten kombiniert. {len(final_bip_df)} Einträge. Head:\n{final_bip_df.head()}")
-            return final_bip_df, target_col_name1, target_col_name2
-        else:
-            print(f"[DataManager] FEHLER: Konnte nicht zwei BIP-Datenserien für die Kombination erstellen.")
+        # pd.concat auf axis=1, um die Series zu einem DataFrame zu verbinden; der Index (Datum) wird ausgerichtet.
+        # join='outer' behält alle Datenpunkte, compare_gdp_momentum macht seine eigene Synchronisierung.
+        final_bip_df = pd.concat(final_bip_data_list, axis=1, join='outer')
+        final_bip_df.sort_index(inplace=True)
+        logger.info("[DataManager] Finale BIP-Daten kombiniert. %s Einträge.", len(final_bip_df))
+        debug_print("[DataManager] Finale BIP-Daten, Head:", final_bip_df)
+        return final_bip_df, target_col_name1, target_col_name2
+
+
+    def get_gdp_publication_lag(self, *country_names):
+        """
+        Veröffentlichungsverzug als pd.Timedelta. Für ein Paar gilt der größere Verzug beider Länder,
+        da das Momentum-Signal erst mit beiden Quartalswerten feststeht. Unbekannte Länder: DEFAULT_GDP_PUBLICATION_LAG_DAYS.
+        """
+        lag_days = max((self.gdp_publication_lag_days.get(name, DEFAULT_GDP_PUBLICATION_LAG_DAYS) for name in country_names), default=0)
+        return pd.Timedelta(days=lag_days)
+
+    def get_bip_data_as_of(self, country1_name, country2_name, as_of_date):
+        """
+        Wie get_bip_data, aber nur mit den BIP-Werten, die am as_of_date bereits veröffentlicht waren
+        (letzter Stand je Quartal). Index sind die Referenzquartale (Quartalsanfang).
+        Gibt (DataFrame, Spaltenname Land 1, Spaltenname Land 2) zurück, bei fehlenden Daten (leer, None, None).
+        """
+        target_col_name1 = self.bip_csv_column_names.get(country1_name)
+        target_col_name2 = self.bip_csv_column_names.get(country2_name)
+        if not target_col_name1 or not target_col_name2:
+            logger.error("[DataManager] FEHLER: Keine BIP-Spaltenzuordnung für %s oder %s gefunden.", country1_name, country2_name)
             return pd.DataFrame(), None, None
 
+        known_series = []
+        for country_name, target_col_name in [(country1_name, target_col_name1), (country2_name, target_col_name2)]:
+            try:
+                known = self.get_gdp_as_of(country_name, as_of_date)
+            except ValueError as e:
+                logger.warning("[DataManager] WARNUNG: %s", e)
+                return pd.DataFrame(), None, None
+            if known.empty:
+                debug_print(f"[DataManager] Keine BIP-Stände für {country_name} zum {as_of_date} bekannt.")
+                return pd.DataFrame(), None, None
+            known_series.append(known[PointInTimeGdpStore.VALUE_COLUMN].rename(target_col_name))
+
+        bip_df = pd.concat(known_series, axis=1, join='outer').sort_index()
+        debug_print(f"[DataManager] BIP-Daten Stand {as_of_date}, Head:", bip_df)
+        return bip_df, target_col_name1, target_col_name2
 
     def get_country_names_for_forex_pair(self, forex_pair_str):
         """
@@ -395,66 +729,29 @@ class DataManager:
             country2 = self.bip_country_mapping.get(quote_curr)
 
             if country1 and country2:
-                print(f"[DataManager] Länder für {forex_pair_str}: {country1} (Basis: {base_curr}), {country2} (Quote: {quote_curr})")
+                logger.info("[DataManager] Länder für %s: %s (Basis: %s), %s (Quote: %s)", forex_pair_str, country1, base_curr, country2, quote_curr)
                 return country1, country2, base_curr, quote_curr
             else:
                 missing = []
                 if not country1: missing.append(base_curr)
                 if not country2: missing.append(quote_curr)
-                print(f"[DataManager] Länderzuordnung für Währung(en) {', '.join(missing)} in '{forex_pair_str}' nicht gefunden.")
+                logger.warning("[DataManager] Länderzuordnung für Währung(en) %s in '%s' nicht gefunden.", ', '.join(missing), forex_pair_str)
                 return None, None, None, None
         else:
-            print(f"[DataManager] Ungültiges Forex-Paar-Format: {forex_pair_str}. Erwartet 6 Zeichen (z.B. EURUSD).")
+            logger.warning("[DataManager] Ungültiges Forex-Paar-Format: %s. Erwartet 6 Zeichen (z.B. EURUSD).", forex_pair_str)
             return None, None, None, None
 
     def get_historical_price_data(self, ticker, start_date, end_date):
         """
-        Lädt historische Preisdaten (OHLCV) für einen gegebenen Ticker und Zeitraum mittels yfinance.
-        Diese Methode ist generischer als get_forex_data.
+        Lädt historische Preisdaten für einen gegebenen Ticker und Zeitraum (generischer als get_forex_data).
+        Liefert einen DataFrame mit 'Schlusskurs', wie ihn der SignalAnalyzer erwartet.
+        Liest zuerst aus dem lokalen Kursspeicher, nur fehlende Zeiträume werden via yfinance geladen.
         """
-        print(f"[DataManager] Lade historische Preisdaten für {ticker} von {start_date} bis {end_date} via yfinance.")
-        try:
-            # Lade Daten, progress=False um Terminal-Ausgaben zu reduzieren
-            # auto_adjust=True passt 'Close' für Dividenden/Splits an und liefert 'Adj Close' als 'Close'
-            data = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
-
-            if data.empty:
-                print(f"[DataManager] Keine Daten für {ticker} im Zeitraum {start_date}-{end_date} gefunden.")
-                return pd.DataFrame()
-
-            # yfinance mit auto_adjust=True liefert die angepassten Kurse bereits in den Standardspalten (Open, High, Low, Close)
-            # Wir benötigen primär 'Close' und stellen sicher, dass der Index ein DatetimeIndex ist.
-            if not isinstance(data.index, pd.DatetimeIndex):
-                data.index = pd.to_datetime(data.index)
-            data.index.name = 'Datum' # Indexname konsistent setzen
-
-            # Stelle sicher, dass wir eine 'Schlusskurs'-Spalte haben, die von SignalAnalyzer erwartet wird.
-            # PortfolioManager.get_current_price verwendet 'Close', daher muss diese Methode
-            # entweder den DataFrame mit 'Close' zurückgeben oder PortfolioManager angepasst werden.
-            # Für die Konsistenz mit get_forex_data und den Erwartungen des SignalAnalyzers,
-            # geben wir hier einen DataFrame mit 'Schlusskurs' zurück.
-            # PortfolioManager.get_current_price muss dann ggf. auch 'Schlusskurs' verwenden oder
-            # die Daten, die es cacht, entsprechend anpassen.
-            # Aktuell: SignalAnalyzer braucht 'Schlusskurs', PortfolioManager.get_current_price braucht 'Close'.
-            # Wir ändern get_historical_price_data so, dass es 'Schlusskurs' liefert für den Analyzer
-            # und passen Portfolio.get_current_price an, damit es auch 'Schlusskurs' aus dem Cache liest.
-
-            if 'Close' in data.columns:
-                processed_data = data[['Close']].copy()
-                processed_data.rename(columns={'Close': 'Schlusskurs'}, inplace=True)
-            elif 'close' in data.columns: # Fallback für kleingeschriebene Spaltennamen
-                processed_data = data[['close']].copy()
-                processed_data.rename(columns={'close': 'Schlusskurs'}, inplace=True)
-            else:
-                debug_print(f"[DataManager] FEHLER: Weder 'Close' noch 'close' Spalte in yfinance-Daten für {ticker} gefunden. Verfügbare Spalten: {data.columns.tolist()}")
-                return pd.DataFrame()
-
-            debug_print(f"[DataManager] Historische Preisdaten für {ticker} verarbeitet zu 'Schlusskurs'. Head:\n{processed_data.head().to_string()}")
-            return processed_data
-        except Exception as e:
-            debug_print(f"[DataManager] FEHLER beim Laden von historischen Preisdaten für {ticker} via yfinance: {e}")
-            import traceback # Für detaillierteren Fehler
-            debug_print(traceback.format_exc())
+        logger.info("[DataManager] Lade historische Preisdaten für %s von %s bis %s.", ticker, start_date, end_date)
+        processed_data = self._get_close_prices(ticker, start_date, end_date)
+        if processed_data.empty:
+            logger.warning("[DataManager] Keine Daten für %s im Zeitraum %s-%s gefunden.", ticker, start_date, end_date)
             return pd.DataFrame()
 
-print("DataManager Modul geladen.")
+        debug_print(f"[DataManager] Historische Preisdaten für {ticker} verarbeitet zu 'Schlusskurs'. Head:", processed_data)
+        return processed_data
@@ -0,0 +1,159 @@
+import os
+import pandas as pd
+from data_store import safe_file_stem, _atomic_write
+
+# Standardverzeichnis für dateibasierte Provider (Offline-Ersatz für yfinance)
+PROVIDER_DATA_PATH = 'data/provider/'
+
+
+def to_schlusskurs_frame(data):
+    """
+    Normalisiert einen Kurs-DataFrame (eine Spaltenebene) auf das Schema des SignalAnalyzers:
+    eine Spalte 'Schlusskurs', DatetimeIndex mit Namen 'Datum', ohne Zeilen ohne Kurs.
+    Gibt None zurück, wenn keine Schlusskurs-Spalte gefunden wird.
+    """
+    if data is None or data.empty:
+        return pd.DataFrame()
+
+    # Präferiere 'Close' (bei auto_adjust=True bereits angepasst), sonst 'Adj Close' oder kleingeschriebenes 'close'
+    selected_price_col = None
+    for col_option in ['Schlusskurs', 'Close', 'Adj Close', 'close']:
+        if col_option in data.columns:
+            selected_price_col = col_option
+            break
+    if not selected_price_col:
+        return None
+
+    processed_data = data[[selected_price_col]].copy()
+    processed_data.rename(columns={selected_price_col: 'Schlusskurs'}, inplace=True)
+    if not isinstance(processed_data.index, pd.DatetimeIndex):
+        processed_data.index = pd.to_datetime(processed_data.index)
+    processed_data.index.name = 'Datum' # Indexname konsistent setzen
+    return processed_data.dropna()
+
+
+class LiveDataProvider:
+    """
+    Live-Abruf über das Netzwerk (bisheriges Verhalten): Kurse über yfinance, BIP-Serien über
+    pandas_datareader (FRED). Jeder Provider bietet download_prices und fetch_gdp_series an.
+    """
+
+    def download_prices(self, tickers, start_date, end_date):
+        """
+        Lädt Kurse für alle Ticker in EINEM gebündelten yf.download-Aufruf für [start_date, end_date).
+        Gibt ein Dict {ticker: DataFrame mit 'Schlusskurs'} zurück. Ticker ohne Daten erhalten einen
+        leeren DataFrame; Ticker ohne erkennbare Kursspalte fehlen im Ergebnis.
+        """
+        import yfinance as yf # Erst beim ersten Abruf laden, hält den Modulimport schnell
+        tickers = list(tickers)
+        # Lade Daten, progress=False um Terminal-Ausgaben zu reduzieren
+        # auto_adjust=True passt 'Close' für Dividenden/Splits an und liefert 'Adj Close' als 'Close'
+        data = yf.download(tickers, start=start_date, end=end_date, progress=False, auto_adjust=True,
+                           group_by='column')
+
+        result = {}
+        if data is None or data.empty:
+            return {ticker: pd.DataFrame() for ticker in tickers}
+
+        if isinstance(data.columns, pd.MultiIndex):
+            # group_by='column' liefert (Preis, Ticker); jeden Ticker herausschneiden
+            available_tickers = set(data.columns.get_level_values(1))
+            for ticker in tickers:
+                if ticker not in available_tickers:
+                    result[ticker] = pd.DataFrame()
+                    continue
+                frame = to_schlusskurs_frame(data.xs(ticker, axis=1, level=1))
+                if frame is not None:
+                    result[ticker] = frame
+        elif len(tickers) == 1:
+            # Ältere yfinance-Versionen liefern für einen einzelnen Ticker flache Spalten
+            frame = to_schlusskurs_frame(data)
+            if frame is not None:
+                result[tickers[0]] = frame
+        return result
+
+    def fetch_gdp_series(self, series_id, start_date, end_date):
+        """Rohabruf einer FRED-Serie; liefert den DataFrame von DataReader (Spalte = series_id)."""
+        import pandas_datareader.data as pdr_web # Erst beim ersten Abruf laden
+        return pdr_web.DataReader(series_id, 'fred', start_date, end_date)
+
+
+def _replay_path(base_path, kind, key):
+    """Dateipfad einer aufgezeichneten Antwort: <base_path>/<kind>/<key>.csv"""
+    return f"{safe_file_stem(os.path.join(base_path, kind), key)}.csv"
+
+
+class RecordingDataProvider:
+    """
+    Leitet alle Abrufe an einen anderen Provider weiter (Standard: LiveDataProvider) und schreibt
+    die Antworten im Layout des ReplayDataProvider nach base_path. Bereits aufgezeichnete Kurse
+    werden mit neuen Zeiträumen zusammengeführt, sodass mehrere Läufe eine Aufnahme ergänzen.
+    """
+
+    def __init__(self, base_path=PROVIDER_DATA_PATH, inner_provider=None):
+        self.base_path = base_path
+        self.inner_provider = inner_provider if inner_provider is not None else LiveDataProvider()
+
+    def download_prices(self, tickers, start_date, end_date):
+        result = self.inner_provider.download_prices(tickers, start_date, end_date)
+        for ticker, frame in result.items():
+            if frame is None or frame.empty:
+                continue
+            path = _replay_path(self.base_path, 'prices', ticker)
+            if os.path.exists(path):
+                recorded = pd.read_csv(path, parse_dates=['Datum']).set_index('Datum')
+                frame = pd.concat([recorded, frame[['Schlusskurs']]])
+                frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+            self._write_recording(path, frame)
+        return result
+
+    def fetch_gdp_series(self, series_id, start_date, end_date):
+        gdp_data = self.inner_provider.fetch_gdp_series(series_id, start_date, end_date)
+        if gdp_data is not None and not gdp_data.empty:
+            path = _replay_path(self.base_path, 'gdp', series_id)
+            self._write_recording(path, gdp_data)
+        return gdp_data
+
+    def _write_recording(self, path, frame):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write(path, lambda tmp_path: frame.to_csv(tmp_path, index_label='Datum'))
+
+
+class ReplayDataProvider:
+    """
+    Dateibasierter Offline-Ersatz mit derselben Schnittstelle wie LiveDataProvider. Kein Netzwerkzugriff.
+    Liest pro Ticker eine CSV-Datei <base_path>/prices/<ticker>.csv mit den Spalten 'Datum' und
+    'Schlusskurs' (oder 'Close'), wie sie z.B. forex_data.csv verwendet, und pro FRED-Serie
+    <base_path>/gdp/<series_id>.csv. Beide werden z.B. vom RecordingDataProvider geschrieben.
+    """
+
+    def __init__(self, base_path=PROVIDER_DATA_PATH):
+        self.base_path = base_path
+
+    def _price_path(self, ticker):
+        return _replay_path(self.base_path, 'prices', ticker)
+
+    def download_prices(self, tickers, start_date, end_date):
+        result = {}
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        for ticker in tickers:
+            path = self._price_path(ticker)
+            if not os.path.exists(path):
+                result[ticker] = pd.DataFrame()
+                continue
+            daten = pd.read_csv(path, parse_dates=['Datum'])
+            daten.set_index('Datum', inplace=True)
+            frame = to_schlusskurs_frame(daten.sort_index())
+            if frame is not None:
+                result[ticker] = frame[(frame.index >= start) & (frame.index < end)]
+        return result
+
+    def fetch_gdp_series(self, series_id, start_date, end_date):
+        path = _replay_path(self.base_path, 'gdp', series_id)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        daten = pd.read_csv(path, parse_dates=['Datum'])
+        daten.set_index('Datum', inplace=True)
+        daten.sort_index(inplace=True)
+        return daten[(daten.index >= pd.Timestamp(start_date)) & (daten.index <= pd.Timestamp(end_date))]
@@ -0,0 +1,637 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import importlib.util
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+# Verzeichnis des lokalen Kursspeichers (eine Datei pro Ticker)
+PRICE_STORE_PATH = 'data/price_store/'
+# Verzeichnis des BIP-Caches (eine Datei pro FRED-Serien-ID) und Standard-Gültigkeitsdauer
+GDP_CACHE_PATH = 'data/gdp_cache/'
+GDP_CACHE_TTL_HOURS = 24
+# Verzeichnis der Point-in-Time-BIP-Tabelle (Veröffentlichungsstände pro Land)
+GDP_VINTAGE_PATH = 'data/gdp_vintages/'
+# Verzeichnis der memory-mapped Kursmatrix (Datum x Ticker) für das gesamte Universum
+PRICE_MATRIX_PATH = 'data/price_matrix/'
+# Saisonalitäts-Würfel pro Ticker (verschiedene Kurszeiträume), die auf der Festplatte bleiben
+SEASONALITY_CUBES_PER_TICKER = 8
+
+# Parquet benötigt pyarrow oder fastparquet. Ohne Engine wird auf Pickle ausgewichen,
+# damit der Speicher auch in minimalen Umgebungen funktioniert.
+if importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet'):
+    PRICE_STORE_FORMAT = 'parquet'
+else:
+    PRICE_STORE_FORMAT = 'pickle'
+
+
+def _atomic_write(path, write_func):
+    """Schreibt über eine temporäre Datei und ersetzt das Ziel erst danach (kein halb geschriebener Stand)."""
+    # Prozess- und Thread-ID im Namen, damit parallele Schreiber sich nicht die Temp-Datei teilen
+    tmp_path = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+    write_func(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def safe_file_stem(base_path, key):
+    # Schlüssel wie "^SPX" oder "EURUSD=X" in sichere Dateinamen umwandeln
+    return os.path.join(base_path, re.sub(r'[^A-Za-z0-9._-]', '_', key))
+
+
+def _frame_extension(file_format):
+    return 'parquet' if file_format == 'parquet' else 'pkl'
+
+
+def _write_frame(path, frame, file_format):
+    if file_format == 'parquet':
+        _atomic_write(path, frame.to_parquet)
+    else:
+        _atomic_write(path, frame.to_pickle)
+
+
+def _read_frame(path, file_format):
+    """Liest einen gespeicherten DataFrame, leerer DataFrame falls nicht vorhanden oder unlesbar."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    try:
+        if file_format == 'parquet':
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+    except Exception:
+        return pd.DataFrame()
+
+
+def _write_json(path, payload):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, indent=2)
+    _atomic_write(path, write)
+
+
+class SingleFlight:
+    """
+    Fasst gleichzeitige Anfragen mit demselben Schlüssel zu einem einzigen Aufruf zusammen:
+    Während ein Abruf für einen Schlüssel läuft, warten alle weiteren Aufrufer auf dasselbe Future
+    und erhalten dasselbe Ergebnis (bzw. dieselbe Exception).
+    Thread-sicher; beim Pickeln (z.B. für Process-Pools) wird ein leerer Zustand übertragen,
+    jeder Prozess koordiniert also seine eigenen Threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+
+class PriceStore:
+    """
+    Persistenter, spaltenorientierter Speicher für Schlusskurse (Parquet pro Ticker).
+    Zusätzlich wird pro Ticker festgehalten, welche Zeiträume bereits abgefragt wurden,
+    damit Wochenenden/Feiertage ohne Kurs nicht bei jedem Lauf erneut geladen werden.
+    Zeiträume sind wie bei yfinance halboffen: [start, end).
+    """
+
+    def __init__(self, base_path=PRICE_STORE_PATH, file_format=PRICE_STORE_FORMAT):
+        self.base_path = base_path
+        self.file_format = file_format
+        self._merge_lock = threading.Lock() # Lesen-Ändern-Schreiben pro Prozess serialisieren
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_merge_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._merge_lock = threading.Lock()
+
+    def _file_stem(self, ticker):
+        return safe_file_stem(self.base_path, ticker)
+
+    def _data_path(self, ticker):
+        return f"{self._file_stem(ticker)}.{_frame_extension(self.file_format)}"
+
+    def _coverage_path(self, ticker):
+        return f"{self._file_stem(ticker)}.coverage.json"
+
+    def _load_coverage(self, ticker):
+        path = self._coverage_path(ticker)
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, 'r') as f:
+                raw = json.load(f)
+            return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in raw.get('coverage', [])]
+        except (json.JSONDecodeError, OSError, ValueError):
+            return [] # Defekte Metadaten -> alles neu laden
+
+    def load(self, ticker):
+        """Gibt alle gespeicherten Kurse eines Tickers zurück (leerer DataFrame, falls keine vorhanden)."""
+        return _read_frame(self._data_path(ticker), self.file_format)
+
+    def missing_ranges(self, ticker, start_date, end_date):
+        """
+        Liefert die Teilzeiträume von [start_date, end_date), die noch nicht abgefragt wurden,
+        als Liste von (start, end)-Timestamps.
+        """
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        missing = []
+        cursor = start
+        for cov_start, cov_end in self._load_coverage(ticker):
+            if cov_end <= cursor:
+                continue
+            if cov_start >= end:
+                break
+            if cov_start > cursor:
+                missing.append((cursor, cov_start))
+            cursor = max(cursor, cov_end)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def merge(self, ticker, new_data, start_date, end_date):
+        """
+        Fügt neu geladene Kurse für [start_date, end_date) in den Speicher ein und markiert den
+        Zeitraum als abgedeckt. Der laufende Tag wird nie als abgedeckt markiert, da sein Kurs
+        sich noch ändern kann.
+        """
+        with self._merge_lock:
+            self._merge_unlocked(ticker, new_data, start_date, end_date)
+
+    def _merge_unlocked(self, ticker, new_data, start_date, end_date):
+        existing = self.load(ticker)
+        if new_data is not None and not new_data.empty:
+            new_data = new_data.copy()
+            if new_data.index.tz is not None:
+                new_data.index = new_data.index.tz_localize(None)
+            combined = pd.concat([existing, new_data]) if not existing.empty else new_data
+            combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+            combined.index.name = 'Datum'
+        else:
+            combined = existing
+
+        os.makedirs(self.base_path, exist_ok=True)
+        if not combined.empty:
+            _write_frame(self._data_path(ticker), combined, self.file_format)
+
+        cov_end = min(pd.Timestamp(end_date).normalize(), pd.Timestamp.today().normalize())
+        intervals = self._load_coverage(ticker)
+        if pd.Timestamp(start_date).normalize() < cov_end:
+            intervals.append((pd.Timestamp(start_date).normalize(), cov_end))
+        intervals.sort()
+        merged = []
+        for s, e in intervals: # Überlappende oder aneinandergrenzende Intervalle zusammenfassen
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        payload = {'ticker': ticker,
+                   'coverage': [[s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')] for s, e in merged]}
+        _write_json(self._coverage_path(ticker), payload)
+
+    def read(self, ticker, start_date, end_date):
+        """Liest die gespeicherten Kurse für [start_date, end_date)."""
+        data = self.load(ticker)
+        if data.empty:
+            return data
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        return data[(data.index >= start) & (data.index < end)].copy()
+
+
+def frame_fingerprint(data):
+    """Inhalts-Fingerabdruck eines DataFrames/einer Serie (Index und Werte), z.B. als Cache-Schlüssel."""
+    digest = hashlib.sha1()
+    digest.update(np.asarray(data.index.values.astype('datetime64[ns]')).view(np.int64).tobytes())
+    digest.update(np.ascontiguousarray(data.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class SeasonalityCubeCache:
+    """
+    Speichert vorberechnete Saisonalitäts-Würfel (Mittelwerte pro Wochentag, ISO-Woche, Monat und
+    Monatstag) neben dem Kursspeicher, eine Datei pro Ticker und Kursdaten-Fingerabdruck
+    (<ticker>.<fingerabdruck>.seasonality.npz, siehe frame_fingerprint). So verdrängen sich Läufe über
+    verschiedene Zeiträume nicht gegenseitig; pro Ticker bleiben die max_per_ticker jüngsten Dateien.
+    """
+
+    def __init__(self, base_path=PRICE_STORE_PATH, max_per_ticker=SEASONALITY_CUBES_PER_TICKER):
+        self.base_path = base_path
+        self.max_per_ticker = max_per_ticker
+
+    def _path(self, ticker, fingerprint):
+        return f"{safe_file_stem(self.base_path, ticker)}.{fingerprint[:16]}.seasonality.npz"
+
+    def _files(self, ticker):
+        """Vorhandene Würfel-Dateien eines Tickers, älteste zuerst."""
+        stem = os.path.basename(safe_file_stem(self.base_path, ticker))
+        pattern = re.compile(re.escape(stem) + r'\.[0-9a-f]{16}\.seasonality\.npz$')
+        try:
+            names = [name for name in os.listdir(self.base_path) if pattern.match(name)]
+        except OSError:
+            return []
+        paths = [os.path.join(self.base_path, name) for name in names]
+        return sorted(paths, key=lambda path: os.path.getmtime(path))
+
+    def get(self, ticker, fingerprint):
+        """Gibt {granularitaet: np.ndarray} zurück oder None, falls kein passender Eintrag existiert."""
+        path = self._path(ticker, fingerprint)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as daten:
+                if str(daten['fingerprint']) != fingerprint:
+                    return None
+                return {name: daten[name] for name in daten.files if name != 'fingerprint'}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, ticker, fingerprint, wuerfel):
+        os.makedirs(self.base_path, exist_ok=True)
+
+        def write(tmp_path):
+            # Dateiobjekt statt Pfad, sonst hängt np.savez ".npz" an den Temp-Namen an
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, fingerprint=np.array(fingerprint), **wuerfel)
+
+        _atomic_write(self._path(ticker, fingerprint), write)
+        for path in self._files(ticker)[:-self.max_per_ticker]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass # Parallel bereits entfernt
+
+
+class GdpSeriesCache:
+    """
+    Persistenter Cache für BIP-Zeitreihen, geschlüsselt nach FRED-Serien-ID.
+    Zu jeder Serie wird ein "as_of"-Zeitstempel (Zeitpunkt des Abrufs) gespeichert; ein Eintrag gilt
+    nur innerhalb der konfigurierbaren TTL als aktuell. Quartalsdaten ändern sich nur wenige Male
+    im Jahr, daher reicht standardmäßig ein Abruf pro Tag.
+    """
+
+    def __init__(self, base_path=GDP_CACHE_PATH, ttl_hours=GDP_CACHE_TTL_HOURS, file_format=PRICE_STORE_FORMAT):
+        self.base_path = base_path
+        self.ttl = pd.Timedelta(hours=ttl_hours)
+        self.file_format = file_format
+
+    def _data_path(self, series_id):
+        return f"{safe_file_stem(self.base_path, series_id)}.{_frame_extension(self.file_format)}"
+
+    def _meta_path(self, series_id):
+        return f"{safe_file_stem(self.base_path, series_id)}.meta.json"
+
+    def get_meta(self, series_id):
+        """Gibt die Metadaten (series_id, as_of, start, end) eines Eintrags zurück oder None."""
+        path = self._meta_path(series_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def get(self, series_id, start_date, end_date):
+        """
+        Liefert die gecachte Serie für [start_date, end_date], falls sie innerhalb der TTL abgerufen wurde
+        und den angefragten Beginn abdeckt. Sonst None.
+        """
+        meta = self.get_meta(series_id)
+        if meta is None:
+            return None
+        try:
+            as_of = pd.Timestamp(meta['as_of'])
+            cached_start = pd.Timestamp(meta['start'])
+        except (KeyError, ValueError):
+            return None
+        if pd.Timestamp.now() - as_of > self.ttl or cached_start > pd.Timestamp(start_date):
+            return None
+
+        data = _read_frame(self._data_path(series_id), self.file_format)
+        if data.empty:
+            return None
+        return data[(data.index >= pd.Timestamp(start_date)) & (data.index <= pd.Timestamp(end_date))].copy()
+
+    def put(self, series_id, data, start_date, end_date):
+        """Speichert eine abgerufene Serie zusammen mit dem aktuellen Zeitpunkt als "as_of"."""
+        if data is None or data.empty:
+            return
+        os.makedirs(self.base_path, exist_ok=True)
+        _write_frame(self._data_path(series_id), data, self.file_format)
+        _write_json(self._meta_path(series_id), {
+            'series_id': series_id,
+            'as_of': pd.Timestamp.now().isoformat(),
+            'start': pd.Timestamp(start_date).strftime('%Y-%m-%d'),
+            'end': pd.Timestamp(end_date).strftime('%Y-%m-%d'),
+        })
+
+
+class CountryGdpRegistry:
+    """
+    Thread-sicheres In-Process-Register der BIP-Serien pro Land.
+    Jeder Eintrag ist ein Dict mit 'series' (pd.Series), 'origin' ('api', 'provisional' oder
+    'generic_csv'), 'source' (z.B. "fred:GDPC1" oder Dateipfad) und 'loaded_at'.
+    Ein Land wird pro Prozess nur einmal geladen, egal in wie vielen Paaren es vorkommt.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._country_locks = {}
+
+    def __getstate__(self):
+        return {'_entries': dict(self._entries)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._entries.update(state['_entries'])
+
+    def get(self, country_name):
+        return self._entries.get(country_name)
+
+    def get_or_load(self, country_name, loader):
+        """
+        Gibt den Eintrag für country_name zurück und ruft loader(country_name) nur beim ersten Zugriff auf.
+        Gleichzeitige Anfragen für dasselbe Land warten auf denselben Ladevorgang.
+        Fehlgeschlagene Ladevorgänge (loader gibt None zurück) werden nicht festgeschrieben.
+        """
+        entry = self._entries.get(country_name)
+        if entry is not None:
+            return entry
+        with self._lock:
+            country_lock = self._country_locks.setdefault(country_name, threading.Lock())
+        with country_lock:
+            entry = self._entries.get(country_name)
+            if entry is None:
+                entry = loader(country_name)
+                if entry is not None:
+                    self._entries[country_name] = entry
+            return entry
+
+    def countries(self):
+        return list(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PointInTimeGdpStore:
+    """
+    Point-in-Time-Tabelle der BIP-Werte: pro Land Zeilen (Referenzquartal, Veröffentlichung, Wert).
+    Jede Zeile ist ein Veröffentlichungsstand ("Vintage"); eine Revision desselben Quartals wird als
+    neue Zeile mit späterem Veröffentlichungsdatum angehängt. as_of(land, datum) liefert, was an einem
+    Tag bekannt war: pro Quartal der letzte Stand mit Veröffentlichung <= datum.
+    Spalte 'Geschaetzt' markiert Stände, deren Veröffentlichung nur aus dem Veröffentlichungsverzug
+    abgeleitet ist (kein bekanntes Datum); ältere Dateien ohne diese Spalte gelten als geschätzt.
+    Referenzquartale werden auf den Quartalsanfang normiert (FRED: Quartalsanfang, CSVs teils Quartalsende).
+    Mit base_path wird pro Land eine Datei gespeichert, sodass Revisionen über Läufe hinweg erhalten bleiben.
+    """
+    QUARTER_COLUMN = 'Referenzquartal'
+    RELEASE_COLUMN = 'Veroeffentlicht'
+    VALUE_COLUMN = 'Wert'
+    ESTIMATED_COLUMN = 'Geschaetzt'
+
+    def __init__(self, base_path=GDP_VINTAGE_PATH, file_format=PRICE_STORE_FORMAT):
+        self.base_path = base_path
+        self.file_format = file_format
+        self._tables = {} # Land -> (quartal_ns, veroeffentlicht_ns, wert, geschaetzt), sortiert nach (Quartal, Veröffentlichung)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'base_path': self.base_path, 'file_format': self.file_format, '_tables': dict(self._tables)}
+
+    def __setstate__(self, state):
+        self.__init__(state['base_path'], state['file_format'])
+        self._tables.update(state['_tables'])
+
+    def _path(self, country_name):
+        return f"{safe_file_stem(self.base_path, country_name)}.vintages.{_frame_extension(self.file_format)}"
+
+    @staticmethod
+    def _quarter_start_ns(dates):
+        quarters = pd.DatetimeIndex(dates).to_period('Q').start_time
+        return quarters.values.astype('datetime64[ns]').view(np.int64)
+
+    def _table(self, country_name):
+        table = self._tables.get(country_name)
+        if table is None and self.base_path:
+            frame = _read_frame(self._path(country_name), self.file_format)
+            if not frame.empty:
+                table = (frame[self.QUARTER_COLUMN].values.astype('datetime64[ns]').view(np.int64),
+                         frame[self.RELEASE_COLUMN].values.astype('datetime64[ns]').view(np.int64),
+                         frame[self.VALUE_COLUMN].to_numpy(dtype=np.float64),
+                         frame[self.ESTIMATED_COLUMN].to_numpy(dtype=bool) if self.ESTIMATED_COLUMN in frame
+                         else np.ones(len(frame), dtype=bool))
+                self._tables[country_name] = table
+        return table
+
+    def record(self, country_name, series, publication_lag=None, release_dates=None, seen_at=None):
+        """
+        Übernimmt eine abgerufene BIP-Serie (Index = Beobachtungsdatum). Neue Quartale erhalten als
+        Veröffentlichung release_dates (gleich lang wie series, falls bekannt; NaT = unbekannt), sonst
+        Quartalsanfang + publication_lag (als geschätzt markiert), höchstens seen_at (Zeitpunkt des
+        Abrufs, Standard: jetzt). Weicht ein bekanntes Quartal vom letzten Stand ab, wird es als Revision
+        mit Veröffentlichung seen_at angehängt. Gibt die Anzahl neuer Zeilen zurück.
+        """
+        present = series.notna().to_numpy()
+        if not present.any():
+            return 0
+        seen_at_ns = pd.Timestamp(seen_at if seen_at is not None else pd.Timestamp.now()).value
+        quarters = self._quarter_start_ns(series.index[present])
+        values = series.to_numpy(dtype=np.float64)[present]
+        releases = quarters + pd.Timedelta(publication_lag or 0).value
+        estimated = np.ones(len(quarters), dtype=bool)
+        if release_dates is not None:
+            given = pd.DatetimeIndex(release_dates)[present]
+            estimated = np.asarray(given.isna())
+            releases = np.where(estimated, releases, given.values.astype('datetime64[ns]').view(np.int64))
+        releases = np.minimum(releases, seen_at_ns)
+
+        with self._lock:
+            table = self._table(country_name)
+            if table is None:
+                new_rows = np.ones(len(quarters), dtype=bool)
+            else:
+                known_quarters, known_releases, known_values = table[:3]
+                latest = np.r_[known_quarters[1:] != known_quarters[:-1], True] # letzter Stand je Quartal
+                position = np.searchsorted(known_quarters[latest], quarters)
+                known = position < latest.sum()
+                known[known] = known_quarters[latest][position[known]] == quarters[known]
+                revised = np.zeros(len(quarters), dtype=bool)
+                revised[known] = ~np.isclose(known_values[latest][position[known]], values[known], rtol=1e-12, atol=0.0)
+                # Revisionen gelten ab dem Abruf, frühestens nach dem bisherigen Stand
+                releases[revised] = np.maximum(seen_at_ns, known_releases[latest][position[revised]] + 1)
+                estimated[revised] = False # beobachtet beim Abruf
+                new_rows = ~known | revised
+            if not new_rows.any():
+                return 0
+            columns = [quarters[new_rows], releases[new_rows], values[new_rows], estimated[new_rows]]
+            if table is not None:
+                columns = [np.concatenate([known, new]) for known, new in zip(table, columns)]
+            order = np.lexsort((columns[1], columns[0]))
+            table = tuple(column[order] for column in columns)
+            self._tables[country_name] = table
+            if self.base_path:
+                os.makedirs(self.base_path, exist_ok=True)
+                _write_frame(self._path(country_name), self._to_frame(table), self.file_format)
+            return int(new_rows.sum())
+
+    def _to_frame(self, table):
+        return pd.DataFrame({self.QUARTER_COLUMN: table[0].view('datetime64[ns]'),
+                             self.RELEASE_COLUMN: table[1].view('datetime64[ns]'),
+                             self.VALUE_COLUMN: table[2],
+                             self.ESTIMATED_COLUMN: table[3]})
+
+    def vintages(self, country_name):
+        """Alle Veröffentlichungsstände eines Landes als DataFrame (leer, falls unbekannt)."""
+        with self._lock:
+            table = self._table(country_name)
+        return self._to_frame(table) if table is not None else pd.DataFrame()
+
+    def as_of(self, country_name, as_of_date):
+        """
+        Stand vom as_of_date: DataFrame mit Index 'Datum' (Referenzquartal) und den Spalten 'Wert',
+        'Veroeffentlicht' (Veröffentlichung des verwendeten Stands) und 'Geschaetzt'. Leer, falls für
+        das Land keine Stände vorliegen. Liegt as_of_date vor dem ersten erfassten Stand, wird ein
+        ValueError ausgelöst (die Tabelle deckt den Zeitpunkt nicht ab, "nichts bekannt" wäre falsch).
+        """
+        with self._lock:
+            table = self._table(country_name)
+        if table is None:
+            return pd.DataFrame(columns=[self.VALUE_COLUMN, self.RELEASE_COLUMN, self.ESTIMATED_COLUMN])
+        quarters, releases, values, estimated = table
+        as_of_ns = pd.Timestamp(as_of_date).value
+        if as_of_ns < releases.min():
+            raise ValueError(f"Keine BIP-Stände für '{country_name}' zum {as_of_date}: erster erfasster Stand "
+                             f"vom {pd.Timestamp(releases.min()).date()}.")
+        visible = np.flatnonzero(releases <= as_of_ns)
+        # Zeilen sind nach (Quartal, Veröffentlichung) sortiert: je Quartal die letzte sichtbare Zeile
+        visible = visible[np.r_[quarters[visible][1:] != quarters[visible][:-1], True]] if len(visible) else visible
+        index = pd.DatetimeIndex(quarters[visible].view('datetime64[ns]'), name='Datum')
+        return pd.DataFrame({self.VALUE_COLUMN: values[visible],
+                             self.RELEASE_COLUMN: releases[visible].view('datetime64[ns]'),
+                             self.ESTIMATED_COLUMN: estimated[visible]}, index=index)
+
+    def countries(self):
+        return list(self._tables.keys())
+
+
+class PriceMatrix:
+    """
+    Ausgerichtete Schlusskurs-Matrix (Datum x Ticker, float64) als memory-mapped .npy-Datei.
+    Die Matrix wird spaltenweise (Fortran-Order) gespeichert, sodass die Kursreihe eines Tickers
+    zusammenhängend im Speicher liegt und ohne Kopie ausgeschnitten werden kann. Fehlende Kurse
+    (z.B. Feiertage eines einzelnen Marktes) sind NaN.
+    Begleitdateien: dates.npy (int64 Nanosekunden) und tickers.json (Ticker -> Spaltenindex).
+    Die Matrix ist ein Schnappschuss des Kursspeichers und wird bei Bedarf neu gebaut.
+    """
+    MATRIX_FILE = 'close.npy'
+    DATES_FILE = 'dates.npy'
+    TICKERS_FILE = 'tickers.json'
+
+    def __init__(self, base_path=PRICE_MATRIX_PATH):
+        self.base_path = base_path
+        self.values = np.load(os.path.join(base_path, self.MATRIX_FILE), mmap_mode='r')
+        self.dates = np.load(os.path.join(base_path, self.DATES_FILE), mmap_mode='r')
+        with open(os.path.join(base_path, self.TICKERS_FILE)) as f:
+            self.ticker_columns = json.load(f)['columns']
+
+    @classmethod
+    def build(cls, price_frames, base_path=PRICE_MATRIX_PATH):
+        """
+        Baut die Matrix aus {ticker: DataFrame mit 'Schlusskurs'} (z.B. DataManager.get_bulk_price_data)
+        und gibt die memory-mapped Instanz zurück. Die Zeilen sind die Vereinigung aller Handelstage.
+        """
+        os.makedirs(base_path, exist_ok=True)
+        tickers = [ticker for ticker, frame in price_frames.items() if frame is not None and not frame.empty]
+        date_index = pd.DatetimeIndex([])
+        for ticker in tickers:
+            date_index = date_index.union(price_frames[ticker].index)
+        if date_index.tz is not None:
+            date_index = date_index.tz_localize(None)
+
+        def write_matrix(tmp_path):
+            matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64,
+                                               shape=(len(date_index), len(tickers)), fortran_order=True)
+            for col, ticker in enumerate(tickers):
+                closes = price_frames[ticker]['Schlusskurs']
+                closes = closes[~closes.index.duplicated(keep='last')]
+                matrix[:, col] = closes.reindex(date_index).to_numpy(dtype=np.float64)
+            matrix.flush()
+            del matrix
+
+        # Über Temp-Dateien schreiben, damit laufende Leser nie eine halb geschriebene Matrix sehen
+        _atomic_write(os.path.join(base_path, cls.MATRIX_FILE), write_matrix)
+        def write_dates(tmp_path):
+            # Dateiobjekt statt Pfad übergeben, sonst hängt np.save ".npy" an den Temp-Namen an
+            with open(tmp_path, 'wb') as f:
+                np.save(f, date_index.values.astype('datetime64[ns]').view(np.int64))
+
+        _atomic_write(os.path.join(base_path, cls.DATES_FILE), write_dates)
+        _write_json(os.path.join(base_path, cls.TICKERS_FILE),
+                    {'columns': {ticker: col for col, ticker in enumerate(tickers)}})
+        return cls(base_path)
+
+    @property
+    def tickers(self):
+        return list(self.ticker_columns)
+
+    def __contains__(self, ticker):
+        return ticker in self.ticker_columns
+
+    def column(self, ticker):
+        """Zusammenhängende Kursspalte eines Tickers als NumPy-View auf die Datei (keine Kopie)."""
+        return self.values[:, self.ticker_columns[ticker]]
+
+    def date_index(self):
+        return pd.DatetimeIndex(np.asarray(self.dates).view('datetime64[ns]'), name='Datum')
+
+    def frame(self, ticker):
+        """Kurse eines Tickers im Schema des SignalAnalyzers ('Schlusskurs', Index 'Datum'), ohne NaN-Zeilen."""
+        closes = self.column(ticker)
+        valid = ~np.isnan(closes)
+        return pd.DataFrame({'Schlusskurs': closes[valid]}, index=self.date_index()[valid])
+
+    def price_on_or_before(self, ticker, date):
+        """Letzter gültiger Kurs am oder vor date (None, falls keiner existiert)."""
+        closes = self.column(ticker)
+        query = pd.Timestamp(date)
+        if query.tzinfo is not None:
+            query = query.tz_localize(None)
+        row = int(np.searchsorted(self.dates, query.value, side='right')) - 1
+        while row >= 0 and np.isnan(closes[row]): # Feiertage dieses Tickers überspringen
+            row -= 1
+        return float(closes[row]) if row >= 0 else None
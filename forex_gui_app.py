@@ -2,12 +2,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 from data_manager import DataManager # Importieren
-from signal_analyzer import SignalAnalyzer, set_debug_output_callback as analyzer_set_debug_callback, compare_gdp_momentum
+from signal_analyzer import SignalAnalyzer, compare_gdp_momentum, richte_signal_aus
+from app_logging import set_output_callback
 import threading
-from matplotlib.figure import Figure # Importieren
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk # Importieren
 import pandas as pd # Für leere BIP-Series im Fehlerfall in _run_analyse_prozess
 from backtester import Backtester # <--- NEUER IMPORT
+from result_cache import RESULT_CACHE
+from portfolio_manager import SHARED_PRICE_CACHE, price_source_key
 import json # For saving/loading presets
 import os # For checking file existence
 
@@ -59,14 +60,16 @@ FOREX_PAIR_DISPLAY_NAMES = [p["display"] for p in FOREX_PAIRS_CONFIG]
 
 
 class ForexApp:
-    def __init__(self, root):
+    def __init__(self, root, data_provider=None):
         self.root = root
         self.root.title("Forex Signal Generator GUI")
         self.root.minsize(800, 600)
         self.root.geometry("1200x800")
 
         # DataManager und SignalAnalyzer Instanzen (werden bei Bedarf erstellt)
-        self.data_manager = DataManager()
+        # data_provider: Datenquelle für DataManager und Backtester (Standard: live über yfinance/FRED)
+        self.data_provider = data_provider
+        self.data_manager = DataManager(data_provider=data_provider)
         self.signal_analyzer = None # Wird mit aktuellen Schwellenwerten bei Analyse neu erstellt
 
         # Analyseergebnisse speichern
@@ -197,7 +200,9 @@ class ForexApp:
         plot_frame = ttk.LabelFrame(output_frame, text="Analyse-Chart", padding="5")
         plot_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        # Matplotlib Figure und Canvas erstellen
+        # Matplotlib Figure und Canvas erstellen (matplotlib erst hier laden, nicht beim Modulimport)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
         self.plot_figure = Figure(figsize=(8, 6), dpi=150) # Erhöhte DPI für höhere Auflösung
         self.plot_canvas = FigureCanvasTkAgg(self.plot_figure, master=plot_frame)
         self.canvas_widget = self.plot_canvas.get_tk_widget()
@@ -222,8 +227,9 @@ class ForexApp:
         debug_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.debug_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Setze den Debug-Callback für den SignalAnalyzer einmalig nach Initialisierung der GUI-Komponenten
-        analyzer_set_debug_callback(self.log_message)
+        # Leite den Logger-Baum "forex" (Analyse, Daten, Portfolio) einmalig nach Initialisierung der GUI-Komponenten
+        # ins Debug-Textfeld statt auf die Konsole
+        set_output_callback(self.log_message)
 
         # Lade Presets und App-Konfiguration beim Start
         self._load_app_config_file() # Muss vor _load_presets_from_file sein, falls presets leer ist und wir defaults brauchen
@@ -235,7 +241,7 @@ class ForexApp:
         self.log_message("ForexApp GUI initialisiert und Layout erstellt.")
 
         # Backtester Instanz
-        self.backtester = Backtester(gui_log_callback=self.log_message)
+        self.backtester = Backtester(gui_log_callback=self.log_message, data_provider=self.data_provider)
 
 
     # --- Preset Kernlogik ---
@@ -384,10 +390,7 @@ class ForexApp:
     # --- Ende Preset und App Config Datei-Hilfsfunktionen ---
 
     def log_message(self, message):
-        """Schreibt eine Nachricht in das Debug-Textfeld und die Konsole."""
-        # Print to console as well for reliable full log
-        print(f"[GUI DEBUG] {message}")
-
+        """Schreibt eine Nachricht in das Debug-Textfeld."""
         if self.debug_text:
             self.debug_text.config(state=tk.NORMAL)
             self.debug_text.insert(tk.END, message + "\n")
@@ -472,7 +475,10 @@ class ForexApp:
             self.current_gdp_short_thresh = gdp_short_threshold
 
             self.log_message(f"Datenabruf für {forex_pair_code} ({start_date} bis {end_date}).")
-            self.forex_data_df = self.data_manager.get_forex_data(forex_pair_code, start_date, end_date)
+            self.forex_data_df = SHARED_PRICE_CACHE.frame( # Gemeinsamer Kurs-Cache mit dem Backtester
+                forex_pair_code, start_date, end_date,
+                lambda: self.data_manager.get_forex_data(forex_pair_code, start_date, end_date),
+                source=price_source_key(self.data_manager))
 
             if self.forex_data_df is None or self.forex_data_df.empty:
                 self.log_message(f"Keine Forex-Daten für {forex_pair_code} erhalten. Analyse abgebrochen.")
@@ -488,7 +494,7 @@ class ForexApp:
 
             # Store all GDP momentum outputs for plotting
             self.gdp_momentum_outputs = None # (mom_a, mom_b, diff, signal_series_raw)
-            self.gdp_momentum_signal_aligned_to_forex = pd.Series(index=self.forex_data_df.index, data=0, name="GDP_Momentum_Signal_Aligned")
+            self.gdp_momentum_signal_aligned_to_forex = richte_signal_aus(None, self.forex_data_df.index, name="GDP_Momentum_Signal_Aligned")
 
 
             if self.bip_data_df is None or self.bip_data_df.empty or not self.bip_plot_col_country1 or not self.bip_plot_col_country2:
@@ -509,8 +515,8 @@ class ForexApp:
                     gdp_series_b=gdp_series_b,
                     n_periods_growth=n_periods_for_gdp_growth, # z.B. 4 für YoY bei Quartalsdaten
                     long_threshold=gdp_long_threshold,
-                    short_threshold=gdp_short_threshold
-                    # debug_callback=self.log_message # Entfernt
+                    short_threshold=gdp_short_threshold,
+                    result_cache=RESULT_CACHE # Wiederholte Analysen und der Backtest nutzen dasselbe Ergebnis
                 )
                 self.gdp_momentum_outputs = (gdp_mom_a, gdp_mom_b, gdp_mom_diff, gdp_signal_raw)
 
@@ -521,20 +527,20 @@ class ForexApp:
                     # self.log_message(f"Momentum Differenz:\n{gdp_mom_diff.tail().to_string()}")
                     # self.log_message(f"GDP Signale (roh):\n{gdp_signal_raw[gdp_signal_raw.notna()].to_string()}")
 
-                    # Reindex GDP signal to Forex data frequency
-                    self.gdp_momentum_signal_aligned_to_forex = gdp_signal_raw.reindex(self.forex_data_df.index, method='ffill')
-                    self.gdp_momentum_signal_aligned_to_forex.bfill(inplace=True) # Fülle auch am Anfang, falls GDP-Daten später starten (Modern pandas)
-                    self.gdp_momentum_signal_aligned_to_forex.fillna(0, inplace=True) # Falls immer noch NaNs, mit 0 füllen (neutral)
-                                                                                        # Wichtig: Konvertiere 'long'/'short' zu 0, falls sie nicht durch ffill/bfill ersetzt wurden.
-                                                                                        # Die Umwandlung in numerisch (1, -1, 0) passiert in generiere_signale.
-                    self.gdp_momentum_signal_aligned_to_forex.name = "GDP_Momentum_Signal_Aligned"
+                    # GDP-Signal (int8, Quartalsfrequenz) per As-of-Join auf die Forex-Datenfrequenz bringen:
+                    # ein Quartalssignal gilt erst ab seiner Veröffentlichung, davor ist es neutral.
+                    publication_lag = self.data_manager.get_gdp_publication_lag(country1, country2)
+                    self.gdp_momentum_signal_aligned_to_forex = richte_signal_aus(
+                        gdp_signal_raw, self.forex_data_df.index, name="GDP_Momentum_Signal_Aligned",
+                        publikationsverzug=publication_lag)
                     self.log_message("GDP Momentum Signale an Forex-Daten Frequenz angeglichen.")
                 else:
                     self.log_message("Keine GDP Momentum Rohsignale von compare_gdp_momentum erhalten oder Signale sind leer. Verwende neutrales Signal (0).")
 
             # Initialisiere SignalAnalyzer (hat jetzt keine BIP-spezifischen Schwellen mehr in config)
-            self.signal_analyzer = SignalAnalyzer(config=analyzer_config_dict) # analyzer_config_dict enthält nur Saisonalität
-            self.saisonalitaet_series = self.signal_analyzer.berechne_saisonalitaet(self.forex_data_df)
+            self.signal_analyzer = SignalAnalyzer(config=analyzer_config_dict, seasonality_cache=self.data_manager.seasonality_cache,
+                                                  result_cache=RESULT_CACHE) # analyzer_config_dict enthält nur Saisonalität
+            self.saisonalitaet_series = self.signal_analyzer.berechne_saisonalitaet(self.forex_data_df, ticker=forex_pair_code)
 
             # Generiere finale Signale mit dem neuen gdp_momentum_signal_aligned_to_forex
             self.final_signals_series = self.signal_analyzer.generiere_signale(
@@ -1,155 +1,438 @@
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from app_logging import get_logger
+
+# Trade-Meldungen laufen über "forex.portfolio" und werden nur bei DEBUG formatiert
+logger = get_logger('portfolio')
+
+# Kursspalten in Suchreihenfolge: DataManager liefert 'Schlusskurs', yfinance-Rohdaten 'Close'
+PRICE_COLUMNS = ('Schlusskurs', 'Close')
+# Speicherbudget des prozessweiten Kurs-Caches (Summe der Array-Bytes aller Einträge)
+SHARED_PRICE_CACHE_MAX_BYTES = 256 * 2**20
+_ONE_DAY_NS = 86_400 * 10**9
+_NS_MIN, _NS_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+def build_price_index(price_data):
+    """
+    Wandelt einen Kurs-DataFrame in einen sortierten Preisindex (dates, closes) um: int64-Nanosekunden
+    (zeitzonenbehaftete Indizes als lokale Wandzeit ohne tz) und float64-Schlusskurse ohne NaN. Doppelte Tage behalten
+    den letzten Wert. Ohne Daten oder Kursspalte sind beide Arrays leer.
+    """
+    column = next((c for c in PRICE_COLUMNS if price_data is not None and c in price_data.columns), None)
+    if column is None or price_data.empty:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    closes = price_data[column]
+    if isinstance(closes, pd.DataFrame): # z.B. MultiIndex-Spalten aus yfinance
+        closes = closes.iloc[:, 0]
+    index = closes.index if isinstance(closes.index, pd.DatetimeIndex) else pd.DatetimeIndex(pd.to_datetime(closes.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    closes = pd.Series(pd.to_numeric(closes, errors='coerce').to_numpy(dtype=np.float64), index=index)
+    closes = closes[closes.notna()].sort_index(kind='stable')
+    closes = closes[~closes.index.duplicated(keep='last')]
+    dates = np.ascontiguousarray(closes.index.values.astype('datetime64[ns]').view(np.int64))
+    return dates, np.ascontiguousarray(closes.to_numpy(dtype=np.float64))
+
+
+def _query_ns(date):
+    """Abfragedatum als int64-Nanosekunden, zeitzonenbehaftete Daten wie im Preisindex ohne tz."""
+    query = pd.Timestamp(date)
+    if query.tzinfo is not None:
+        query = query.tz_localize(None)
+    return query.value
+
+
+def price_source_key(data_manager):
+    """
+    Herkunft der Kurse eines DataManagers für SharedPriceCache-Schlüssel (DataManager.price_source_key);
+    andere Kursquellen werden über Typ und Identität des Objekts getrennt.
+    """
+    key_func = getattr(data_manager, 'price_source_key', None)
+    if callable(key_func):
+        return key_func()
+    return (type(data_manager).__name__, id(data_manager))
+
+
+class SharedPriceCache:
+    """
+    Prozessweiter Cache für Preisindizes (build_price_index), geteilt von allen Portfolios sowie den
+    Kursdaten für den SignalAnalyzer in Backtester und GUI. Ein Eintrag gehört zu (Quelle, Ticker, Abdeckung
+    [start, end)); die Quelle (price_source_key) trennt DataManager mit unterschiedlichem Provider, Kursspeicher
+    oder Kreuzkurs-Synthese. Eine Anfrage trifft jeden Eintrag derselben Quelle und desselben Tickers, dessen
+    Abdeckung sie enthält, und erhält einen Ausschnitt ohne Kopie. Die Abdeckung endet spätestens einen Tag nach
+    dem letzten gelieferten Kurs, sodass Anfragen bis in die Zukunft später neue Kurse nachladen.
+    Bei Überschreiten von max_bytes werden die am längsten unbenutzten Einträge verworfen.
+    Die Arrays sind schreibgeschützt. Leere Ergebnisse (fehlgeschlagene Abrufe) werden nicht gespeichert.
+    """
+
+    def __init__(self, max_bytes=SHARED_PRICE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict() # (source, ticker, start_ns, end_ns) -> (dates, closes)
+        self._keys_by_ticker = {} # (source, ticker) -> Schlüssel der Einträge
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _drop(self, key):
+        dates, closes = self._entries.pop(key)
+        self.current_bytes -= dates.nbytes + closes.nbytes
+        keys = self._keys_by_ticker[key[:2]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_ticker[key[:2]]
+
+    def get(self, ticker, start_date, end_date, source=None):
+        """Preisindex (dates, closes) für [start_date, end_date) aus einem abdeckenden Eintrag, sonst None."""
+        start_ns, end_ns = _query_ns(start_date), _query_ns(end_date)
+        with self._lock:
+            for key in self._keys_by_ticker.get((source, ticker), ()):
+                if key[2] <= start_ns and end_ns <= key[3]:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    dates, closes = self._entries[key]
+                    lo, hi = np.searchsorted(dates, (start_ns, end_ns), side='left')
+                    return dates[lo:hi], closes[lo:hi]
+            self.misses += 1
+        return None
+
+    def put(self, ticker, start_date, end_date, price_index, source=None):
+        """
+        Legt einen Preisindex für [start_date, end_date) ab; ersetzt Einträge, deren Abdeckung er enthält.
+        Die Abdeckung endet beim Anfrageende oder einen Tag nach dem letzten Kurs, je nachdem, was früher ist.
+        """
+        dates, closes = price_index
+        nbytes = dates.nbytes + closes.nbytes
+        if not len(dates) or nbytes > self.max_bytes:
+            return
+        dates.flags.writeable = False
+        closes.flags.writeable = False
+        key = (source, ticker, _query_ns(start_date), min(_query_ns(end_date), int(dates[-1]) + _ONE_DAY_NS))
+        with self._lock:
+            for old_key in list(self._keys_by_ticker.get(key[:2], ())):
+                if key[2] <= old_key[2] and old_key[3] <= key[3]:
+                    self._drop(old_key)
+            self._entries[key] = (dates, closes)
+            self._keys_by_ticker.setdefault(key[:2], set()).add(key)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_load(self, ticker, start_date, end_date, load, source=None):
+        """
+        Preisindex aus dem Cache oder aus load() (Kurs-DataFrame, z.B. DataManager.get_historical_price_data).
+        source: Herkunft der Kurse, siehe price_source_key.
+        """
+        price_index = self.get(ticker, start_date, end_date, source=source)
+        if price_index is None:
+            price_index = build_price_index(load())
+            self.put(ticker, start_date, end_date, price_index, source=source)
+        return price_index
+
+    def frame(self, ticker, start_date, end_date, load, source=None):
+        """Wie get_or_load, aber als 'Schlusskurs'-DataFrame mit Index 'Datum' (Eingabe des SignalAnalyzers)."""
+        dates, closes = self.get_or_load(ticker, start_date, end_date, load, source=source)
+        if not len(dates):
+            return pd.DataFrame()
+        return pd.DataFrame({'Schlusskurs': closes.copy()}, # Kurse gehören dem Aufrufer, der Index ist unveränderlich
+                            index=pd.DatetimeIndex(dates.view('datetime64[ns]'), name='Datum'))
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.current_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_ticker.clear()
+            self.current_bytes = 0
+
+
+# Prozessweiter Kurs-Cache aller Portfolios und Backtests
+SHARED_PRICE_CACHE = SharedPriceCache()
+
+
+class Position:
+    """Open position. shares is always positive, type ('long'/'short') gives the direction."""
+    __slots__ = ('shares', 'entry_price', 'type', 'entry_date')
+
+    def __init__(self, shares, entry_price, type, entry_date):
+        self.shares = shares
+        self.entry_price = entry_price
+        self.type = type
+        self.entry_date = entry_date
+
+    def __repr__(self):
+        return f"Position({self.type}, shares={self.shares:.4f}, entry_price={self.entry_price:.4f}, entry_date={self.entry_date})"
+
+
+class ColumnBuffer:
+    """
+    Nur anhängender, spaltenweiser Puffer: ein vorab alloziertes NumPy-Array pro Spalte (COLUMNS: Name -> dtype),
+    das bei Bedarf verdoppelt wird. Unterklassen schreiben über _next_row() direkt in self._columns.
+    """
+    COLUMNS = {}
+
+    def __init__(self, capacity=256):
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(next(iter(self._columns.values())))
+
+    def reserve(self, capacity):
+        """Vergrößert alle Spalten auf mindestens capacity Zeilen (z.B. auf die Anzahl der Handelstage)."""
+        if capacity <= self.capacity:
+            return
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    def _next_row(self):
+        if self._size == self.capacity:
+            self.reserve(max(2 * self.capacity, 1))
+        self._size += 1
+        return self._size - 1
+
+    def column(self, name):
+        """Gefüllter Teil einer Spalte als schreibgeschützte View (keine Kopie)."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+
+class TransactionLog(ColumnBuffer):
+    """
+    Spaltenweises, nur anhängendes Transaktionsprotokoll: ein NumPy-Array pro Spalte (Datum als int64 ns,
+    Ticker-ID, Art, Stückzahl, Kurs, Gebühren, realisierter P&L), bei Bedarf verdoppelt. Ticker werden
+    über ticker_ids auf int32 abgebildet. Pro Trade entsteht kein Python-Objekt außer den Skalaren.
+    """
+    SIDES = ('OPEN_LONG', 'CLOSE_LONG', 'OPEN_SHORT', 'COVER_SHORT')
+    CLOSING_SIDES = ('CLOSE_LONG', 'COVER_SHORT')
+    COLUMNS = {'date': np.int64, 'ticker_id': np.int32, 'side': np.int8, 'shares': np.float64,
+               'price': np.float64, 'fees': np.float64, 'pnl': np.float64}
+
+    def __init__(self, capacity=256):
+        super().__init__(capacity)
+        self.tickers = []
+        self.ticker_ids = {}
+        self._side_codes = {side: code for code, side in enumerate(self.SIDES)}
+
+    def _ticker_id(self, ticker):
+        ticker_id = self.ticker_ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = self.ticker_ids[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return ticker_id
+
+    def append(self, date_ns, side, ticker, shares, price, fees=0.0, pnl=0.0):
+        """Hängt eine Transaktion an (date_ns: int64 Nanosekunden, side: einer der SIDES)."""
+        row = self._next_row()
+        columns = self._columns
+        columns['date'][row] = date_ns
+        columns['ticker_id'][row] = self._ticker_id(ticker)
+        columns['side'][row] = self._side_codes[side]
+        columns['shares'][row] = shares
+        columns['price'][row] = price
+        columns['fees'][row] = fees
+        columns['pnl'][row] = pnl
+
+    def to_frame(self):
+        """Transaktionen als DataFrame: date (datetime64), ticker und side als Categorical, Zahlen als float64."""
+        frame = pd.DataFrame({name: self.column(name) for name in self.COLUMNS})
+        frame['date'] = self.column('date').view('datetime64[ns]')
+        frame['ticker'] = pd.Categorical.from_codes(self.column('ticker_id'), categories=self.tickers)
+        frame['side'] = pd.Categorical.from_codes(self.column('side'), categories=list(self.SIDES))
+        return frame[['date', 'ticker', 'ticker_id', 'side', 'shares', 'price', 'fees', 'pnl']]
+
+    def to_parquet(self, path):
+        """Schreibt das Protokoll als Parquet-Datei (benötigt pyarrow oder fastparquet)."""
+        self.to_frame().to_parquet(path, index=False)
+
+    def trade_pnl(self, ticker=None):
+        """Realisierter P&L pro schließender Transaktion (nach Gebühren), optional nur für einen Ticker."""
+        closing = np.isin(self.column('side'), [self._side_codes[side] for side in self.CLOSING_SIDES])
+        if ticker is not None:
+            closing &= self.column('ticker_id') == self.ticker_ids.get(ticker, -1)
+        frame = self.to_frame()[closing]
+        frame['net_pnl'] = frame['pnl'] - frame['fees']
+        return frame.reset_index(drop=True)
+
+
+class PortfolioHistory(ColumnBuffer):
+    """
+    Wertverlauf eines Portfolios: pro aufgezeichnetem Tag Datum (int64 ns), Gesamtwert, Cash,
+    Brutto-Exposure (Summe |Stückzahl x Kurs| aller Positionen) und Drawdown gegenüber dem bisherigen Höchstwert.
+    """
+    COLUMNS = {'date': np.int64, 'value': np.float64, 'cash': np.float64,
+               'exposure': np.float64, 'drawdown': np.float64}
+
+    def __init__(self, capacity=256):
+        super().__init__(capacity)
+        self.peak_value = -np.inf
+
+    def append(self, date_ns, value, cash, exposure):
+        row = self._next_row()
+        self.peak_value = max(self.peak_value, value)
+        columns = self._columns
+        columns['date'][row] = date_ns
+        columns['value'][row] = value
+        columns['cash'][row] = cash
+        columns['exposure'][row] = exposure
+        columns['drawdown'][row] = value / self.peak_value - 1.0 if self.peak_value > 0 else 0.0
+
+    def to_frame(self):
+        """
+        DataFrame auf den Puffern (date als datetime64[ns]). Mit copy=False behält pandas ab 2.0 jede Spalte
+        als eigenen Block auf dem Puffer (keine Kopie, schreibgeschützt; für Änderungen .copy() verwenden).
+        Ältere pandas-Versionen fassen die float64-Spalten beim Aufbau zu einem Block zusammen und kopieren sie.
+        """
+        data = {name: self.column(name) for name in self.COLUMNS}
+        data['date'] = data['date'].view('datetime64[ns]')
+        return pd.DataFrame(data, copy=False)
+
 
 class Portfolio:
-    def __init__(self, initial_cash=10000.0, data_manager=None, backtest_start_date=None, backtest_end_date=None):
+    def __init__(self, initial_cash=10000.0, data_manager=None, backtest_start_date=None, backtest_end_date=None, price_matrix=None,
+                 history_capacity=256, shared_price_cache=SHARED_PRICE_CACHE):
         self.initial_cash = initial_cash
         self.cash = initial_cash
-        # Positionsstruktur: Ticker: {'shares': float (abs value), 'entry_price': float, 'type': str ('long'/'short'), 'entry_date': datetime}
-        self.positions = {}
-        self.history = []  # To track portfolio value over time: {'date': datetime, 'value': float}
+        self.positions = {} # {ticker: Position}
+        self.transactions = TransactionLog()
+        self.history = PortfolioHistory(history_capacity) # Value over time; history_capacity e.g. the number of trading days
         self.data_manager = data_manager
-        self.price_cache = {} # Cache for historical price data: {ticker: pd.DataFrame}
+        self.price_cache = {} # Price index per ticker: {ticker: (int64 ns dates, float64 closes)}
+        self.shared_price_cache = shared_price_cache # Process-wide SharedPriceCache behind price_cache (None: always fetch)
+        self.price_matrix = price_matrix # Optional memory-mapped PriceMatrix, read before the DataManager
         self.backtest_start_date = backtest_start_date
         self.backtest_end_date = backtest_end_date
+        # Inkrementelle Bewertung: state_version steigt bei jeder Änderung von Cash oder Positionen.
+        # _marks hält pro Ticker (Kurs, Wertbeitrag, Exposure, gültig_von, gültig_bis) der letzten Bewertung;
+        # [gültig_von, gültig_bis) ist das Intervall (int64 ns), in dem derselbe Kursindex-Eintrag gilt.
+        # _marks_window ist die Schnittmenge dieser Intervalle, _positions_value und _exposure die Summen,
+        # _value_memo (Gesamtwert, Exposure) pro Datum (int64 ns) für die aktuelle state_version.
+        self.state_version = 0
+        self._marks = {}
+        self._marks_window = None
+        self._positions_value = 0.0
+        self._exposure = 0.0
+        self._value_memo = {}
 
 
     def _fetch_and_cache_prices(self, ticker):
         """
-        Fetches historical price data for a ticker for the entire backtest period and caches it.
+        Fetches historical price data for a ticker for the entire backtest period and caches it
+        as a price index (see build_price_index), via the shared price cache if one is set.
         """
         if ticker not in self.price_cache and self.data_manager and self.backtest_start_date and self.backtest_end_date:
-            print(f"[Portfolio] Caching prices for {ticker} from {self.backtest_start_date} to {self.backtest_end_date}")
+            logger.info("[Portfolio] Caching prices for %s from %s to %s", ticker, self.backtest_start_date, self.backtest_end_date)
             # Convert datetime to string if necessary for data_manager method
             start_str = self.backtest_start_date.strftime('%Y-%m-%d') if isinstance(self.backtest_start_date, datetime) else self.backtest_start_date
             end_str = self.backtest_end_date.strftime('%Y-%m-%d') if isinstance(self.backtest_end_date, datetime) else self.backtest_end_date
 
-            historical_data = self.data_manager.get_historical_price_data(ticker, start_str, end_str)
-            if historical_data is not None and not historical_data.empty:
-                # Ensure Date index is pd.DatetimeIndex
-                if not isinstance(historical_data.index, pd.DatetimeIndex):
-                    historical_data.index = pd.to_datetime(historical_data.index)
-                # Ensure data is sorted by date
-                historical_data.sort_index(inplace=True)
-                self.price_cache[ticker] = historical_data
+            def load():
+                return self.data_manager.get_historical_price_data(ticker, start_str, end_str)
+            if self.shared_price_cache is not None:
+                self.price_cache[ticker] = self.shared_price_cache.get_or_load(
+                    ticker, start_str, end_str, load, source=price_source_key(self.data_manager))
             else:
-                self.price_cache[ticker] = pd.DataFrame() # Cache empty df to avoid refetching failures
-                print(f"[Portfolio] Warning: No price data returned for {ticker} for the period.")
+                self.price_cache[ticker] = build_price_index(load())
+            # Auch ein leerer Index bleibt im Portfolio, damit fehlgeschlagene Abrufe nicht wiederholt werden
+            if not len(self.price_cache[ticker][0]):
+                logger.warning("[Portfolio] Warning: No price data returned for %s for the period.", ticker)
         elif not self.data_manager:
-            print("[Portfolio] Error: DataManager not provided to Portfolio.")
+            logger.error("[Portfolio] Error: DataManager not provided to Portfolio.")
         elif not self.backtest_start_date or not self.backtest_end_date:
-            print("[Portfolio] Error: Backtest start or end date not set for fetching prices.")
+            logger.error("[Portfolio] Error: Backtest start or end date not set for fetching prices.")
 
 
-    def get_current_price(self, ticker, date):
+    def get_current_price(self, ticker, date, query_ns=None):
         """
-        Retrieves the closing price for a given ticker on a specific date from cached data.
+        Retrieves the latest closing price on or before the given date (binary search in the cached price index).
+        query_ns: the date as int64 nanoseconds, if the caller has already converted it.
         """
+        if self.price_matrix is not None and ticker in self.price_matrix:
+            return self.price_matrix.price_on_or_before(ticker, date)
+
         if ticker not in self.price_cache:
             self._fetch_and_cache_prices(ticker)
 
-        if ticker in self.price_cache and not self.price_cache[ticker].empty:
-            price_data_df = self.price_cache[ticker]
-
-            # Ensure the input date is timezone-naive if the DataFrame dates are naive
-            query_date = date
-            if price_data_df.index.tz is None and date.tzinfo is not None:
-                query_date = date.replace(tzinfo=None)
-            elif price_data_df.index.tz is not None and date.tzinfo is None:
-                # If cache has tz-aware index, make query_date tz-aware (assume UTC or same as cache)
-                # This case needs careful handling based on actual timezone of data. For now, naive comparison.
-                # Or, convert price_data_df.index to naive: price_data_df.index.tz_localize(None)
-                # For simplicity, let's assume we primarily deal with naive dates or ensure consistency.
-                 pass # Potentially convert query_date to match price_data_df.index.tz
-
-            # Find the latest price on or before the query_date
-            relevant_data = price_data_df[price_data_df.index <= query_date]
-
-            if not relevant_data.empty and 'Close' in relevant_data.columns:
-                # Nimm die letzte Zeile und daraus den 'Close'-Wert
-                last_row_with_price = relevant_data.tail(1)
-                if not last_row_with_price.empty:
-                    price_value_candidate = last_row_with_price['Close'].iloc[0]
-
-                    final_price_scalar = None
-                    if pd.api.types.is_scalar(price_value_candidate):
-                        final_price_scalar = float(price_value_candidate)
-                    elif isinstance(price_value_candidate, pd.Series):
-                        # Wenn es eine Series ist, versuchen wir, den einzelnen Wert zu extrahieren
-                        if not price_value_candidate.empty:
-                            try:
-                                final_price_scalar = float(price_value_candidate.item())
-                                # print(f"[Portfolio] Info: Extracted scalar price for {ticker} on {date} from Series using .item()")
-                            except ValueError: # Falls .item() fehlschlägt (mehr als ein Element)
-                                try:
-                                    final_price_scalar = float(price_value_candidate.iloc[0])
-                                    # print(f"[Portfolio] Info: Extracted scalar price for {ticker} on {date} from Series using .iloc[0]")
-                                except Exception as e:
-                                    print(f"[Portfolio] Warning: Could not extract single item from price Series for {ticker} on {date}: {e}. Series was: {price_value_candidate}")
-                        else:
-                            print(f"[Portfolio] Warning: Price candidate for {ticker} on {date} was an empty Series.")
-
-                    if final_price_scalar is not None:
-                        return final_price_scalar
-                    else:
-                        print(f"[Portfolio] Warning: get_current_price for {ticker} on {date} could not resolve to a scalar price. Candidate was: {price_value_candidate}. Returning None.")
-                        return None
-                else:
-                    # This case should ideally not be reached if relevant_data was not empty.
-                    print(f"[Portfolio] Price for {ticker} on or before {date} not found (tail(1) was unexpectedly empty).")
-                    return None
-            else:
-                # Try to find the first price *after* query_date if no price on or before (e.g. market holiday)
-                # This is for cases where a trade needs to happen on the next available day
-                # For now, this is not implemented, we stick to "on or before".
-                # For backtesting, it's often assumed that if data for 'date' is missing,
-                # it's a non-trading day, and the last known price is used or the trade fails/is postponed.
-                print(f"[Portfolio] Price for {ticker} on or before {date} not found in cached data. Available range: {price_data_df.index.min()} to {price_data_df.index.max() if not price_data_df.empty else 'N/A'}")
-                return None
-
-        print(f"[Portfolio] Warning: Price for {ticker} on {date} not found. No data in cache.")
+        if ticker in self.price_cache and len(self.price_cache[ticker][0]):
+            dates, closes = self.price_cache[ticker]
+            row = int(np.searchsorted(dates, _query_ns(date) if query_ns is None else query_ns, side='right')) - 1
+            if row >= 0:
+                return float(closes[row])
+            # Kein Kurs am oder vor date; für Backtests gilt der letzte bekannte Kurs, nicht der nächste
+            logger.warning("[Portfolio] Price for %s on or before %s not found in cached data. Available range: %s to %s",
+                           ticker, date, pd.Timestamp(dates[0]), pd.Timestamp(dates[-1]))
+            return None
+
+        logger.warning("[Portfolio] Warning: Price for %s on %s not found. No data in cache.", ticker, date)
         return None # Return None if price cannot be found
 
+    def _position_changed(self, ticker):
+        """
+        Nach jeder Änderung von Cash oder einer Position aufrufen: verwirft den Wertbeitrag des Tickers
+        und das Datums-Memo, sodass die nächste Bewertung nur diesen Ticker neu bepreist.
+        """
+        mark = self._marks.pop(ticker, None)
+        if mark is not None:
+            self._positions_value -= mark[1]
+            self._exposure -= mark[2]
+        if not self._marks:
+            self._positions_value = self._exposure = 0.0 # Rundungsreste der laufenden Summen verwerfen
+        self._marks_window = None
+        self.state_version += 1
+        self._value_memo.clear()
+
     def open_long_position(self, ticker, amount_to_invest, date):
         """
         Opens a new long position or adds to an existing one.
         """
         if self.cash < amount_to_invest:
-            print(f"[Portfolio] Not enough cash to open long {ticker}. Available: {self.cash:.2f}, Needed: {amount_to_invest:.2f}")
+            logger.warning("[Portfolio] Not enough cash to open long %s. Available: %.2f, Needed: %.2f", ticker, self.cash, amount_to_invest)
             return False
 
         price = self.get_current_price(ticker, date)
         if price is None or price <= 0:
-            print(f"[Portfolio] Could not get a valid price for {ticker} on {date} to open long.")
+            logger.warning("[Portfolio] Could not get a valid price for %s on %s to open long.", ticker, date)
             return False
 
         shares_to_buy = amount_to_invest / price
         cost = shares_to_buy * price
 
-        if ticker in self.positions:
-            if self.positions[ticker]['type'] == 'long':
+        position = self.positions.get(ticker)
+        if position is not None:
+            if position.type == 'long':
                 # Add to existing long position (average up/down)
-                current_shares = self.positions[ticker]['shares']
-                current_total_cost = current_shares * self.positions[ticker]['entry_price']
-                new_total_shares = current_shares + shares_to_buy
-                new_average_price = (current_total_cost + cost) / new_total_shares
-                self.positions[ticker]['shares'] = new_total_shares
-                self.positions[ticker]['entry_price'] = new_average_price
-                self.positions[ticker]['entry_date'] = date # Update entry date to latest
-                print(f"[Portfolio] Added to long {ticker}: {shares_to_buy:.4f} shares at {price:.2f}. New avg price: {new_average_price:.2f}")
+                new_total_shares = position.shares + shares_to_buy
+                position.entry_price = (position.shares * position.entry_price + cost) / new_total_shares
+                position.shares = new_total_shares
+                position.entry_date = date # Update entry date to latest
+                logger.debug("[Portfolio] Added to long %s: %.4f shares at %.2f. New avg price: %.2f",
+                             ticker, shares_to_buy, price, position.entry_price)
             else: # Existing position is short
-                print(f"[Portfolio] Cannot open long for {ticker}; short position exists. Close short first.")
+                logger.warning("[Portfolio] Cannot open long for %s; short position exists. Close short first.", ticker)
                 return False
         else:
-            self.positions[ticker] = {
-                'shares': shares_to_buy,
-                'entry_price': price,
-                'type': 'long',
-                'entry_date': date
-            }
-            print(f"[Portfolio] Opened long {ticker}: {shares_to_buy:.4f} shares at {price:.2f}")
+            self.positions[ticker] = Position(shares_to_buy, price, 'long', date)
+            logger.debug("[Portfolio] Opened long %s: %.4f shares at %.2f", ticker, shares_to_buy, price)
 
         self.cash -= cost
+        self._position_changed(ticker)
         self.record_transaction(date, 'OPEN_LONG', ticker, shares_to_buy, price)
         return True
 
@@ -157,32 +440,34 @@ class Portfolio:
         """
         Closes an existing long position fully or partially.
         """
-        if ticker not in self.positions or self.positions[ticker]['type'] != 'long':
-            print(f"[Portfolio] No long position in {ticker} to close.")
+        position = self.positions.get(ticker)
+        if position is None or position.type != 'long':
+            logger.warning("[Portfolio] No long position in %s to close.", ticker)
             return False
 
         price = self.get_current_price(ticker, date)
         if price is None or price <= 0:
-            print(f"[Portfolio] Could not get a valid price for {ticker} on {date} to close long.")
+            logger.warning("[Portfolio] Could not get a valid price for %s on %s to close long.", ticker, date)
             return False
 
-        position_details = self.positions[ticker]
-
-        if shares_to_sell is None or shares_to_sell >= position_details['shares']:
-            shares_sold = position_details['shares']
+        if shares_to_sell is None or shares_to_sell >= position.shares:
+            shares_sold = position.shares
             del self.positions[ticker]
-            print(f"[Portfolio] Closed entire long position in {ticker}: {shares_sold:.4f} shares at {price:.2f}")
+            logger.debug("[Portfolio] Closed entire long position in %s: %.4f shares at %.2f", ticker, shares_sold, price)
         else:
             shares_sold = shares_to_sell
-            self.positions[ticker]['shares'] -= shares_sold
-            print(f"[Portfolio] Partially closed long {ticker}: Sold {shares_sold:.4f} shares at {price:.2f}. Remaining: {self.positions[ticker]['shares']:.4f}")
-            if self.positions[ticker]['shares'] <= 1e-9: # Handle float precision
-                 del self.positions[ticker]
-                 print(f"[Portfolio] Remaining shares for {ticker} negligible, position fully closed.")
+            position.shares -= shares_sold
+            logger.debug("[Portfolio] Partially closed long %s: Sold %.4f shares at %.2f. Remaining: %.4f",
+                         ticker, shares_sold, price, position.shares)
+            if position.shares <= 1e-9: # Handle float precision
+                del self.positions[ticker]
+                logger.debug("[Portfolio] Remaining shares for %s negligible, position fully closed.", ticker)
 
         proceeds = shares_sold * price
         self.cash += proceeds
-        self.record_transaction(date, 'CLOSE_LONG', ticker, shares_sold, price)
+        self._position_changed(ticker)
+        self.record_transaction(date, 'CLOSE_LONG', ticker, shares_sold, price,
+                                pnl=(price - position.entry_price) * shares_sold)
         return True
 
     def open_short_position(self, ticker, amount_to_invest, date):
@@ -193,104 +478,162 @@ class Portfolio:
         # as shorting initially increases cash. Margin would be a real-world check.
         # Here, we assume margin is sufficient.
         if ticker in self.positions:
-            print(f"[Portfolio] Cannot open short for {ticker}; position already exists ({self.positions[ticker]['type']}). Close existing first.")
+            logger.warning("[Portfolio] Cannot open short for %s; position already exists (%s). Close existing first.", ticker, self.positions[ticker].type)
             return False
 
         price = self.get_current_price(ticker, date)
         if price is None or price <= 0:
-            print(f"[Portfolio] Could not get a valid price for {ticker} on {date} to open short.")
+            logger.warning("[Portfolio] Could not get a valid price for %s on %s to open short.", ticker, date)
             return False
 
         shares_to_short = amount_to_invest / price
         proceeds = shares_to_short * price # Cash received from shorting
 
-        self.positions[ticker] = {
-            'shares': shares_to_short, # Store as positive number, 'type' indicates direction
-            'entry_price': price,
-            'type': 'short',
-            'entry_date': date
-        }
+        self.positions[ticker] = Position(shares_to_short, price, 'short', date) # Shares positive, type gives direction
         self.cash += proceeds # Cash increases from short sale
+        self._position_changed(ticker)
         self.record_transaction(date, 'OPEN_SHORT', ticker, shares_to_short, price)
-        print(f"[Portfolio] Opened short {ticker}: {shares_to_short:.4f} shares at {price:.2f}. Cash: {self.cash:.2f}")
+        logger.debug("[Portfolio] Opened short %s: %.4f shares at %.2f. Cash: %.2f", ticker, shares_to_short, price, self.cash)
         return True
 
     def cover_short_position(self, ticker, date, shares_to_cover=None):
         """
         Covers an existing short position fully or partially.
         """
-        if ticker not in self.positions or self.positions[ticker]['type'] != 'short':
-            print(f"[Portfolio] No short position in {ticker} to cover.")
+        position = self.positions.get(ticker)
+        if position is None or position.type != 'short':
+            logger.warning("[Portfolio] No short position in %s to cover.", ticker)
             return False
 
         price = self.get_current_price(ticker, date)
         if price is None or price <= 0:
-            print(f"[Portfolio] Could not get a valid price for {ticker} on {date} to cover short.")
+            logger.warning("[Portfolio] Could not get a valid price for %s on %s to cover short.", ticker, date)
             return False
 
-        position_details = self.positions[ticker]
-
-        if shares_to_cover is None or shares_to_cover >= position_details['shares']:
-            shares_bought_back = position_details['shares']
+        if shares_to_cover is None or shares_to_cover >= position.shares:
+            shares_bought_back = position.shares
             del self.positions[ticker]
-            print(f"[Portfolio] Covered entire short position in {ticker}: Bought back {shares_bought_back:.4f} shares at {price:.2f}")
+            logger.debug("[Portfolio] Covered entire short position in %s: Bought back %.4f shares at %.2f",
+                         ticker, shares_bought_back, price)
         else:
             shares_bought_back = shares_to_cover
-            self.positions[ticker]['shares'] -= shares_bought_back
-            print(f"[Portfolio] Partially covered short {ticker}: Bought back {shares_bought_back:.4f} shares at {price:.2f}. Remaining short: {self.positions[ticker]['shares']:.4f}")
-            if self.positions[ticker]['shares'] <= 1e-9: # Handle float precision
-                 del self.positions[ticker]
-                 print(f"[Portfolio] Remaining short shares for {ticker} negligible, position fully covered.")
+            position.shares -= shares_bought_back
+            logger.debug("[Portfolio] Partially covered short %s: Bought back %.4f shares at %.2f. Remaining short: %.4f",
+                         ticker, shares_bought_back, price, position.shares)
+            if position.shares <= 1e-9: # Handle float precision
+                del self.positions[ticker]
+                logger.debug("[Portfolio] Remaining short shares for %s negligible, position fully covered.", ticker)
 
         cost = shares_bought_back * price
         self.cash -= cost # Cash decreases to buy back shares
-        self.record_transaction(date, 'COVER_SHORT', ticker, shares_bought_back, price)
+        self._position_changed(ticker)
+        self.record_transaction(date, 'COVER_SHORT', ticker, shares_bought_back, price,
+                                pnl=(position.entry_price - price) * shares_bought_back)
         return True
 
     def calculate_total_value(self, current_date):
         """
         Calculates the total mark-to-market value of the portfolio.
         For short positions, this means cash + (entry_price - current_price) * shares.
+        Incremental: a position is only re-valued when the date falls on a different price-index row
+        than at its last valuation or when it was traded since, and repeated queries for the same date
+        without state changes are answered from the memo.
+        """
+        return self._valuation(current_date)[0]
+
+    def _price_window(self, ticker, current_date, query_ns):
+        """
+        Kurs am oder vor query_ns und das Intervall [von, bis) in int64 ns, in dem derselbe Eintrag des
+        Kursindex (bzw. der Kursmatrix) gilt. Ohne Kurs: (None, query_ns, query_ns + 1), also bei jedem
+        weiteren Datum neu versuchen.
         """
-        total_value = self.cash
+        if self.price_matrix is not None and ticker in self.price_matrix:
+            price = self.price_matrix.price_on_or_before(ticker, current_date)
+            dates = self.price_matrix.dates
+        else:
+            price = self.get_current_price(ticker, current_date, query_ns=query_ns)
+            dates = self.price_cache[ticker][0] if ticker in self.price_cache else ()
+        if price is None:
+            return None, query_ns, query_ns + 1
+        row = int(np.searchsorted(dates, query_ns, side='right')) - 1
+        return (price, int(dates[row]) if row >= 0 else _NS_MIN,
+                int(dates[row + 1]) if row + 1 < len(dates) else _NS_MAX)
+
+    def _valuation(self, current_date, memo_key=None):
+        """
+        (Gesamtwert, Brutto-Exposure) am Datum, siehe calculate_total_value. Bei einem Memo-Fehlschlag
+        werden nur Positionen neu bepreist, deren Kursindex-Eintrag am Datum ein anderer ist als bei der
+        letzten Bewertung oder die seitdem gehandelt wurden (_position_changed). Liegt das Datum im
+        gemeinsamen Gültigkeitsintervall aller Bewertungen (z.B. Wochenende), entfällt die Schleife ganz.
+        """
+        memo_key = _query_ns(current_date) if memo_key is None else memo_key
+        memo = self._value_memo.get(memo_key)
+        if memo is not None:
+            return memo
+
+        window = self._marks_window
+        if window is None or not window[0] <= memo_key < window[1]:
+            self._remark_positions(current_date, memo_key)
+
+        valuation = (self.cash + self._positions_value, self._exposure)
+        self._value_memo[memo_key] = valuation
+        return valuation
+
+    def _remark_positions(self, current_date, query_ns):
+        """Bepreist Positionen ohne gültige Bewertung für query_ns neu und aktualisiert _marks_window."""
         for ticker, details in self.positions.items():
-            current_price = self.get_current_price(ticker, current_date)
+            mark = self._marks.get(ticker)
+            if mark is not None and mark[3] <= query_ns < mark[4]:
+                continue # Gleicher Kursindex-Eintrag, Wertbeitrag gilt weiter
+            current_price, valid_from, valid_until = self._price_window(ticker, current_date, query_ns)
             if current_price is None: # If price unavailable, use entry price (conservative for longs, potentially problematic for shorts)
-                print(f"[Portfolio] Warning: Using entry price for {ticker} as current price for value calculation on {current_date} is unavailable.")
-                current_price = details['entry_price']
-
-            if details['type'] == 'long':
-                total_value += details['shares'] * current_price
-            elif details['type'] == 'short':
-                # Cash already reflects proceeds from short sale.
-                # Value change of short position = (entry_price - current_price) * shares
-                # So, add this change to the cash.
-                # Or, simpler: initial_cash_from_short + (entry_price - current_price) * shares
-                # The cash component already has the (shares * entry_price) from the short sale.
-                # So, the liability is (shares * current_price).
-                # The value of the short position part is (shares * entry_price) - (shares * current_price)
-                # total_value = self.cash (which includes initial short proceeds) + sum_long_values - sum_current_cost_to_cover_shorts
-                # This is equivalent to:
-                total_value += (details['entry_price'] - current_price) * details['shares']
-        return total_value
+                logger.warning("[Portfolio] Warning: Using entry price for %s as current price for value calculation on %s is unavailable.", ticker, current_date)
+                current_price = details.entry_price
+
+            if details.type == 'long':
+                contribution = details.shares * current_price
+            elif details.type == 'short':
+                # Cash already includes the proceeds of the short sale (shares * entry_price),
+                # so the position adds (entry_price - current_price) * shares.
+                contribution = (details.entry_price - current_price) * details.shares
+            else:
+                contribution = 0.0
+            exposure = abs(details.shares * current_price)
+            if mark is not None:
+                self._positions_value += contribution - mark[1]
+                self._exposure += exposure - mark[2]
+            else:
+                self._positions_value += contribution
+                self._exposure += exposure
+            self._marks[ticker] = (current_price, contribution, exposure, valid_from, valid_until)
+
+        self._marks_window = (max((mark[3] for mark in self._marks.values()), default=_NS_MIN),
+                              min((mark[4] for mark in self._marks.values()), default=_NS_MAX))
 
     def record_portfolio_value(self, date):
         """
-        Records the current total portfolio value at a given date.
+        Records the current total portfolio value, cash, gross exposure and drawdown at a given date
+        (memoized, see calculate_total_value).
         """
-        current_value = self.calculate_total_value(date)
-        self.history.append({'date': date, 'value': current_value})
-        # print(f"{date}: Portfolio Value: {current_value:.2f}")
+        date_ns = _query_ns(date)
+        current_value, exposure = self._valuation(date, memo_key=date_ns)
+        self.history.append(date_ns, current_value, self.cash, exposure)
 
-    def record_transaction(self, date, type, ticker, shares, price):
-        # Simple transaction log, could be expanded
-        print(f"TRANSACTION: {date} - {type} {shares:.4f} {ticker} @ {price:.2f}")
+    def record_transaction(self, date, type, ticker, shares, price, fees=0.0, pnl=0.0):
+        """
+        Appends a transaction to the columnar log (self.transactions). pnl is the realized
+        profit of a closing transaction before fees.
+        """
+        self.transactions.append(_query_ns(date), type, ticker, shares, price, fees, pnl)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("TRANSACTION: %s - %s %.4f %s @ %.2f", date, type, shares, ticker, price)
 
     def get_history_df(self):
         """
-        Returns the portfolio history as a pandas DataFrame.
+        Returns the portfolio history as a pandas DataFrame (columns date, value, cash, exposure, drawdown),
+        backed by the history buffers without copying on pandas >= 2.0 (see PortfolioHistory.to_frame).
         """
-        return pd.DataFrame(self.history)
+        return self.history.to_frame()
 
 if __name__ == '__main__':
     # Example Usage (requires a dummy DataManager or integration with actual DataManager)
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from data_store import frame_fingerprint, safe_file_stem, _atomic_write
+
+# Maximale Anzahl Ergebnisse im Speicher (LRU)
+RESULT_CACHE_MAX_ENTRIES = 256
+# Optionale Festplattenstufe, z.B. FOREX_RESULT_CACHE_PATH=data/result_cache/. Ohne Variable nur im Speicher.
+RESULT_CACHE_PATH = os.environ.get('FOREX_RESULT_CACHE_PATH') or None
+
+
+def input_fingerprint(value):
+    """
+    Stabiler Fingerabdruck einer Eingabe für Cache-Schlüssel: pandas-Objekte über ihren Inhalt
+    (frame_fingerprint, sonst hash_pandas_object) plus Namen/Spalten, Arrays über ihre Bytes,
+    Dicts/Listen/Skalare über ihre JSON-Darstellung.
+    """
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        try:
+            inhalt = frame_fingerprint(value)
+        except (TypeError, ValueError):
+            inhalt = hashlib.sha1(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()).hexdigest()
+        return f"{type(value).__name__}:{labels}:{value.shape}:{inhalt}"
+    if isinstance(value, pd.DatetimeIndex):
+        return f"DatetimeIndex:{len(value)}:{hashlib.sha1(value.values.astype('datetime64[ns]').view(np.int64).tobytes()).hexdigest()}"
+    if isinstance(value, pd.Index):
+        return f"Index:{len(value)}:{hashlib.sha1(pd.util.hash_pandas_object(value).to_numpy().tobytes()).hexdigest()}"
+    if isinstance(value, np.ndarray):
+        return f"ndarray:{value.dtype}:{value.shape}:{hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()}"
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _copy(value):
+    """Kopie für den Aufrufer, damit spätere Änderungen am Ergebnis den Cache-Eintrag nicht verändern."""
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+
+class ResultCache:
+    """
+    Memoisierung von Analyse-Zwischenergebnissen (Saisonalität, GDP-Momentum, Signale, Cooldown).
+    Schlüssel ist ein Hash aus Stufe, Fingerabdrücken der Eingabedaten und den relevanten
+    Config-Werten. Ergebnisse liegen in einem In-Memory-LRU und optional zusätzlich als Pickle pro
+    Schlüssel unter base_path, sodass sie auch einen Neustart überstehen.
+    Thread-sicher; GUI und Backtester teilen sich standardmäßig RESULT_CACHE.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, base_path=RESULT_CACHE_PATH):
+        self.max_entries = max_entries
+        self.base_path = base_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(stage, parts):
+        digest = hashlib.sha1(stage.encode('utf-8'))
+        for part in parts:
+            digest.update(b'\0')
+            digest.update(input_fingerprint(part).encode('utf-8'))
+        return f"{stage}-{digest.hexdigest()}"
+
+    def _path(self, key):
+        return f"{safe_file_stem(self.base_path, key)}.pkl"
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Gibt (True, Ergebnis) zurück, falls vorhanden (Speicher, dann Festplatte), sonst (False, None)."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, _copy(self._entries[key])
+        if self.base_path and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+                value = None
+            else:
+                self._remember(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return True, _copy(value)
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        self._remember(key, _copy(value))
+        if self.base_path:
+            os.makedirs(self.base_path, exist_ok=True)
+
+            def write(tmp_path):
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            try:
+                _atomic_write(self._path(key), write)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                pass # Die Festplattenstufe ist optional, das Ergebnis bleibt im Speicher
+
+    def get_or_compute(self, stage, parts, compute):
+        """Gibt das gecachte Ergebnis für (stage, parts) zurück oder berechnet es mit compute() und speichert es."""
+        key = self.make_key(stage, parts)
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.put(key, value) # put legt eine eigene Kopie ab, value gehört dem Aufrufer
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses}
+
+    def clear(self):
+        """Leert die Speicherstufe (die Festplattenstufe bleibt erhalten)."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Prozessweiter Cache, geteilt von GUI-Analyse und Backtester
+RESULT_CACHE = ResultCache()
@@ -1,40 +1,375 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import logging
+from enum import IntEnum
+from app_logging import get_logger, log_with_data, set_output_callback
+from data_store import frame_fingerprint, PointInTimeGdpStore
+from result_cache import ResultCache
 
 # --- Debugging-Funktion ---
-# Diese Funktion wird von der GUI-App bereitgestellt oder hier für Standalone-Tests definiert
-DEBUG_OUTPUT_CALLBACK = print # Standard-Callback ist print
+# Ausgaben laufen über den Logger "forex.signal". Die GUI-App setzt den Callback (Handler),
+# Standard ist print. Daten werden nur formatiert, wenn DEBUG aktiv ist.
+logger = get_logger('signal')
 
 def set_debug_output_callback(callback_function):
-    """Setzt die Callback-Funktion für Debug-Ausgaben."""
-    global DEBUG_OUTPUT_CALLBACK
-    DEBUG_OUTPUT_CALLBACK = callback_function
+    """Setzt die Callback-Funktion für Debug-Ausgaben (als Handler des "forex"-Loggers)."""
+    set_output_callback(callback_function)
 
 def debug_print(message, data=None):
-    """Gibt eine Debug-Nachricht und optional Daten über den Callback aus."""
-    log_message = f"[DEBUG] {message}"
-    if data is not None and isinstance(data, pd.DataFrame):
-        log_message += f"\n{data.head().to_string()}\n--------------------"
-    elif data is not None:
-        log_message += f"\n{str(data)}\n--------------------"
+    """Gibt eine Debug-Nachricht und optional Daten aus (Daten werden lazy formatiert)."""
+    log_with_data(logger, logging.DEBUG, message, data)
 
-    if DEBUG_OUTPUT_CALLBACK:
-        DEBUG_OUTPUT_CALLBACK(log_message)
-    else: # Fallback, falls kein Callback gesetzt ist (z.B. bei direkten Tests)
-        print(log_message)
+
+# --- Signal-Kodierung ---
+class Signal(IntEnum):
+    """Gemeinsame Kodierung aller Handelssignale; Serien und Arrays speichern sie als int8 (SIGNAL_DTYPE)."""
+    SHORT = -1
+    NEUTRAL = 0
+    LONG = 1
+
+SIGNAL_DTYPE = np.int8
+
+
+def _zeit_ns(index):
+    """DatetimeIndex als aufsteigende int64-Nanosekunden (ohne Kopie, wenn bereits datetime64[ns])."""
+    return np.asarray(index.values.astype('datetime64[ns]')).view(np.int64)
+
+
+def asof_join_kernel(quell_zeit, werte, ziel_zeit, verzug_ns=0):
+    """
+    Sortierter As-of-Join: jeder Zielzeitpunkt erhält den letzten Wert, dessen Quellzeit + Verzug <= Zielzeit ist.
+    quell_zeit: aufsteigende int64-Nanosekunden (Q,), werte: (Q,) oder (Q x k) int8, ziel_zeit: int64 (T,),
+    verzug_ns: Veröffentlichungsverzug als Skalar oder pro Spalte (k,). Zielzeitpunkte, zu denen noch
+    kein Wert veröffentlicht war, erhalten Signal.NEUTRAL (kein Rückwärtsfüllen). Ergebnis: (T,) bzw. (T x k) int8.
+    """
+    quell_zeit = np.asarray(quell_zeit, dtype=np.int64)
+    werte = np.asarray(werte, dtype=SIGNAL_DTYPE)
+    ein_d = werte.ndim == 1
+    if ein_d:
+        werte = werte[:, None]
+    ziel_zeit = np.asarray(ziel_zeit, dtype=np.int64)
+    verzug_ns = np.broadcast_to(np.asarray(verzug_ns, dtype=np.int64), (werte.shape[1],))
+
+    ergebnis = np.full((len(ziel_zeit), werte.shape[1]), Signal.NEUTRAL, dtype=SIGNAL_DTYPE)
+    # quell + verzug <= ziel  <=>  quell <= ziel - verzug: ein searchsorted pro unterschiedlichem Verzug,
+    # danach werden ganze Zeilen für alle Spalten mit diesem Verzug übernommen
+    for verzug in np.unique(verzug_ns):
+        spalten = np.flatnonzero(verzug_ns == verzug)
+        position = np.searchsorted(quell_zeit, ziel_zeit - verzug, side='right') - 1
+        veroeffentlicht = np.flatnonzero(position >= 0)
+        if len(spalten) == werte.shape[1]:
+            ergebnis[veroeffentlicht] = werte[position[veroeffentlicht]]
+        else:
+            ergebnis[np.ix_(veroeffentlicht, spalten)] = werte[np.ix_(position[veroeffentlicht], spalten)]
+    return ergebnis[:, 0] if ein_d else ergebnis
+
+
+def richte_signal_aus(signal, ziel_index, name=None, publikationsverzug=None):
+    """
+    Richtet eine int8-Signalserie (z.B. GDP-Signal auf Quartalsfrequenz) per As-of-Join auf ziel_index aus:
+    jeder Zieltag erhält das letzte Signal, das zu diesem Tag bereits veröffentlicht war
+    (Signaldatum + publikationsverzug <= Zieltag). Davor ist das Signal neutral. Ergebnis ist int8.
+    """
+    if name is None:
+        name = signal.name if signal is not None else "Signal"
+    if signal is None or signal.empty or len(ziel_index) == 0:
+        return pd.Series(np.zeros(len(ziel_index), dtype=SIGNAL_DTYPE), index=ziel_index, name=name)
+    signal = signal.sort_index()
+    verzug_ns = pd.Timedelta(publikationsverzug or 0).value
+    werte = asof_join_kernel(_zeit_ns(signal.index), signal.to_numpy(dtype=SIGNAL_DTYPE), _zeit_ns(ziel_index), verzug_ns)
+    return pd.Series(werte, index=ziel_index, name=name)
+
+
+def richte_signale_aus(signale, ziel_index, publikationsverzug=None):
+    """
+    Wie richte_signal_aus für viele Paare auf einmal: signale ist ein DataFrame (Quartale x Paare, int8),
+    z.B. aus GdpMomentumPanel.signale_fuer_paare. publikationsverzug: Timedelta für alle Spalten oder
+    Dict {Spalte: Timedelta} (fehlende Spalten ohne Verzug). Gibt ein int8-DataFrame (ziel_index x Paare) zurück.
+    """
+    signale = signale.sort_index().fillna(Signal.NEUTRAL)
+    if isinstance(publikationsverzug, dict):
+        verzug_ns = [pd.Timedelta(publikationsverzug.get(spalte) or 0).value for spalte in signale.columns]
+    else:
+        verzug_ns = pd.Timedelta(publikationsverzug or 0).value
+    werte = asof_join_kernel(_zeit_ns(signale.index), signale.to_numpy(dtype=SIGNAL_DTYPE), _zeit_ns(ziel_index), verzug_ns)
+    return pd.DataFrame(werte, index=ziel_index, columns=signale.columns)
+
+
+def signal_cooldown_kernel(zeitstempel, signale, cooldown_ns):
+    """
+    Cooldown auf int8-Signalen: ein Signal (!= 0) wird nur übernommen, wenn es mindestens cooldown_ns
+    nach dem letzten übernommenen Signal derselben Spalte liegt; alle anderen werden 0.
+    zeitstempel: aufsteigende int64-Nanosekunden (Länge T), signale: (T,) oder (T x Paare).
+    Für jedes Signal liefert searchsorted das nächste Signal außerhalb seines Cooldowns; die Kette ab dem
+    ersten Signal jeder Spalte wird per Pointer-Doubling in O(n log n) markiert.
+    """
+    zeitstempel = np.asarray(zeitstempel, dtype=np.int64)
+    signale = np.asarray(signale, dtype=SIGNAL_DTYPE)
+    ein_d = signale.ndim == 1
+    if ein_d:
+        signale = signale[:, None]
+    ergebnis = np.zeros_like(signale)
+
+    # Signale spaltenweise in Zeitreihenfolge (nonzero auf der Transponierten sortiert nach Spalte, dann Zeile)
+    spalten, zeilen = np.nonzero(signale.T)
+    n = len(zeilen)
+    if n:
+        # Erste Zeile außerhalb des Cooldowns, dann das erste Signal derselben Spalte ab dieser Zeile.
+        # Der Schlüssel spalte * (T + 1) + zeile ist über alle Signale aufsteigend.
+        ziel_zeile = np.searchsorted(zeitstempel, zeitstempel[zeilen] + cooldown_ns, side='left')
+        breite = len(zeitstempel) + 1
+        naechstes = np.empty(n + 1, dtype=np.int64)
+        naechstes[:n] = np.searchsorted(spalten * breite + zeilen, spalten * breite + ziel_zeile, side='left')
+        naechstes[:n][naechstes[:n] >= np.searchsorted(spalten, spalten, side='right')] = n # Spaltenende
+        naechstes[n] = n # Endknoten
+
+        # Pointer-Doubling: nach Schritt k enthält kette die Knoten naechstes^m(start) mit m < 2^(k+1);
+        # die Kette ist streng aufsteigend, neue Knoten sind also nie doppelt.
+        starts = np.flatnonzero(np.r_[True, spalten[1:] != spalten[:-1]])
+        kette = starts
+        sprung = naechstes
+        while (sprung[starts] != n).any():
+            kette = np.concatenate([kette, sprung[kette]])
+            kette = kette[kette < n]
+            sprung = sprung[sprung]
+        ergebnis[zeilen[kette], spalten[kette]] = signale[zeilen[kette], spalten[kette]]
+    return ergebnis[:, 0] if ein_d else ergebnis
+
+
+# --- Saisonalitäts-Kernel (NumPy) ---
+def berechne_returns_matrix(preise):
+    """
+    Prozentuale Veränderungen einer (Datum,) oder (Datum x Paare) Kursmatrix. NaN-Kurse (z.B. Feiertage
+    eines Paares) werden übersprungen: der Return bezieht sich auf den letzten gültigen Kurs der Spalte,
+    an NaN-Stellen selbst ist der Return NaN. Entspricht pct_change() auf der Reihe ohne NaN-Zeilen.
+    """
+    preise = np.asarray(preise, dtype=np.float64)
+    ein_d = preise.ndim == 1
+    if ein_d:
+        preise = preise[:, None]
+    gueltig = ~np.isnan(preise)
+    # Vorwärts füllen über den Index der letzten gültigen Zeile pro Spalte
+    letzte_zeile = np.maximum.accumulate(np.where(gueltig, np.arange(len(preise))[:, None], 0), axis=0)
+    gefuellt = np.take_along_axis(preise, letzte_zeile, axis=0)
+    returns = np.full(preise.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = gefuellt[1:] / gefuellt[:-1] - 1.0
+    returns[~gueltig] = np.nan
+    return returns[:, 0] if ein_d else returns
+
+
+def saisonalitaet_kernel(returns, gruppen):
+    """
+    Mittelwert der Returns pro Gruppe (z.B. ISO-Woche 1..53), zurückverteilt auf jede Zeile.
+    returns: (T,) oder (T x N) float, NaN wird ignoriert. gruppen: (T,) nicht-negative Ganzzahlen.
+    Summen und Anzahlen aller Spalten entstehen in je einem bincount, die Rückverteilung ist ein
+    einziger Gather. Gruppen ohne gültigen Return erhalten 0 (wie fillna(0) bisher).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    ein_d = returns.ndim == 1
+    if ein_d:
+        returns = returns[:, None]
+    gruppen = np.asarray(gruppen, dtype=np.int64)
+    n_zeilen, n_spalten = returns.shape
+    if n_zeilen == 0:
+        return returns[:, 0] if ein_d else returns
+    n_gruppen = int(gruppen.max()) + 1
+
+    gueltig = ~np.isnan(returns)
+    # Gemeinsamer Index (Gruppe, Spalte) -> ein bincount für die ganze Matrix
+    flat_index = (gruppen[:, None] * n_spalten + np.arange(n_spalten)).ravel()
+    summen = np.bincount(flat_index, weights=np.where(gueltig, returns, 0.0).ravel(),
+                         minlength=n_gruppen * n_spalten).reshape(n_gruppen, n_spalten)
+    anzahl = np.bincount(flat_index, weights=gueltig.ravel(),
+                         minlength=n_gruppen * n_spalten).reshape(n_gruppen, n_spalten)
+    mittelwerte = np.divide(summen, anzahl, out=np.zeros_like(summen), where=anzahl > 0)
+
+    ergebnis = mittelwerte[gruppen] # (T x N) Gather
+    return ergebnis[:, 0] if ein_d else ergebnis
+
+
+# Granularitäten des Saisonalitäts-Würfels und Anzahl ihrer Schlüssel (Index = Wert, z.B. Monat 1..12)
+SAISONALITAETS_GRANULARITAETEN = {'wochentag': 7, 'woche': 54, 'monat': 13, 'monatstag': 32}
+# Saisonalitäts-Würfel, die ein SignalAnalyzer im Speicher hält (LRU über Kurs-Fingerabdrücke)
+WUERFEL_MEMO_MAX_ENTRIES = 32
+
+
+def granularitaets_schluessel(datums_index, granularitaeten=SAISONALITAETS_GRANULARITAETEN):
+    """Gruppenschlüssel pro Tag für die gewünschten Granularitäten als {name: int64-Array}."""
+    berechnet = {
+        'wochentag': lambda: datums_index.dayofweek,
+        'woche': lambda: datums_index.isocalendar().week,
+        'monat': lambda: datums_index.month,
+        'monatstag': lambda: datums_index.day,
+    }
+    return {name: np.asarray(berechnet[name](), dtype=np.int64) for name in granularitaeten}
+
+
+def berechne_saisonalitaets_wuerfel(returns, datums_index):
+    """
+    Saisonalitäts-Würfel eines Paares: mittlerer Return pro Wochentag, ISO-Woche, Monat und Monatstag
+    in EINEM bincount über alle Granularitäten (jeder Return zählt in einen Schlüssel je Granularität).
+    Gibt {granularitaet: Array der Mittelwerte je Schlüssel} zurück, Schlüssel ohne Returns -> 0.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    schluessel = granularitaets_schluessel(datums_index)
+    offsets = np.cumsum([0] + list(SAISONALITAETS_GRANULARITAETEN.values()))
+    alle_schluessel = np.concatenate([schluessel[name] + offsets[i] for i, name in enumerate(SAISONALITAETS_GRANULARITAETEN)])
+    gueltig = np.tile(~np.isnan(returns), len(SAISONALITAETS_GRANULARITAETEN))
+    werte = np.tile(np.nan_to_num(returns, nan=0.0), len(SAISONALITAETS_GRANULARITAETEN))
+    summen = np.bincount(alle_schluessel, weights=werte, minlength=offsets[-1])
+    anzahl = np.bincount(alle_schluessel, weights=gueltig, minlength=offsets[-1])
+    mittelwerte = np.divide(summen, anzahl, out=np.zeros_like(summen), where=anzahl > 0)
+    return {name: mittelwerte[offsets[i]:offsets[i + 1]] for i, name in enumerate(SAISONALITAETS_GRANULARITAETEN)}
+
+
+def saisonalitaets_jahre(datums_index, granularitaet):
+    """
+    Jahr je Zeile für saisonalitaet_expanding_kernel: ISO-Jahr bei ISO-Wochen (der 29.12.2014 gehört zu
+    Woche 1 von 2015), sonst Kalenderjahr (der Dezember 2014 bleibt im Jahr 2014).
+    """
+    if granularitaet == 'woche':
+        return datums_index.isocalendar().year.to_numpy(dtype=np.int64)
+    return datums_index.year.to_numpy(dtype=np.int64)
+
+
+def saisonalitaet_expanding_kernel(returns, jahre, gruppen):
+    """
+    Look-ahead-freie Variante von saisonalitaet_kernel: jede Zeile erhält den Mittelwert der Returns
+    derselben Gruppe (z.B. ISO-Woche) aus FRÜHEREN Jahren. Das laufende Jahr und die Zukunft
+    fließen nicht ein; ohne Vorjahresdaten ist der Wert 0.
+    jahre muss zur Gruppierung passen (siehe saisonalitaets_jahre): ISO-Jahr für ISO-Wochen, sonst
+    Kalenderjahr, damit jede Gruppe innerhalb eines Jahres zusammenhängend bleibt.
+    Vektorisiert: Summen pro (Jahr, Gruppe) per bincount, dann exklusive kumulierte Summe über die
+    Jahre innerhalb jeder Gruppe. returns: (T,) oder (T x N).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    ein_d = returns.ndim == 1
+    if ein_d:
+        returns = returns[:, None]
+    if len(returns) == 0:
+        return returns[:, 0] if ein_d else returns
+    jahre = np.asarray(jahre, dtype=np.int64)
+    gruppen = np.asarray(gruppen, dtype=np.int64)
+    n_spalten = returns.shape[1]
+
+    # Schlüssel (Gruppe, Jahr) sortiert -> gleiche Gruppe liegt zusammen, Jahre aufsteigend
+    schluessel, zeilen_schluessel = np.unique(gruppen * 10000 + jahre, return_inverse=True)
+    n_schluessel = len(schluessel)
+    gueltig = ~np.isnan(returns)
+    flat_index = (zeilen_schluessel[:, None] * n_spalten + np.arange(n_spalten)).ravel()
+    summen = np.bincount(flat_index, weights=np.where(gueltig, returns, 0.0).ravel(),
+                         minlength=n_schluessel * n_spalten).reshape(n_schluessel, n_spalten)
+    anzahl = np.bincount(flat_index, weights=gueltig.ravel(),
+                         minlength=n_schluessel * n_spalten).reshape(n_schluessel, n_spalten)
+
+    # Exklusive kumulierte Summe je Gruppe: Summe aller Vorjahre derselben Gruppe
+    gruppe_je_schluessel = schluessel // 10000
+    gruppen_start = np.r_[0, np.flatnonzero(np.diff(gruppe_je_schluessel)) + 1]
+    start_je_schluessel = gruppen_start[np.cumsum(np.r_[0, np.diff(gruppe_je_schluessel) != 0])]
+    def vorjahre(werte):
+        exklusiv = np.cumsum(werte, axis=0) - werte
+        return exklusiv - exklusiv[start_je_schluessel]
+    vorjahres_summen = vorjahre(summen)
+    vorjahres_anzahl = vorjahre(anzahl)
+    mittelwerte = np.divide(vorjahres_summen, vorjahres_anzahl, out=np.zeros_like(vorjahres_summen),
+                            where=vorjahres_anzahl > 0)
+
+    ergebnis = mittelwerte[zeilen_schluessel]
+    return ergebnis[:, 0] if ein_d else ergebnis
+
+
+class SeasonalityState:
+    """
+    Laufender Zustand der look-ahead-freien Wochen-Saisonalität für ein Paar (z.B. Live-Betrieb oder
+    Walk-Forward-Backtest): Summen und Anzahlen der Returns pro ISO-Woche aus abgeschlossenen Wochen.
+    Unterstützt nur die Granularität 'woche'; andere Granularitäten über berechne_saisonalitaet.
+    Die Returns der laufenden (Jahr, Woche) werden gesammelt und erst beim Wochenwechsel übernommen,
+    sodass ein neuer Kurs in O(1) verarbeitet wird. Liefert dieselben Werte wie
+    saisonalitaet_expanding_kernel, da eine ISO-Woche innerhalb eines Jahres nur einmal vorkommt.
+    """
+
+    def __init__(self):
+        self.summen = np.zeros(54)
+        self.anzahl = np.zeros(54)
+        self.offene_woche = None # (ISO-Jahr, Woche) der noch nicht übernommenen Returns
+        self.offene_summe = 0.0
+        self.offene_anzahl = 0
+        self.letzter_kurs = None
+
+    @classmethod
+    def from_history(cls, forex_daten, price_column='Schlusskurs'):
+        """Initialisiert den Zustand vektorisiert aus der bisherigen Kurshistorie."""
+        zustand = cls()
+        kurse = forex_daten[price_column].dropna()
+        if kurse.empty:
+            return zustand
+        iso = kurse.index.isocalendar()
+        jahre = iso.year.to_numpy(dtype=np.int64)
+        wochen = iso.week.to_numpy(dtype=np.int64)
+        returns = berechne_returns_matrix(kurse.to_numpy(dtype=np.float64))
+        gueltig = ~np.isnan(returns)
+        offen = (jahre == jahre[-1]) & (wochen == wochen[-1])
+        abgeschlossen = gueltig & ~offen
+        zustand.summen += np.bincount(wochen[abgeschlossen], weights=returns[abgeschlossen], minlength=54)
+        zustand.anzahl += np.bincount(wochen[abgeschlossen], minlength=54)
+        zustand.offene_woche = (int(jahre[-1]), int(wochen[-1]))
+        zustand.offene_summe = float(returns[gueltig & offen].sum())
+        zustand.offene_anzahl = int((gueltig & offen).sum())
+        zustand.letzter_kurs = float(kurse.iloc[-1])
+        return zustand
+
+    def wert(self, woche):
+        """Saisonalitätswert einer ISO-Woche aus abgeschlossenen Vorjahren (0 ohne Daten)."""
+        return self.summen[woche] / self.anzahl[woche] if self.anzahl[woche] else 0.0
+
+    def update(self, datum, kurs):
+        """
+        Verarbeitet einen neuen Tageskurs und gibt den Saisonalitätswert für diesen Tag zurück
+        (nur aus früheren Jahren, der neue Return selbst fließt nicht ein).
+        """
+        iso_jahr, woche, _ = pd.Timestamp(datum).isocalendar()
+        if (iso_jahr, woche) != self.offene_woche:
+            if self.offene_woche is not None:
+                self.summen[self.offene_woche[1]] += self.offene_summe
+                self.anzahl[self.offene_woche[1]] += self.offene_anzahl
+            self.offene_woche = (iso_jahr, woche)
+            self.offene_summe = 0.0
+            self.offene_anzahl = 0
+        if kurs is not None and not np.isnan(kurs):
+            if self.letzter_kurs is not None:
+                self.offene_summe += kurs / self.letzter_kurs - 1.0
+                self.offene_anzahl += 1
+            self.letzter_kurs = kurs
+        return self.wert(woche)
 
 
 class SignalAnalyzer:
-    def __init__(self, config=None):
+    def __init__(self, config=None, seasonality_cache=None, result_cache=None):
         """
         Initialisiert den SignalAnalyzer.
         config: Ein Dictionary, das z.B. Schwellenwerte enthalten kann.
+        seasonality_cache: Optionaler SeasonalityCubeCache (z.B. DataManager.seasonality_cache), in dem
+                           Saisonalitäts-Würfel pro Ticker persistent abgelegt werden.
+        result_cache: Optionaler ResultCache (z.B. result_cache.RESULT_CACHE). Saisonalität, Signalkombination
+                      und Cooldown werden dann pro Eingabedaten und Config nur einmal berechnet.
         """
         self.config = config if config else {}
+        self.result_cache = result_cache
         # Standard Schwellenwerte, können über config überschrieben werden
         self.schwelle_saisonalitaet_kauf = self.config.get('SCHWELLE_SAISONALITAET_KAUF', 0.0005)
         self.schwelle_saisonalitaet_verkauf = self.config.get('SCHWELLE_SAISONALITAET_VERKAUF', -0.0005)
+        # 'voll': Wochenmittel über die gesamte geladene Historie (bisheriges Verhalten)
+        # 'expandierend': nur Vorjahre derselben Gruppe (ISO-Woche: ISO-Jahr, sonst Kalenderjahr), ohne Blick in die Zukunft
+        self.saisonalitaet_modus = self.config.get('SAISONALITAET_MODUS', 'voll')
+        # Gruppierung der Saisonalität: 'woche' (ISO-Woche, bisheriges Verhalten), 'wochentag', 'monat', 'monatstag'
+        self.saisonalitaet_granularitaet = self.config.get('SAISONALITAET_GRANULARITAET', 'woche')
+        if self.saisonalitaet_granularitaet not in SAISONALITAETS_GRANULARITAETEN:
+            debug_print(f"WARNUNG: Unbekannte Saisonalitäts-Granularität '{self.saisonalitaet_granularitaet}', verwende 'woche'.")
+            self.saisonalitaet_granularitaet = 'woche'
+        self.seasonality_cache = seasonality_cache
+        # Fingerabdruck der Kurse -> Saisonalitäts-Würfel, begrenzt (LRU) und nur im Speicher
+        self._wuerfel_memo = ResultCache(max_entries=WUERFEL_MEMO_MAX_ENTRIES, base_path=None)
         # Entferne alte BIP Momentum Schwellenwerte
         # self.schwelle_bip_momentum_kauf = self.config.get('SCHWELLE_BIP_MOMENTUM_KAUF', 0.1)
         # self.schwelle_bip_momentum_verkauf = self.config.get('SCHWELLE_BIP_MOMENTUM_VERKAUF', 0.1)
@@ -47,10 +382,24 @@ class SignalAnalyzer:
         # debug_print(f"BIP Momentum Kauf-Schwelle: {self.schwelle_bip_momentum_kauf}, Verkauf-Schwelle: {self.schwelle_bip_momentum_verkauf}") # Entfernt
 
 
-    def berechne_saisonalitaet(self, forex_daten):
+    def berechne_saisonalitaet(self, forex_daten=None, price_matrix=None, ticker=None):
         """
-        Berechnet saisonale Trends aus den Forex-Kursdaten.
+        Berechnet saisonale Trends aus den Forex-Kursdaten (Granularität laut Config, Standard ISO-Woche).
+        Alternativ können die Kurse direkt aus einer PriceMatrix (price_matrix + ticker) gelesen werden.
+        ticker dient außerdem als Schlüssel für den persistenten Saisonalitäts-Würfel.
         """
+        if price_matrix is not None and ticker is not None:
+            if ticker not in price_matrix:
+                debug_print(f"Ticker '{ticker}' ist nicht in der Kursmatrix enthalten. Kann Saisonalität nicht berechnen.")
+                return pd.Series(dtype=float, name="Saisonalitaet")
+            forex_daten = price_matrix.frame(ticker)
+        if self.result_cache is not None and self.PRICE_COLUMN in forex_daten.columns:
+            return self.result_cache.get_or_compute(
+                'saisonalitaet', (forex_daten[self.PRICE_COLUMN], self.saisonalitaet_modus, self.saisonalitaet_granularitaet),
+                lambda: self._berechne_saisonalitaet(forex_daten, ticker))
+        return self._berechne_saisonalitaet(forex_daten, ticker)
+
+    def _berechne_saisonalitaet(self, forex_daten, ticker=None):
         debug_print("Beginne Berechnung der Saisonalität für Forex-Daten:", forex_daten)
 
         if forex_daten.empty or self.PRICE_COLUMN not in forex_daten.columns:
@@ -70,56 +419,88 @@ class SignalAnalyzer:
                 debug_print(f"Fehler bei Konvertierung des Forex-Index zu DatetimeIndex: {e}")
                 return pd.Series(dtype=float, name="Saisonalitaet")
 
-        # Umstellung auf wöchentliche Saisonalität
-        # Group by ISO week of year
-        weekly_returns_grouped = forex_returns.groupby(forex_daten.index.isocalendar().week)
-
-        # Debug-Ausgabe für wöchentliche Returns
-        for week_num, group in weekly_returns_grouped:
-           mean_val = group.mean()
-           if isinstance(mean_val, pd.Series): # Should not happen with .mean() on a series group but good practice
-               mean_val = mean_val.iloc[0] if not mean_val.empty else np.nan
-
-           if pd.notna(mean_val):
-               debug_print(f"  Woche {week_num}: {len(group)} Einträge, Durchschnittlicher Return: {float(mean_val):.6f}", group.head(2)) # Increased precision for weekly
-           elif not group.dropna().empty:
-               debug_print(f"  Woche {week_num}: {len(group)} Einträge, Durchschnittlicher Return: NaN (nach Verarbeitung)", group.head(2))
-           else:
-               debug_print(f"  Woche {week_num}: {len(group)} Einträge, keine validen Returns.", group.head(2))
-
-        durchschnittliche_woechentliche_saisonalitaet = weekly_returns_grouped.mean()
-
-        # Handle potential DataFrame output if original series name was complex (though unlikely for pct_change)
-        if isinstance(durchschnittliche_woechentliche_saisonalitaet, pd.DataFrame):
-            if durchschnittliche_woechentliche_saisonalitaet.shape[1] == 1:
-                durchschnittliche_woechentliche_saisonalitaet = durchschnittliche_woechentliche_saisonalitaet.iloc[:, 0]
-            else:
-                debug_print("FEHLER: `durchschnittliche_woechentliche_saisonalitaet` ist ein mehrspaltiges DataFrame, unerwartet.")
-                return pd.Series(dtype=float, name="Saisonalitaet")
-
-        debug_print("Durchschnittliche wöchentliche Saisonalität (verarbeitet):", durchschnittliche_woechentliche_saisonalitaet)
-
-        saisonalitaet_signal = pd.Series(index=forex_daten.index, dtype=float, name="Saisonalitaet")
-
-        # Map average weekly seasonality back to the daily forex data index
-        # Ensure forex_daten.index.isocalendar().week is available
-        if not hasattr(forex_daten.index, 'isocalendar'):
-             debug_print("FEHLER: Forex-Datenindex scheint kein DatetimeIndex mehr zu sein oder isocalendar nicht verfügbar.")
-             return pd.Series(dtype=float, name="Saisonalitaet")
-
-        forex_week_numbers = forex_daten.index.isocalendar().week
-
-        for week_num, avg_saison_wert in durchschnittliche_woechentliche_saisonalitaet.items():
-            saisonalitaet_signal[forex_week_numbers == week_num] = avg_saison_wert
-
-        saisonalitaet_signal.fillna(0, inplace=True) # Fill any day not covered (e.g. if a week had no returns) with 0
+        # Umstellung auf wöchentliche Saisonalität (Group by ISO week of year)
+        # Debug-Ausgabe für wöchentliche Returns (nur wenn DEBUG aktiv, die Schleife kostet sonst pro Woche)
+        if logger.isEnabledFor(logging.DEBUG):
+            weekly_returns_grouped = forex_returns.groupby(forex_daten.index.isocalendar().week.to_numpy(dtype=np.int64))
+            for week_num, group in weekly_returns_grouped:
+                mean_val = group.mean()
+                if pd.notna(mean_val):
+                    debug_print(f"  Woche {week_num}: {len(group)} Einträge, Durchschnittlicher Return: {float(mean_val):.6f}", group.head(2)) # Increased precision for weekly
+                elif not group.dropna().empty:
+                    debug_print(f"  Woche {week_num}: {len(group)} Einträge, Durchschnittlicher Return: NaN (nach Verarbeitung)", group.head(2))
+                else:
+                    debug_print(f"  Woche {week_num}: {len(group)} Einträge, keine validen Returns.", group.head(2))
+            debug_print("Durchschnittliche wöchentliche Saisonalität (verarbeitet):", weekly_returns_grouped.mean())
+
+        # Wochenmittel per bincount und in einem Gather auf den Tagesindex zurückverteilen
+        # (Wochen ohne gültige Returns -> 0)
+        # Im Modus 'voll' kommen die Mittelwerte aus dem (gecachten) Würfel, die Granularität ist nur ein Lookup
+        if self.saisonalitaet_modus == 'expandierend':
+            werte = self._saisonalitaet_werte(forex_returns.to_numpy(dtype=np.float64), forex_daten.index)
+        else:
+            wuerfel = self.saisonalitaets_wuerfel(forex_daten, ticker=ticker, forex_returns=forex_returns)
+            gruppen = granularitaets_schluessel(forex_daten.index, [self.saisonalitaet_granularitaet])[self.saisonalitaet_granularitaet]
+            werte = wuerfel[self.saisonalitaet_granularitaet][gruppen]
+        saisonalitaet_signal = pd.Series(werte, index=forex_daten.index, name="Saisonalitaet")
 
         debug_print("Finale Saisonalitäts-Signal-Serie (wöchentlich):", saisonalitaet_signal)
-        if not saisonalitaet_signal.empty:
+        if not saisonalitaet_signal.empty and logger.isEnabledFor(logging.DEBUG):
              debug_print(f"Statistik Saisonalität: Min={saisonalitaet_signal.min():.4f}, Max={saisonalitaet_signal.max():.4f}, Mean={saisonalitaet_signal.mean():.4f}")
 
         return saisonalitaet_signal
 
+    def saisonalitaets_wuerfel(self, forex_daten, ticker=None, forex_returns=None):
+        """
+        Gibt den Saisonalitäts-Würfel (alle Granularitäten) für die Kurse zurück. Reihenfolge:
+        In-Memory-Memo, persistenter Cache (nur mit ticker und seasonality_cache), Neuberechnung.
+        """
+        fingerabdruck = frame_fingerprint(forex_daten[self.PRICE_COLUMN])
+        _, wuerfel = self._wuerfel_memo.get(fingerabdruck)
+        if wuerfel is None and ticker and self.seasonality_cache is not None:
+            wuerfel = self.seasonality_cache.get(ticker, fingerabdruck)
+            if wuerfel is not None:
+                debug_print(f"Saisonalitäts-Würfel für {ticker} aus dem Cache geladen.")
+        if wuerfel is None:
+            if forex_returns is None:
+                forex_returns = forex_daten[self.PRICE_COLUMN].pct_change()
+            wuerfel = berechne_saisonalitaets_wuerfel(forex_returns.to_numpy(dtype=np.float64), forex_daten.index)
+            if ticker and self.seasonality_cache is not None:
+                self.seasonality_cache.put(ticker, fingerabdruck, wuerfel)
+        self._wuerfel_memo.put(fingerabdruck, wuerfel)
+        return wuerfel
+
+    def _saisonalitaet_werte(self, returns, datums_index):
+        """Wendet den zum konfigurierten Modus passenden Kernel auf (T,) oder (T x N) Returns an."""
+        gruppen = granularitaets_schluessel(datums_index, [self.saisonalitaet_granularitaet])[self.saisonalitaet_granularitaet]
+        if self.saisonalitaet_modus == 'expandierend':
+            jahre = saisonalitaets_jahre(datums_index, self.saisonalitaet_granularitaet)
+            return saisonalitaet_expanding_kernel(returns, jahre, gruppen)
+        return saisonalitaet_kernel(returns, gruppen)
+
+    def berechne_saisonalitaet_universum(self, preise=None, price_matrix=None):
+        """
+        Wöchentliche Saisonalität für viele Paare in einem Aufruf.
+        preise: DataFrame (Datum x Ticker) mit Schlusskursen, alternativ eine PriceMatrix.
+        Gibt einen DataFrame gleicher Form zurück; jede Spalte entspricht berechne_saisonalitaet
+        für dieses Paar, an Tagen ohne Kurs des Paares ist der Wert NaN.
+        """
+        if price_matrix is not None:
+            datums_index = price_matrix.date_index()
+            kurse = np.asarray(price_matrix.values)
+            ticker = price_matrix.tickers
+        else:
+            datums_index = pd.DatetimeIndex(preise.index, name='Datum')
+            kurse = preise.to_numpy(dtype=np.float64)
+            ticker = list(preise.columns)
+        if len(datums_index) == 0:
+            return pd.DataFrame(index=datums_index, columns=ticker, dtype=float)
+
+        saisonalitaet = self._saisonalitaet_werte(berechne_returns_matrix(kurse), datums_index)
+        saisonalitaet[np.isnan(kurse)] = np.nan
+        debug_print(f"Saisonalität für {len(ticker)} Paare über {len(datums_index)} Tage berechnet.")
+        return pd.DataFrame(saisonalitaet, index=datums_index, columns=ticker)
+
     def berechne_bip_momentum(self, bip_daten, bip_col_country1, bip_col_country2):
         """
         Berechnet das BIP-Momentum. bip_col_country1 ist für die Basiswährung, bip_col_country2 für die Kurswährung.
@@ -177,7 +558,7 @@ class SignalAnalyzer:
         bip_momentum_signal_raw[verkauf_bedingung] = -1
 
         debug_print("Rohes BIP-Momentum-Signal (auf BIP-Datenfrequenz):", bip_momentum_signal_raw)
-        if not bip_momentum_signal_raw.empty:
+        if not bip_momentum_signal_raw.empty and logger.isEnabledFor(logging.DEBUG):
             debug_print(f"Verteilung rohes BIP-Signal:\n{bip_momentum_signal_raw.value_counts(dropna=False)}")
 
         return bip_momentum_signal_raw
@@ -191,9 +572,18 @@ class SignalAnalyzer:
         """
         Kombiniert Signale aus Saisonalität und dem neuen GDP-Momentum-Signal.
         forex_daten_idx wird für den finalen Index benötigt.
-        gdp_momentum_signal_aligned: Die Signal-Serie ('long', 'short', None) von compare_gdp_momentum,
-                                     ausgerichtet auf den Forex-Datenindex.
+        gdp_momentum_signal_aligned: Die int8-Signalserie (Signal) von compare_gdp_momentum,
+                                     ausgerichtet auf den Forex-Datenindex (z.B. mit richte_signal_aus).
+        Gibt eine int8-Serie (Signal.LONG / Signal.SHORT / Signal.NEUTRAL) auf forex_daten_idx zurück.
         """
+        if self.result_cache is not None:
+            return self.result_cache.get_or_compute(
+                'signale', (forex_daten_idx, saisonalitaet_raw, gdp_momentum_signal_aligned,
+                            self.schwelle_saisonalitaet_kauf, self.schwelle_saisonalitaet_verkauf),
+                lambda: self._generiere_signale(forex_daten_idx, saisonalitaet_raw, gdp_momentum_signal_aligned))
+        return self._generiere_signale(forex_daten_idx, saisonalitaet_raw, gdp_momentum_signal_aligned)
+
+    def _generiere_signale(self, forex_daten_idx, saisonalitaet_raw, gdp_momentum_signal_aligned):
         debug_print("Beginne Generierung finaler Signale...")
         debug_print("Eingang Saisonalität (roh):", saisonalitaet_raw)
         debug_print("Eingang GDP-Momentum-Signal (ausgerichtet):", gdp_momentum_signal_aligned)
@@ -204,83 +594,67 @@ class SignalAnalyzer:
 
         if common_index.empty:
             debug_print("Kein gemeinsamer Index zwischen Saisonalität und GDP-Momentum-Signal.")
-            return pd.Series(index=forex_daten_idx, data=0, name="Signal")
-
-        saisonalitaet = saisonalitaet_raw.reindex(common_index).fillna(0)
-        # Konvertiere 'long'/'short'/None zu 1/-1/0 für die Kombination
-        gdp_signal_numeric = pd.Series(index=common_index, data=0, dtype=int)
-        gdp_signal_numeric[gdp_momentum_signal_aligned.reindex(common_index) == 'long'] = 1
-        gdp_signal_numeric[gdp_momentum_signal_aligned.reindex(common_index) == 'short'] = -1
+            return pd.Series(np.zeros(len(forex_daten_idx), dtype=SIGNAL_DTYPE), index=forex_daten_idx, name="Signal")
 
+        saisonalitaet = saisonalitaet_raw.reindex(common_index).fillna(0).to_numpy(dtype=np.float64)
+        # GDP-Signal ist bereits int8 (Signal); fehlende Werte gelten als neutral
+        gdp_signal_numeric = gdp_momentum_signal_aligned.reindex(common_index).fillna(Signal.NEUTRAL).to_numpy(dtype=SIGNAL_DTYPE)
         debug_print("Numerisches GDP-Momentum-Signal (1=long, -1=short, 0=none):", gdp_signal_numeric)
 
-
-        saison_signal_numeric = pd.Series(index=common_index, data=0, name="Saison_Signal_Interpretiert", dtype=int)
-        saison_signal_numeric[saisonalitaet > self.schwelle_saisonalitaet_kauf] = 1
-        saison_signal_numeric[saisonalitaet < self.schwelle_saisonalitaet_verkauf] = -1
+        saison_signal_numeric = np.zeros(len(common_index), dtype=SIGNAL_DTYPE)
+        saison_signal_numeric[saisonalitaet > self.schwelle_saisonalitaet_kauf] = Signal.LONG
+        saison_signal_numeric[saisonalitaet < self.schwelle_saisonalitaet_verkauf] = Signal.SHORT
         debug_print("Interpretiertes Saisonalitätssignal (numerisch):", saison_signal_numeric)
-        if not saison_signal_numeric.empty: # Geändert von saison_signal zu saison_signal_numeric
-            debug_print(f"Verteilung Saisonalitätssignal (interpretiert):\n{saison_signal_numeric.value_counts(dropna=False)}")
-
-
-        final_signal = pd.Series(index=common_index, data=0, name="Signal", dtype=int)
-        # Geänderte Logik: Ein Signal wird nur gegeben, wenn BEIDE Indikatoren die jeweiligen Schwellenwerte erreichen (übereinstimmen).
-
-        # Strenge Kaufbedingung: Saisonalität signalisiert Kauf UND GDP-Momentum signalisiert Long.
-        cond_kauf_stark = (saison_signal_numeric == 1) & (gdp_signal_numeric == 1)
-        final_signal[cond_kauf_stark] = 1
-
-        # Strenge Verkaufsbedingung: Saisonalität signalisiert Verkauf UND GDP-Momentum signalisiert Short.
-        cond_verkauf_stark = (saison_signal_numeric == -1) & (gdp_signal_numeric == -1)
-        final_signal[cond_verkauf_stark] = -1
-
-        # Alle anderen Fälle resultieren in einem neutralen Signal (0), was die Standardinitialisierung ist.
+        if saison_signal_numeric.size and logger.isEnabledFor(logging.DEBUG):
+            debug_print(f"Verteilung Saisonalitätssignal (interpretiert):\n{pd.Series(saison_signal_numeric).value_counts()}")
 
+        # Ein Signal wird nur gegeben, wenn BEIDE Indikatoren übereinstimmen (Kauf & Long bzw. Verkauf & Short);
+        # alle anderen Fälle bleiben neutral.
+        final_werte = np.where(saison_signal_numeric == gdp_signal_numeric, saison_signal_numeric, Signal.NEUTRAL).astype(SIGNAL_DTYPE)
+        final_signal = pd.Series(final_werte, index=common_index, name="Signal")
 
         # Reindex auf den ursprünglichen Forex-Daten-Index, um sicherzustellen, dass alle Datenpunkte abgedeckt sind
-        final_signal = final_signal.reindex(forex_daten_idx).fillna(0) # ffill() könnte hier auch Sinn machen, je nach Anforderung
+        final_signal = final_signal.reindex(forex_daten_idx, fill_value=Signal.NEUTRAL).astype(SIGNAL_DTYPE)
         debug_print("Finale kombinierte Signale:", final_signal)
-        if not final_signal.empty:
+        if not final_signal.empty and logger.isEnabledFor(logging.DEBUG):
             debug_print(f"Verteilung finale Signale:\n{final_signal.value_counts(dropna=False)}")
 
         return final_signal
 
-    def apply_signal_cooldown(self, signal_series: pd.Series, cooldown_days: int = 5):
+    def apply_signal_cooldown(self, signal_series, cooldown_days: int = 5):
         """
         Applies a cooldown period to signals. After a signal (1 or -1) is emitted,
         no new signal will be emitted for the specified number of cooldown_days.
         Any signals within this cooldown period are set to 0 (neutral).
 
         Args:
-            signal_series (pd.Series): The input signal series (1, -1, 0).
+            signal_series (pd.Series | pd.DataFrame): The input signal series (int8, see Signal) with an
+                ascending DatetimeIndex, or a panel (dates x pairs); each column gets its own cooldown.
             cooldown_days (int): The number of days for the cooldown period.
 
         Returns:
-            pd.Series: The signal series with cooldown applied.
+            pd.Series | pd.DataFrame: The signals with cooldown applied (int8).
         """
         if cooldown_days <= 0:
             return signal_series # No cooldown if period is zero or negative
+        if self.result_cache is not None:
+            return self.result_cache.get_or_compute(
+                'cooldown', (signal_series, cooldown_days),
+                lambda: self._apply_signal_cooldown(signal_series, cooldown_days))
+        return self._apply_signal_cooldown(signal_series, cooldown_days)
 
+    def _apply_signal_cooldown(self, signal_series, cooldown_days):
         debug_print(f"Anwende Signals-Cooldown von {cooldown_days} Tagen.")
 
-        # Erstelle eine Kopie, um die Originalserie nicht zu verändern (obwohl generiere_signale bereits eine neue Serie zurückgibt)
-        # Die Logik hier erstellt eine komplett neue Serie.
-        filtered_signals = pd.Series(0, index=signal_series.index, name=signal_series.name)
-
-        # Finde die Zeitpunkte, an denen ein ursprüngliches Signal (nicht 0) vorliegt
-        original_signal_dates = signal_series[signal_series != 0].index
-
-        last_active_signal_date = pd.Timestamp.min # Initialisiere mit einem sehr frühen Datum
-
-        for current_signal_date in original_signal_dates:
-            # Prüfe, ob das aktuelle Signal außerhalb der Cooldown-Periode des letzten aktiven Signals liegt
-            if current_signal_date >= last_active_signal_date + pd.Timedelta(days=cooldown_days):
-                # Dieses Signal ist gültig
-                filtered_signals.loc[current_signal_date] = signal_series.loc[current_signal_date]
-                last_active_signal_date = current_signal_date
-            # Ansonsten bleibt das Signal in filtered_signals auf 0 (neutral) für dieses Datum
+        gefiltert = signal_cooldown_kernel(_zeit_ns(signal_series.index), signal_series.to_numpy(dtype=SIGNAL_DTYPE),
+                                           pd.Timedelta(days=cooldown_days).value)
+        if isinstance(signal_series, pd.DataFrame):
+            filtered_signals = pd.DataFrame(gefiltert, index=signal_series.index, columns=signal_series.columns)
+        else:
+            filtered_signals = pd.Series(gefiltert, index=signal_series.index, name=signal_series.name)
 
-        debug_print(f"Verteilung Signale nach Cooldown:\n{filtered_signals.value_counts(dropna=False)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_print(f"Verteilung Signale nach Cooldown:\n{pd.Series(gefiltert.ravel()).value_counts()}")
         return filtered_signals
 
 
@@ -312,8 +686,8 @@ class SignalAnalyzer:
             ax1.plot(forex_daten.index, forex_daten[self.PRICE_COLUMN], label=f'Forex Kurs ({self.PRICE_COLUMN})', color='blue')
 
             if not final_signale.empty:
-                kauf_zeitpunkte = final_signale[final_signale == 1].index
-                verkauf_zeitpunkte = final_signale[final_signale == -1].index
+                kauf_zeitpunkte = final_signale[final_signale == Signal.LONG].index
+                verkauf_zeitpunkte = final_signale[final_signale == Signal.SHORT].index
 
                 kauf_zeitpunkte_valid = kauf_zeitpunkte.intersection(forex_daten.index)
                 verkauf_zeitpunkte_valid = verkauf_zeitpunkte.intersection(forex_daten.index)
@@ -416,31 +790,53 @@ class SignalAnalyzer:
 # SCHWELLE_SAISONALITAET_VERKAUF = -0.0005 # Wird jetzt in der Klasse als self.schwelle_saisonalitaet_verkauf definiert
 
 
-# Neue Funktion gemäß Anforderung
-def compare_gdp_momentum(gdp_series_a: pd.Series, gdp_series_b: pd.Series,
-                         n_periods_growth: int = 4,
-                         long_threshold: float = 30.0, short_threshold: float = -30.0):
+class GdpMomentumDifference:
+    """
+    Vorberechnete Momentum-Differenz zweier Länder (teurer Teil von compare_gdp_momentum:
+    Interpolation, Wachstum, Skalierung, Differenz). Die Auswertung gegen Schwellenwerte ist billig
+    und kann für viele (long, short)-Paare auf einmal erfolgen, ohne neu zu rechnen.
     """
-    Analysiert und bewertet das BIP-Momentum zweier Staaten oder Regionen normiert.
-    Verwendet die global in signal_analyzer.py gesetzte DEBUG_OUTPUT_CALLBACK Funktion.
 
-    Args:
-        gdp_series_a (pd.Series): Zeitreihe (Datum -> BIP-Wert) für Staat A.
-        gdp_series_b (pd.Series): Zeitreihe (Datum -> BIP-Wert) für Staat B.
-        n_periods_growth (int): Anzahl der Perioden für die Wachstumsberechnung (z.B. 4 für YoY bei Quartalsdaten).
-        long_threshold (float): Schwellenwert für Long-Signal auf Basis der skalierten Momentum-Differenz.
-        short_threshold (float): Schwellenwert für Short-Signal auf Basis der skalierten Momentum-Differenz.
+    def __init__(self, momentum_a_scaled, momentum_b_scaled, momentum_difference):
+        self.momentum_a_scaled = momentum_a_scaled
+        self.momentum_b_scaled = momentum_b_scaled
+        self.momentum_difference = momentum_difference # pd.Series, Index = Quartale
+
+    def signal_series(self, long_threshold, short_threshold):
+        """int8-Signalserie (Signal.LONG, Signal.SHORT, sonst Signal.NEUTRAL) auf dem Quartalsindex."""
+        return pd.Series(self.sweep([(long_threshold, short_threshold)])[:, 0],
+                         index=self.momentum_difference.index, name="Signal")
+
+    def sweep(self, thresholds):
+        """
+        Wertet die Differenz gegen k Schwellenpaare aus. thresholds: Sequenz von (long, short) bzw. Array (k x 2).
+        Gibt eine int8-Matrix (Quartale x k) zurück: +1 long, -1 short, 0 kein Signal.
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64).reshape(-1, 2)
+        differenz = self.momentum_difference.to_numpy(dtype=np.float64)[:, None]
+        # Long-Signal Bedingung, danach Short (Short hat bei überlappenden Schwellen Vorrang)
+        signale = (differenz > thresholds[None, :, 0]).astype(SIGNAL_DTYPE)
+        signale[differenz < thresholds[None, :, 1]] = Signal.SHORT
+        return signale
 
-    Returns:
-        tuple: (momentum_a_scaled, momentum_b_scaled, momentum_difference, signal_series)
-               Alle als pandas Series, indexiert wie die synchronisierten Eingangsdaten.
-               Signal-Series enthält 'long', 'short', oder None.
-               Gibt (empty_series, empty_series, empty_series, empty_object_series) zurück bei Datenproblemen.
-    """
-    # current_debug_print = debug_callback if debug_callback else debug_print # Entfernt - nutze globalen debug_print
 
+def _als_gdp_serie(gdp_daten, name):
+    """BIP-Serie aus einer pd.Series oder einem Point-in-Time-Stand (PointInTimeGdpStore.as_of, Spalte 'Wert')."""
+    if isinstance(gdp_daten, pd.DataFrame):
+        return gdp_daten[PointInTimeGdpStore.VALUE_COLUMN].rename(name)
+    return gdp_daten
+
+
+def berechne_gdp_momentum_differenz(gdp_series_a, gdp_series_b, n_periods_growth: int = 4):
+    """
+    Teurer Teil von compare_gdp_momentum: synchronisiert beide Serien, berechnet Wachstum,
+    Min-Max-Skalierung und Differenz. Gibt ein GdpMomentumDifference zurück, None bei Datenproblemen.
+    Statt Serien werden auch Point-in-Time-Stände (DataManager.get_gdp_as_of) akzeptiert.
+    """
+    gdp_series_a = _als_gdp_serie(gdp_series_a, 'A')
+    gdp_series_b = _als_gdp_serie(gdp_series_b, 'B')
     debug_print(f"Starte compare_gdp_momentum für {gdp_series_a.name} und {gdp_series_b.name}") # Geändert zu debug_print
-    debug_print(f"n_periods_growth: {n_periods_growth}, long_threshold: {long_threshold}, short_threshold: {short_threshold}") # Geändert zu debug_print
+    debug_print(f"n_periods_growth: {n_periods_growth}") # Geändert zu debug_print
 
     # 1. Datenvorbereitung und Synchronisierung
     if not isinstance(gdp_series_a.index, pd.DatetimeIndex):
@@ -467,8 +863,7 @@ def compare_gdp_momentum(gdp_series_a: pd.Series, gdp_series_b: pd.Series,
 
     if len(processed_gdp) < n_periods_growth + 1: # Brauchen genug Daten für mindestens eine Wachstumsberechnung
         debug_print(f"FEHLER: Nicht genügend überlappende Datenpunkte ({len(processed_gdp)}) nach Synchronisierung und Bereinigung für Wachstumsberechnung mit n_periods_growth={n_periods_growth}.") # Geändert zu debug_print
-        empty_series = pd.Series(dtype=float)
-        return empty_series, empty_series, empty_series, pd.Series(dtype=object)
+        return None
 
 
     # 2. Wachstumsratenberechnung (z.B. Year-over-Year)
@@ -485,8 +880,7 @@ def compare_gdp_momentum(gdp_series_a: pd.Series, gdp_series_b: pd.Series,
 
     if growth_df.empty:
         debug_print("FEHLER: Keine überlappenden Wachstumsdaten nach Berechnung und Bereinigung.") # Geändert zu debug_print
-        empty_series = pd.Series(dtype=float)
-        return empty_series, empty_series, empty_series, pd.Series(dtype=object)
+        return None
 
     debug_print("BIP-Wachstumsraten berechnet (A):", growth_df['growth_A']) # Geändert zu debug_print
     debug_print("BIP-Wachstumsraten berechnet (B):", growth_df['growth_B']) # Geändert zu debug_print
@@ -515,20 +909,167 @@ def compare_gdp_momentum(gdp_series_a: pd.Series, gdp_series_b: pd.Series,
     # 4. Differenz der skalierten Momentum-Werte berechnen
     momentum_difference = (momentum_a_scaled - momentum_b_scaled).rename("Momentum_Difference")
     debug_print("Momentum-Differenz (A - B, skaliert):", momentum_difference) # Geändert zu debug_print
+    return GdpMomentumDifference(momentum_a_scaled, momentum_b_scaled, momentum_difference)
+
+
+# Neue Funktion gemäß Anforderung
+def compare_gdp_momentum(gdp_series_a, gdp_series_b,
+                         n_periods_growth: int = 4,
+                         long_threshold: float = 30.0, short_threshold: float = -30.0, result_cache=None):
+    """
+    Analysiert und bewertet das BIP-Momentum zweier Staaten oder Regionen normiert.
+    Für viele Schwellenwerte auf denselben Daten besser berechne_gdp_momentum_differenz(...).sweep(...) nutzen.
+
+    Args:
+        gdp_series_a (pd.Series): Zeitreihe (Datum -> BIP-Wert) für Staat A, oder ein Point-in-Time-Stand
+                                  aus DataManager.get_gdp_as_of / PointInTimeGdpStore.as_of.
+        gdp_series_b (pd.Series): Zeitreihe (Datum -> BIP-Wert) für Staat B (ebenso).
+        n_periods_growth (int): Anzahl der Perioden für die Wachstumsberechnung (z.B. 4 für YoY bei Quartalsdaten).
+        long_threshold (float): Schwellenwert für Long-Signal auf Basis der skalierten Momentum-Differenz.
+        short_threshold (float): Schwellenwert für Short-Signal auf Basis der skalierten Momentum-Differenz.
+        result_cache (ResultCache, optional): Ergebnis-Cache; gleiche Serien und Parameter werden nur einmal berechnet.
+
+    Returns:
+        tuple: (momentum_a_scaled, momentum_b_scaled, momentum_difference, signal_series)
+               Alle als pandas Series, indexiert wie die synchronisierten Eingangsdaten.
+               Signal-Series ist int8 (Signal.LONG, Signal.SHORT, Signal.NEUTRAL).
+               Gibt (empty_series, empty_series, empty_series, leere int8-Series) zurück bei Datenproblemen.
+    """
+    if result_cache is not None:
+        return result_cache.get_or_compute(
+            'gdp_momentum', (_als_gdp_serie(gdp_series_a, 'A'), _als_gdp_serie(gdp_series_b, 'B'),
+                             n_periods_growth, long_threshold, short_threshold),
+            lambda: compare_gdp_momentum(gdp_series_a, gdp_series_b, n_periods_growth, long_threshold, short_threshold))
+    differenz = berechne_gdp_momentum_differenz(gdp_series_a, gdp_series_b, n_periods_growth)
+    if differenz is None:
+        empty_series = pd.Series(dtype=float)
+        return empty_series, empty_series, empty_series, pd.Series(dtype=SIGNAL_DTYPE, name="Signal")
 
     # 5. Signallogik anwenden
-    # Initialisiere die Signal-Serie mit None (oder np.nan, dann konvertieren)
-    signal_series = pd.Series(index=momentum_difference.index, dtype=object, name="Signal")
+    debug_print(f"long_threshold: {long_threshold}, short_threshold: {short_threshold}")
+    signal_series = differenz.signal_series(long_threshold, short_threshold)
+    if logger.isEnabledFor(logging.DEBUG):
+        debug_print("Generierte Signale:", signal_series[signal_series != Signal.NEUTRAL]) # Zeige nur tatsächliche Signale
+
+    return differenz.momentum_a_scaled, differenz.momentum_b_scaled, differenz.momentum_difference, signal_series
 
-    # Long-Signal Bedingung
-    signal_series[momentum_difference > long_threshold] = 'long'
-    # Short-Signal Bedingung
-    signal_series[momentum_difference < short_threshold] = 'short'
-    # Kein Signal (bleibt None oder NaN, was in Ordnung ist)
 
-    debug_print("Generierte Signale:", signal_series[signal_series.notna()]) # Geändert zu debug_print, zeige nur tatsächliche Signale
+class GdpMomentumPanel:
+    """
+    Ergebnis von compare_gdp_momentum_panel: skaliertes BIP-Momentum pro Land über dessen eigenen
+    Zeitraum (T x C), pair_momentum[t, i, j] = Momentum von i skaliert über den Zeitraum des Paares
+    (erstes bis letztes Quartal, in dem i oder j Daten hat; T x C x C) und der Differenz-Tensor
+    difference[t, i, j] = pair_momentum[t, i, j] - pair_momentum[t, j, i]. Außerhalb des Paar-Zeitraums stehen NaN.
+    """
+
+    def __init__(self, index, countries, momentum_scaled, pair_momentum, difference, long_threshold, short_threshold):
+        self.index = index
+        self.countries = list(countries)
+        self.momentum_scaled = momentum_scaled # DataFrame (Quartale x Länder)
+        self.pair_momentum = pair_momentum # np.ndarray (Quartale x Länder x Länder)
+        self.difference = difference # np.ndarray (Quartale x Länder x Länder)
+        self.long_threshold = long_threshold
+        self.short_threshold = short_threshold
+        self._position = {country: i for i, country in enumerate(self.countries)}
+
+    def signals(self, long_threshold=None, short_threshold=None):
+        """Signal-Tensor (T x C x C) als int8: +1 long, -1 short, 0 kein Signal."""
+        long_threshold = self.long_threshold if long_threshold is None else long_threshold
+        short_threshold = self.short_threshold if short_threshold is None else short_threshold
+        signale = np.zeros(self.difference.shape, dtype=SIGNAL_DTYPE)
+        signale[self.difference > long_threshold] = Signal.LONG
+        signale[self.difference < short_threshold] = Signal.SHORT
+        return signale
+
+    def pair(self, country_a, country_b):
+        """
+        Ergebnis für ein Paar im Format von compare_gdp_momentum:
+        (momentum_a_scaled, momentum_b_scaled, momentum_difference, signal_series).
+        """
+        differenz = self.differenz(country_a, country_b)
+        return (differenz.momentum_a_scaled, differenz.momentum_b_scaled, differenz.momentum_difference,
+                differenz.signal_series(self.long_threshold, self.short_threshold))
 
-    return momentum_a_scaled, momentum_b_scaled, momentum_difference, signal_series
+    def differenz(self, country_a, country_b):
+        """
+        Momentum-Differenz eines Paares als GdpMomentumDifference (z.B. für Schwellen-Sweeps), nur über
+        den Zeitraum des Paares.
+        """
+        i, j = self._position[country_a], self._position[country_b]
+        zeilen = ~np.isnan(self.difference[:, i, j])
+        index = self.index[zeilen]
+        return GdpMomentumDifference(pd.Series(self.pair_momentum[zeilen, i, j], index=index, name=f"{country_a}_scaled"),
+                                     pd.Series(self.pair_momentum[zeilen, j, i], index=index, name=f"{country_b}_scaled"),
+                                     pd.Series(self.difference[zeilen, i, j], index=index, name="Momentum_Difference"))
+
+    def signale_fuer_paare(self, paare):
+        """
+        Signale für viele Paare aus einem Aufruf, z.B. paare = [(p["country1"], p["country2"]) for p in FOREX_PAIRS_CONFIG].
+        Gibt {(land_a, land_b): signal_series} zurück; Paare mit fehlenden Ländern werden übersprungen.
+        """
+        ergebnis = {}
+        for country_a, country_b in paare:
+            if country_a in self._position and country_b in self._position:
+                ergebnis[(country_a, country_b)] = self.pair(country_a, country_b)[3]
+            else:
+                debug_print(f"WARNUNG: Keine BIP-Daten im Panel für Paar {country_a}/{country_b}.")
+        return ergebnis
 
 
-print("SignalAnalyzer Modul geladen.") # Temporärer Debug-Print
+def compare_gdp_momentum_panel(gdp_matrix: pd.DataFrame, n_periods_growth: int = 4,
+                               long_threshold: float = 30.0, short_threshold: float = -30.0):
+    """
+    Panel-Variante von compare_gdp_momentum für eine (Quartale x Länder) BIP-Matrix, z.B. aus
+    DataManager.get_gdp_matrix. Interpolation und Wachstum laufen einmal pro Land; Min-Max-Skalierung
+    und Differenzen aller Paare entstehen per Broadcasting, jeweils maskiert auf den Zeitraum des Paares
+    (erstes bis letztes Quartal, in dem eines der beiden Länder Daten hat). Wie in compare_gdp_momentum
+    wird ein kürzeres Land an den Rändern mit seinem ersten bzw. letzten Wert aufgefüllt; jedes Paar
+    entspricht damit compare_gdp_momentum auf den Serien beider Länder ohne gemeinsame NaN-Zeilen
+    (z.B. aus get_bip_data), auch wenn die Serien unterschiedlich lang sind.
+    Gibt ein GdpMomentumPanel zurück (oder None bei zu wenigen Daten).
+    """
+    debug_print(f"Starte compare_gdp_momentum_panel für {len(gdp_matrix.columns)} Länder, n_periods_growth: {n_periods_growth}")
+    gdp_matrix = gdp_matrix.copy()
+    if not isinstance(gdp_matrix.index, pd.DatetimeIndex):
+        gdp_matrix.index = pd.to_datetime(gdp_matrix.index)
+
+    # Wie im Paarfall: lineare Interpolation, Ränder mit dem ersten bzw. letzten Wert aufgefüllt; Länder ganz ohne Daten entfallen
+    gdp_matrix = gdp_matrix.sort_index().dropna(axis=1, how='all')
+    interpolated = gdp_matrix.interpolate(method='linear', limit_direction='both')
+    if len(interpolated) < n_periods_growth + 1 or interpolated.columns.empty:
+        debug_print(f"FEHLER: Nicht genügend Datenpunkte ({len(interpolated)}) im BIP-Panel für n_periods_growth={n_periods_growth}.")
+        return None
+
+    werte = interpolated.to_numpy(dtype=np.float64)
+    wachstum = werte[n_periods_growth:] / werte[:-n_periods_growth] - 1 # (T x C)
+
+    # Zeitraum je Paar (Zeilen der Wertematrix): vom ersten bis zum letzten Quartal mit Daten von i oder j.
+    # maske[t, i, j], wenn beide Zeilen des Wachstums (t und t + n_periods_growth) darin liegen.
+    vorhanden = gdp_matrix.notna().to_numpy()
+    erste = vorhanden.argmax(axis=0)
+    letzte = len(vorhanden) - 1 - vorhanden[::-1].argmax(axis=0)
+    von = np.minimum(erste[:, None], erste[None, :]) # (C x C)
+    bis = np.maximum(letzte[:, None], letzte[None, :])
+    zeilen = np.arange(len(wachstum))[:, None, None]
+    maske = (zeilen >= von) & (zeilen + n_periods_growth <= bis) # (T x C x C)
+    gueltig = np.diagonal(maske, axis1=1, axis2=2) # (T x C), eigener Zeitraum jedes Landes
+    paar_wachstum = np.broadcast_to(wachstum[:, :, None], maske.shape) # Wachstum von i im Paar (i, j)
+
+    # Min-Max-Skalierung auf [-100, 100] pro Land und Paar-Zeitraum; ohne Varianz -> 0
+    minimum = np.where(maske, paar_wachstum, np.inf).min(axis=0) # (C x C)
+    maximum = np.where(maske, paar_wachstum, -np.inf).max(axis=0)
+    mit_varianz = maximum > minimum
+    minimum = np.where(mit_varianz, minimum, 0.0)
+    spanne = np.where(mit_varianz, maximum - minimum, 1.0)
+    skaliert = np.where(mit_varianz, 200.0 * (paar_wachstum - minimum) / spanne - 100.0, 0.0)
+    skaliert[~maske] = np.nan
+    eigene = np.diagonal(mit_varianz) | ~gueltig.any(axis=0)
+    if not eigene.all():
+        debug_print(f"WARNUNG: Min-Max-Skalierung nicht möglich für {list(interpolated.columns[~eigene])}. Gebe Nullen zurück.")
+
+    index = interpolated.index[n_periods_growth:]
+    # Diagonale: jedes Land über seinen eigenen Zeitraum skaliert
+    momentum_scaled = pd.DataFrame(np.diagonal(skaliert, axis1=1, axis2=2), index=index, columns=interpolated.columns)
+    difference = skaliert - skaliert.transpose(0, 2, 1) # (T x C x C)
+    debug_print("Skalierte Momentum-Werte (Panel):", momentum_scaled)
+    return GdpMomentumPanel(index, interpolated.columns, momentum_scaled, skaliert, difference, long_threshold, short_threshold)
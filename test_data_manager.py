@@ -0,0 +1,121 @@
+"""
+Tests des DataManagers und der Kurs-Provider ohne Netzwerkzugriff (pytest).
+
+Aufruf:
+    python -m pytest -q test_data_manager.py
+"""
+import numpy as np
+import pandas as pd
+
+from data_manager import DataManager
+from data_providers import RecordingDataProvider, ReplayDataProvider
+from data_store import CountryGdpRegistry, PointInTimeGdpStore
+from conftest import synthetic_prices
+
+
+class FesteKurse:
+    """Provider mit festen Kursreihen pro Ticker; zählt, welche Ticker angefragt wurden."""
+
+    def __init__(self, frames, gdp=None):
+        self.frames = frames
+        self.gdp = gdp or {}
+        self.angefragt = []
+
+    def download_prices(self, tickers, start_date, end_date):
+        self.angefragt.extend(tickers)
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        return {ticker: self.frames[ticker][(self.frames[ticker].index >= start) & (self.frames[ticker].index < end)]
+                if ticker in self.frames else pd.DataFrame() for ticker in tickers}
+
+    def fetch_gdp_series(self, series_id, start_date, end_date):
+        return self.gdp.get(series_id, pd.DataFrame())
+
+
+def _data_manager(provider, **kwargs):
+    # Eigene Register statt der prozessweiten, damit Tests sich nicht gegenseitig beeinflussen
+    return DataManager(price_store_path=None, gdp_cache_path=None, data_provider=provider,
+                       gdp_registry=CountryGdpRegistry(), gdp_vintage_store=PointInTimeGdpStore(None), **kwargs)
+
+
+def _legs():
+    kurse = synthetic_prices(n_days=300, n_pairs=2, seed=3)
+    eurusd = kurse[['P0=X']].rename(columns={'P0=X': 'Schlusskurs'}) * 1.1
+    usdjpy = kurse[['P1=X']].rename(columns={'P1=X': 'Schlusskurs'}) * 110.0
+    return {'EURUSD=X': eurusd, 'JPY=X': usdjpy.drop(usdjpy.index[[5, 17, 40]])}
+
+
+def test_kreuzkurs_aus_usd_legs():
+    legs = _legs()
+    kreuz = _data_manager(FesteKurse(legs)).get_cross_rate_data('eur', 'jpy', '2000-01-01', '2002-01-01')
+    # EUR/JPY = (USD pro EUR) / (USD pro JPY) = EURUSD * USDJPY, nur an Tagen mit Kursen beider Legs
+    gemeinsam = legs['EURUSD=X'].index.intersection(legs['JPY=X'].index)
+    assert list(kreuz.columns) == ['Schlusskurs'] and kreuz.index.name == 'Datum'
+    pd.testing.assert_index_equal(kreuz.index, gemeinsam, check_names=False)
+    np.testing.assert_allclose(kreuz['Schlusskurs'].to_numpy(),
+                               (legs['EURUSD=X'].loc[gemeinsam, 'Schlusskurs'] * legs['JPY=X'].loc[gemeinsam, 'Schlusskurs']).to_numpy())
+
+
+def test_kreuzkurs_mit_usd_seite_nutzt_nur_ein_leg():
+    legs = _legs()
+    provider = FesteKurse(legs)
+    kreuz = _data_manager(provider).get_cross_rate_data('JPY', 'USD', '2000-01-01', '2002-01-01')
+    np.testing.assert_allclose(kreuz['Schlusskurs'].to_numpy(), 1.0 / legs['JPY=X']['Schlusskurs'].to_numpy())
+    assert provider.angefragt == ['JPY=X']
+
+
+def test_kreuzkurs_ohne_leg_ist_leer():
+    data_manager = _data_manager(FesteKurse({'EURUSD=X': _legs()['EURUSD=X']}))
+    assert data_manager.get_cross_rate_data('EUR', 'XYZ', '2000-01-01', '2002-01-01').empty # nicht konfiguriert
+    assert data_manager.get_cross_rate_data('EUR', 'JPY', '2000-01-01', '2002-01-01').empty # Leg ohne Daten
+
+
+def test_synthese_ersetzt_download_des_kreuzpaars():
+    legs = _legs()
+    provider = FesteKurse(legs)
+    data_manager = _data_manager(provider, synthesize_crosses=True)
+    kreuz = data_manager.get_forex_data('EURJPY', '2000-01-01', '2002-01-01')
+    pd.testing.assert_frame_equal(kreuz, data_manager.get_cross_rate_data('EUR', 'JPY', '2000-01-01', '2002-01-01'))
+    assert 'EURJPY=X' not in provider.angefragt
+    # USD-Paare werden weiterhin direkt geladen
+    data_manager.get_forex_data('EURUSD', '2000-01-01', '2002-01-01')
+    assert provider.angefragt[-1] == 'EURUSD=X'
+
+
+def _bip(series_id):
+    index = pd.date_range('2000-01-01', periods=40, freq='QS', name='DATE')
+    return pd.DataFrame({series_id: np.linspace(100.0, 140.0, len(index))}, index=index)
+
+
+def test_aufzeichnung_und_wiedergabe_liefern_dieselben_daten(tmp_path):
+    legs = _legs()
+    aufnahme = RecordingDataProvider(str(tmp_path), inner_provider=FesteKurse(legs, gdp={'GDPC1': _bip('GDPC1')}))
+    live = aufnahme.download_prices(['EURUSD=X', 'JPY=X', 'FEHLT=X'], '2000-01-01', '2002-01-01')
+    live_bip = aufnahme.fetch_gdp_series('GDPC1', '2000-01-01', '2010-01-01')
+
+    wiedergabe = ReplayDataProvider(str(tmp_path))
+    offline = wiedergabe.download_prices(['EURUSD=X', 'JPY=X', 'FEHLT=X'], '2000-01-01', '2002-01-01')
+    for ticker in ('EURUSD=X', 'JPY=X'):
+        pd.testing.assert_frame_equal(offline[ticker], live[ticker], check_freq=False)
+    assert offline['FEHLT=X'].empty
+    offline_bip = wiedergabe.fetch_gdp_series('GDPC1', '2000-01-01', '2010-01-01')
+    np.testing.assert_allclose(offline_bip['GDPC1'].to_numpy(), live_bip['GDPC1'].to_numpy())
+    assert list(offline_bip.index) == list(live_bip.index)
+
+
+def test_aufzeichnung_ergaenzt_fruehere_zeitraeume(tmp_path):
+    legs = _legs()
+    aufnahme = RecordingDataProvider(str(tmp_path), inner_provider=FesteKurse(legs))
+    aufnahme.download_prices(['EURUSD=X'], '2000-01-01', '2000-06-01')
+    aufnahme.download_prices(['EURUSD=X'], '2000-05-01', '2000-10-01')
+    offline = ReplayDataProvider(str(tmp_path)).download_prices(['EURUSD=X'], '2000-01-01', '2000-10-01')['EURUSD=X']
+    erwartet = legs['EURUSD=X'][legs['EURUSD=X'].index < '2000-10-01']
+    pd.testing.assert_frame_equal(offline, erwartet, check_freq=False)
+
+
+def test_data_manager_mit_wiedergabe_wie_mit_aufnahme(tmp_path):
+    legs = _legs()
+    aufgezeichnet = _data_manager(RecordingDataProvider(str(tmp_path / 'provider'), inner_provider=FesteKurse(legs)))
+    live = aufgezeichnet.get_historical_price_data('EURUSD=X', '2000-01-01', '2001-01-01')
+    wiedergabe = _data_manager(ReplayDataProvider(str(tmp_path / 'provider')))
+    offline = wiedergabe.get_historical_price_data('EURUSD=X', '2000-01-01', '2001-01-01')
+    pd.testing.assert_frame_equal(offline, live, check_freq=False)
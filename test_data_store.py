@@ -0,0 +1,191 @@
+"""
+Tests der Speicher- und Koordinationsklassen in data_store.py (pytest).
+
+Aufruf:
+    python -m pytest -q test_data_store.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from data_store import PriceStore, SingleFlight, PointInTimeGdpStore
+
+
+def _kurse(start, end, wert=1.0):
+    index = pd.bdate_range(start, end, inclusive='left', name='Datum')
+    return pd.DataFrame({'Schlusskurs': wert}, index=index)
+
+
+def test_price_store_ohne_daten_fehlt_der_ganze_zeitraum(tmp_path):
+    store = PriceStore(str(tmp_path))
+    assert store.missing_ranges('EURUSD=X', '2020-01-01', '2020-03-01') == [
+        (pd.Timestamp('2020-01-01'), pd.Timestamp('2020-03-01'))]
+    assert store.load('EURUSD=X').empty
+
+
+def test_price_store_fehlende_zeitraeume_um_abgedeckten_bereich(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.merge('EURUSD=X', _kurse('2020-01-01', '2020-02-01'), '2020-01-01', '2020-02-01')
+    assert store.missing_ranges('EURUSD=X', '2020-01-10', '2020-01-20') == []
+    assert store.missing_ranges('EURUSD=X', '2019-12-01', '2020-03-01') == [
+        (pd.Timestamp('2019-12-01'), pd.Timestamp('2020-01-01')),
+        (pd.Timestamp('2020-02-01'), pd.Timestamp('2020-03-01'))]
+
+
+def test_price_store_merge_fasst_abdeckung_und_kurse_zusammen(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.merge('EURUSD=X', _kurse('2020-01-01', '2020-02-01'), '2020-01-01', '2020-02-01')
+    store.merge('EURUSD=X', _kurse('2020-03-01', '2020-04-01'), '2020-03-01', '2020-04-01')
+    assert store.missing_ranges('EURUSD=X', '2020-01-01', '2020-04-01') == [
+        (pd.Timestamp('2020-02-01'), pd.Timestamp('2020-03-01'))]
+
+    # Lücke schließen; überlappende Tage werden durch die neuen Kurse ersetzt
+    store.merge('EURUSD=X', _kurse('2020-01-20', '2020-03-10', wert=2.0), '2020-01-20', '2020-03-10')
+    assert store.missing_ranges('EURUSD=X', '2020-01-01', '2020-04-01') == []
+    kurse = store.load('EURUSD=X')
+    assert kurse.index.is_unique and kurse.index.is_monotonic_increasing
+    assert list(kurse.index) == list(pd.bdate_range('2020-01-01', '2020-04-01', inclusive='left'))
+    assert (kurse.loc['2020-01-20':'2020-03-09', 'Schlusskurs'] == 2.0).all()
+    assert (kurse.loc['2020-03-10':, 'Schlusskurs'] == 1.0).all()
+
+
+def test_price_store_read_ist_halboffen(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.merge('EURUSD=X', _kurse('2020-01-01', '2020-02-01'), '2020-01-01', '2020-02-01')
+    gelesen = store.read('EURUSD=X', '2020-01-06', '2020-01-10')
+    assert list(gelesen.index) == list(pd.bdate_range('2020-01-06', '2020-01-09'))
+
+
+def test_price_store_laufender_tag_bleibt_offen(tmp_path):
+    store = PriceStore(str(tmp_path))
+    heute = pd.Timestamp.today().normalize()
+    start = heute - pd.Timedelta(days=10)
+    store.merge('EURUSD=X', _kurse(start, heute), start, heute + pd.Timedelta(days=1))
+    assert store.missing_ranges('EURUSD=X', start, heute + pd.Timedelta(days=1)) == [(heute, heute + pd.Timedelta(days=1))]
+
+
+def test_price_store_leerer_abruf_markiert_zeitraum_als_abgedeckt(tmp_path):
+    # Zeiträume ohne Kurse (Feiertage, Wochenenden) werden nicht bei jedem Lauf erneut geladen
+    store = PriceStore(str(tmp_path))
+    store.merge('EURUSD=X', pd.DataFrame(), '2020-12-24', '2020-12-28')
+    assert store.missing_ranges('EURUSD=X', '2020-12-24', '2020-12-28') == []
+    assert store.load('EURUSD=X').empty
+
+
+def _gleichzeitig(flight, key, func, n_aufrufer=8):
+    """Startet n_aufrufer Aufrufe von flight.do(key, func), während func noch läuft; gibt die Futures zurück."""
+    freigabe = threading.Event()
+    gestartet = threading.Event()
+
+    def blockierend():
+        gestartet.set()
+        freigabe.wait(5)
+        return func()
+
+    pool = ThreadPoolExecutor(n_aufrufer)
+    futures = [pool.submit(flight.do, key, blockierend)]
+    gestartet.wait(5)
+    futures += [pool.submit(flight.do, key, blockierend) for _ in range(n_aufrufer - 1)]
+    time.sleep(0.2) # die übrigen Aufrufer warten jetzt auf das Future des ersten
+    freigabe.set()
+    pool.shutdown(wait=True)
+    return futures
+
+
+def test_single_flight_fasst_gleichzeitige_aufrufe_zusammen():
+    flight = SingleFlight()
+    aufrufe = []
+
+    def abruf():
+        aufrufe.append(1)
+        return object()
+
+    ergebnisse = [future.result() for future in _gleichzeitig(flight, ('EURUSD=X', '2020'), abruf)]
+    assert len(aufrufe) == 1
+    assert all(ergebnis is ergebnisse[0] for ergebnis in ergebnisse)
+    # Nach Abschluss wird ein neuer Aufruf wieder ausgeführt
+    flight.do(('EURUSD=X', '2020'), abruf)
+    assert len(aufrufe) == 2
+
+
+def test_single_flight_verschiedene_schluessel_laufen_getrennt():
+    flight = SingleFlight()
+    assert flight.do('a', lambda: 1) == 1
+    assert flight.do('b', lambda: 2) == 2
+
+
+def test_single_flight_gibt_fehler_an_alle_wartenden_weiter():
+    flight = SingleFlight()
+    aufrufe = []
+
+    def fehlerhaft():
+        aufrufe.append(1)
+        raise ConnectionError("FRED nicht erreichbar")
+
+    futures = _gleichzeitig(flight, 'GDPC1', fehlerhaft)
+    assert len(aufrufe) == 1
+    for future in futures:
+        with pytest.raises(ConnectionError, match="FRED nicht erreichbar"):
+            future.result()
+    # Der Fehler bleibt nicht hängen: der nächste Aufruf versucht es erneut
+    assert flight.do('GDPC1', lambda: 'ok') == 'ok'
+
+
+def _bip_serie(werte, start='2020-01-01'):
+    return pd.Series(werte, index=pd.date_range(start, periods=len(werte), freq='QS'), dtype=float)
+
+
+def test_gdp_vintages_erster_stand_mit_geschaetzter_veroeffentlichung():
+    store = PointInTimeGdpStore(None)
+    assert store.record('USA', _bip_serie([100.0, 101.0, 102.0]), publication_lag=pd.Timedelta(days=30),
+                        seen_at='2021-01-01') == 3
+    stand = store.as_of('USA', '2020-05-15')
+    # Q1 (veröffentlicht 31.01.) und Q2 (01.05.) sind bekannt, Q3 erst ab 31.07.
+    assert list(stand.index) == [pd.Timestamp('2020-01-01'), pd.Timestamp('2020-04-01')]
+    assert list(stand['Wert']) == [100.0, 101.0]
+    assert stand['Geschaetzt'].all()
+    assert stand['Veroeffentlicht'].iloc[0] == pd.Timestamp('2020-01-31')
+
+
+def test_gdp_vintages_revision_als_neuer_stand():
+    store = PointInTimeGdpStore(None)
+    store.record('USA', _bip_serie([100.0, 101.0]), publication_lag=pd.Timedelta(days=30), seen_at='2021-01-01')
+    # Unveränderter Abruf erzeugt keine Zeilen, eine Revision genau eine
+    assert store.record('USA', _bip_serie([100.0, 101.0]), seen_at='2021-02-01') == 0
+    assert store.record('USA', _bip_serie([100.0, 105.0]), seen_at='2021-03-01') == 1
+    assert len(store.vintages('USA')) == 3
+
+    vorher = store.as_of('USA', '2021-02-28')
+    nachher = store.as_of('USA', '2021-03-01')
+    assert list(vorher['Wert']) == [100.0, 101.0]
+    assert list(nachher['Wert']) == [100.0, 105.0]
+    assert nachher['Veroeffentlicht'].iloc[1] == pd.Timestamp('2021-03-01')
+    assert not nachher['Geschaetzt'].iloc[1] # beim Abruf beobachtet
+
+
+def test_gdp_vintages_bekannte_veroeffentlichungsdaten():
+    store = PointInTimeGdpStore(None)
+    veroeffentlicht = pd.DatetimeIndex(['2020-02-10', pd.NaT])
+    store.record('UK', _bip_serie([50.0, 51.0]), publication_lag=pd.Timedelta(days=90), release_dates=veroeffentlicht,
+                 seen_at='2021-01-01')
+    vintages = store.vintages('UK')
+    assert list(vintages['Veroeffentlicht']) == [pd.Timestamp('2020-02-10'), pd.Timestamp('2020-06-30')]
+    assert list(vintages['Geschaetzt']) == [False, True]
+
+
+def test_gdp_vintages_as_of_vor_erstem_stand_ist_fehler():
+    store = PointInTimeGdpStore(None)
+    store.record('USA', _bip_serie([100.0, 101.0]), publication_lag=pd.Timedelta(days=30), seen_at='2021-01-01')
+    with pytest.raises(ValueError, match='erster erfasster Stand'):
+        store.as_of('USA', '2020-01-30')
+    assert store.as_of('Japan', '2020-01-30').empty # Land ohne Stände
+
+
+def test_gdp_vintages_bleiben_ueber_instanzen_erhalten(tmp_path):
+    PointInTimeGdpStore(str(tmp_path)).record('USA', _bip_serie([100.0, 101.0]), seen_at='2021-01-01')
+    PointInTimeGdpStore(str(tmp_path)).record('USA', _bip_serie([100.0, 102.0]), seen_at='2021-06-01')
+    vintages = PointInTimeGdpStore(str(tmp_path)).vintages('USA')
+    assert list(vintages['Wert']) == [100.0, 101.0, 102.0]
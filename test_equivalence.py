@@ -0,0 +1,254 @@
+"""
+Äquivalenzprüfungen der optimierten Kernel gegen die bisherigen Implementierungen (pytest).
+Die Laufzeitmessungen dazu stehen in benchmarks.py; synthetische Daten, Referenz-Implementierungen
+und gemeinsame Fixtures liegen in conftest.py.
+
+Aufruf:
+    python -m pytest -q test_equivalence.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import (synthetic_prices, saisonalitaet_referenz, synthetic_gdp_matrix, synthetic_signals,
+                      cooldown_referenz, cooldown_referenz_numpy, analyse_pipeline, preis_referenz, StaticPriceSource,
+                      bewertungslauf, kurs_cache_laeufe)
+
+
+def test_saisonalitaet_wie_bisherige_schleife(einzel):
+    from signal_analyzer import SignalAnalyzer
+    kernel = SignalAnalyzer().berechne_saisonalitaet(einzel)
+    np.testing.assert_allclose(kernel.to_numpy(), saisonalitaet_referenz(einzel).to_numpy(), rtol=1e-12, atol=1e-15)
+
+
+def test_saisonalitaet_universum_wie_pro_paar():
+    from signal_analyzer import SignalAnalyzer
+    universum = synthetic_prices(n_days=3000, n_pairs=8, seed=1, holiday_share=0.02)
+    matrix = SignalAnalyzer().berechne_saisonalitaet_universum(universum)
+    for ticker in universum.columns:
+        erwartet = saisonalitaet_referenz(universum[[ticker]].dropna().rename(columns={ticker: 'Schlusskurs'}))
+        np.testing.assert_allclose(matrix[ticker].dropna().to_numpy(), erwartet.to_numpy(), rtol=1e-12, atol=1e-15,
+                                   err_msg=ticker)
+
+
+def test_seasonality_state_wie_batch(einzel):
+    from signal_analyzer import SignalAnalyzer, SeasonalityState
+    batch = SignalAnalyzer(config={'SAISONALITAET_MODUS': 'expandierend'}).berechne_saisonalitaet(einzel)
+    zustand = SeasonalityState()
+    inkrementell = [zustand.update(datum, kurs) for datum, kurs in einzel['Schlusskurs'].items()]
+    np.testing.assert_allclose(batch.to_numpy(), inkrementell, rtol=1e-9, atol=1e-15)
+
+
+@pytest.mark.parametrize('granularitaet', ['monat', 'monatstag', 'wochentag'])
+def test_expandierende_saisonalitaet_nach_kalenderjahr(einzel, granularitaet):
+    from signal_analyzer import SignalAnalyzer, granularitaets_schluessel
+    config = {'SAISONALITAET_MODUS': 'expandierend', 'SAISONALITAET_GRANULARITAET': granularitaet}
+    werte = SignalAnalyzer(config=config).berechne_saisonalitaet(einzel)
+    # Referenz: Mittel derselben Gruppe aus früheren Kalenderjahren (auch für Tage wie den 29.12.2014,
+    # die nach ISO schon zu 2015 gehören)
+    returns = einzel['Schlusskurs'].pct_change()
+    gruppen = pd.Series(granularitaets_schluessel(einzel.index, [granularitaet])[granularitaet], index=einzel.index)
+    jahre = pd.Series(einzel.index.year, index=einzel.index)
+    erwartet = [returns[(gruppen == gruppe) & (jahre < jahr)].mean() for gruppe, jahr in zip(gruppen, jahre)]
+    np.testing.assert_allclose(werte.to_numpy(), np.nan_to_num(erwartet), rtol=1e-9, atol=1e-15)
+    if granularitaet == 'monat':
+        assert werte['2014-12-01':'2014-12-31'].nunique() == 1
+
+
+def test_expandierende_saisonalitaet_ohne_look_ahead(einzel):
+    from signal_analyzer import SignalAnalyzer
+    expandierend = SignalAnalyzer(config={'SAISONALITAET_MODUS': 'expandierend'})
+    # Änderungen ab Tag k dürfen Werte vor k nicht beeinflussen
+    k = len(einzel) // 2
+    veraendert = einzel.copy()
+    veraendert.iloc[k:] *= 1.5
+    np.testing.assert_allclose(expandierend.berechne_saisonalitaet(veraendert).to_numpy()[:k],
+                               expandierend.berechne_saisonalitaet(einzel).to_numpy()[:k])
+
+
+@pytest.mark.parametrize('freq', ['B', None])
+@pytest.mark.parametrize('cooldown_days', [1, 5, 30])
+def test_cooldown_wie_bisherige_schleife(freq, cooldown_days):
+    from signal_analyzer import SignalAnalyzer
+    signale = synthetic_signals(20_000, seed=cooldown_days, freq=freq)['Paar0']
+    gefiltert = SignalAnalyzer().apply_signal_cooldown(signale, cooldown_days)
+    assert gefiltert.dtype == np.int8
+    np.testing.assert_array_equal(gefiltert.to_numpy(), cooldown_referenz(signale, cooldown_days).to_numpy())
+
+
+def test_cooldown_panel_wie_einzelne_spalten():
+    from signal_analyzer import SignalAnalyzer
+    panel = synthetic_signals(100_000, n_pairs=4, seed=2, freq='h')
+    zeitstempel = panel.index.values.astype('datetime64[ns]').view(np.int64)
+    gesamt = SignalAnalyzer().apply_signal_cooldown(panel, 5)
+    for spalte in panel.columns:
+        erwartet = cooldown_referenz_numpy(zeitstempel, panel[spalte].to_numpy(), pd.Timedelta(days=5).value)
+        np.testing.assert_array_equal(gesamt[spalte].to_numpy(), erwartet, err_msg=spalte)
+
+
+
+def _assert_panel_wie_paarweise(gdp_matrix, paare):
+    from signal_analyzer import compare_gdp_momentum, compare_gdp_momentum_panel
+    panel = compare_gdp_momentum_panel(gdp_matrix)
+    for a, b in paare:
+        # Paar wie aus get_bip_data: nur Zeilen, in denen eines der beiden Länder Daten hat
+        paar = gdp_matrix[[a, b]].dropna(how='all')
+        erwartet = compare_gdp_momentum(paar[a], paar[b])
+        _, _, differenz, signale = panel.pair(a, b)
+        pd.testing.assert_index_equal(differenz.index, erwartet[2].index)
+        np.testing.assert_allclose(differenz.to_numpy(), erwartet[2].to_numpy(), err_msg=f"{a}/{b}")
+        assert signale.equals(erwartet[3]), f"{a}/{b}"
+
+
+def test_gdp_panel_wie_paarweise(gdp_matrix):
+    laender = list(gdp_matrix.columns)
+    _assert_panel_wie_paarweise(gdp_matrix, [(a, b) for a in laender for b in laender if a != b])
+
+
+def test_gdp_panel_bei_teilweiser_ueberlappung(gdp_matrix):
+    # Länder beginnen bzw. enden zu unterschiedlichen Zeitpunkten
+    teilweise = gdp_matrix.iloc[:, :4].copy()
+    teilweise.iloc[:30, 0] = np.nan
+    teilweise.iloc[70:, 1] = np.nan
+    teilweise.iloc[:10, 2] = np.nan
+    teilweise.iloc[85:, 2] = np.nan
+    laender = list(teilweise.columns)
+    _assert_panel_wie_paarweise(teilweise, [(a, b) for a in laender for b in laender if a != b])
+
+
+def test_gdp_paar_fuellt_kuerzeres_land_an_den_raendern_auf(gdp_matrix):
+    from signal_analyzer import compare_gdp_momentum
+    # Land 1 endet in Zeile 69, Land 2 deckt die Zeilen 10 bis 84 ab: das Paar läuft über beide Zeiträume,
+    # Land 1 wird ab Zeile 70 mit seinem letzten Wert fortgeschrieben (Wachstum dort 0 nach n Quartalen)
+    a, b = gdp_matrix.columns[1], gdp_matrix.columns[2]
+    paar = gdp_matrix[[a, b]].copy()
+    paar.iloc[70:, 0] = np.nan
+    paar.iloc[:10, 1] = np.nan
+    paar.iloc[85:, 1] = np.nan
+    paar = paar.dropna(how='all')
+    momentum_a, _, differenz, _ = compare_gdp_momentum(paar[a], paar[b])
+    assert differenz.index[0] == gdp_matrix.index[4]
+    assert differenz.index[-1] == gdp_matrix.index[84]
+    np.testing.assert_allclose(momentum_a.loc[gdp_matrix.index[74]:].to_numpy(), momentum_a.iloc[-1])
+
+
+def test_schwellen_sweep_wie_einzelaufrufe(gdp_matrix):
+    from signal_analyzer import compare_gdp_momentum, berechne_gdp_momentum_differenz
+    gdp_a, gdp_b = gdp_matrix['Land0'], gdp_matrix['Land1']
+    schwellen = [(long_t, short_t) for long_t in np.linspace(0, 90, 4) for short_t in np.linspace(-90, 0, 4)]
+    sweep = berechne_gdp_momentum_differenz(gdp_a, gdp_b).sweep(schwellen)
+    einzeln = np.column_stack([compare_gdp_momentum(gdp_a, gdp_b, long_threshold=l, short_threshold=k)[3].to_numpy()
+                               for l, k in schwellen])
+    # Referenz direkt aus der Differenz: Short hat bei überlappenden Schwellen Vorrang
+    differenz = compare_gdp_momentum(gdp_a, gdp_b)[2].to_numpy()
+    referenz = np.column_stack([np.where(differenz < k, -1, np.where(differenz > l, 1, 0)) for l, k in schwellen])
+    assert einzeln.dtype == np.int8 and sweep.dtype == np.int8
+    np.testing.assert_array_equal(sweep, referenz)
+    np.testing.assert_array_equal(einzeln, referenz)
+
+def test_richte_signal_aus_wie_merge_asof(gdp_matrix):
+    from signal_analyzer import compare_gdp_momentum, richte_signal_aus
+    signal = compare_gdp_momentum(gdp_matrix['Land0'], gdp_matrix['Land1'], long_threshold=20, short_threshold=-20)[3]
+    tage = pd.bdate_range(signal.index[0] - pd.Timedelta(days=200), signal.index[-1] + pd.Timedelta(days=200))
+    verzug = pd.Timedelta(days=120)
+    ausgerichtet = richte_signal_aus(signal, tage, publikationsverzug=verzug)
+    # Referenz: merge_asof auf die Veröffentlichungsdaten, vor der ersten Veröffentlichung neutral
+    veroeffentlicht = pd.DataFrame({'zeit': signal.index + verzug, 'wert': signal.to_numpy()})
+    erwartet = pd.merge_asof(pd.DataFrame({'zeit': tage}), veroeffentlicht, on='zeit')['wert'].fillna(0).to_numpy(dtype=np.int8)
+    assert ausgerichtet.dtype == np.int8
+    np.testing.assert_array_equal(ausgerichtet.to_numpy(), erwartet)
+
+
+def test_richte_signale_aus_wie_einzelne_paare(gdp_matrix):
+    from signal_analyzer import compare_gdp_momentum_panel, richte_signal_aus, richte_signale_aus
+    laender = list(gdp_matrix.columns[:6])
+    paare = [(a, b) for a in laender for b in laender if a != b]
+    paar_signale = pd.DataFrame({f"{a}/{b}": signale for (a, b), signale
+                                 in compare_gdp_momentum_panel(gdp_matrix).signale_fuer_paare(paare).items()})
+    tage = pd.bdate_range(paar_signale.index[0] - pd.Timedelta(days=200), paar_signale.index[-1] + pd.Timedelta(days=200))
+    # Jedes Paar mit eigenem Verzug
+    verzuege = {spalte: pd.Timedelta(days=90 + 10 * (i % 6)) for i, spalte in enumerate(paar_signale.columns)}
+    alle = richte_signale_aus(paar_signale, tage, publikationsverzug=verzuege)
+    for spalte in paar_signale.columns:
+        erwartet = richte_signal_aus(paar_signale[spalte], tage, publikationsverzug=verzuege[spalte])
+        pd.testing.assert_series_equal(alle[spalte], erwartet.rename(spalte))
+
+
+def test_result_cache_wie_ohne_cache(tmp_path):
+    from result_cache import ResultCache
+    forex_daten = synthetic_prices(n_days=2000).rename(columns={'P0=X': 'Schlusskurs'})
+    gdp_matrix = synthetic_gdp_matrix(n_countries=2)
+    gdp_a, gdp_b = gdp_matrix['Land0'], gdp_matrix['Land1']
+    ohne = analyse_pipeline(None, forex_daten, gdp_a, gdp_b)
+    cache = ResultCache(base_path=str(tmp_path))
+    analyse_pipeline(cache, forex_daten, gdp_a, gdp_b)
+    pd.testing.assert_series_equal(analyse_pipeline(cache, forex_daten, gdp_a, gdp_b), ohne)
+    neu_gestartet = ResultCache(base_path=str(tmp_path)) # leerer Speicher, gleiche Festplattenstufe
+    pd.testing.assert_series_equal(analyse_pipeline(neu_gestartet, forex_daten, gdp_a, gdp_b), ohne)
+    assert neu_gestartet.stats()['disk_hits'] > 0
+
+
+def test_kursabfrage_wie_bisherige_suche():
+    from portfolio_manager import Portfolio
+    frame = synthetic_prices(n_days=2000, seed=7).rename(columns={'P0=X': 'Schlusskurs'})
+    # Kalendertage inkl. Wochenenden und Tage vor dem ersten Kurs
+    tage = pd.date_range(frame.index[0] - pd.Timedelta(days=5), frame.index[-1], freq='D')
+    abfragen = list(tage[np.random.default_rng(7).integers(0, len(tage), 2000)])
+    portfolio = Portfolio(10000.0, StaticPriceSource({'P0=X': frame}), frame.index[0],
+                          frame.index[-1] + pd.Timedelta(days=1), shared_price_cache=None)
+    assert [portfolio.get_current_price('P0=X', tag) for tag in abfragen] == [preis_referenz(frame, tag) for tag in abfragen]
+
+
+def test_inkrementelle_bewertung_wie_vollstaendige():
+    kurse = synthetic_prices(n_days=400, n_pairs=6, seed=8)
+    # Kalendertage: an Wochenenden gilt derselbe Kursindex-Eintrag wie am Freitag
+    tage = [tag.to_pydatetime() for tag in pd.date_range(kurse.index[0], kurse.index[-1], freq='D')]
+    voll, voll_historie = bewertungslauf(kurse, tage, voll_neu=True)
+    inkrementell, historie = bewertungslauf(kurse, tage, voll_neu=False)
+    np.testing.assert_allclose(inkrementell, voll, rtol=1e-12)
+    np.testing.assert_allclose(historie, voll_historie, rtol=1e-12)
+
+
+def test_portfolio_history_wie_liste():
+    from portfolio_manager import PortfolioHistory
+    tage = pd.date_range('1900-01-01', periods=1000, freq='D').asi8.tolist()
+    werte = (10000.0 + np.cumsum(np.random.default_rng(7).normal(0, 10, len(tage)))).tolist()
+    historie = PortfolioHistory(16) # wächst über die Anfangskapazität hinaus
+    for tag, wert in zip(tage, werte):
+        historie.append(tag, wert, wert, 0.0)
+    frame = historie.to_frame()
+    np.testing.assert_array_equal(frame['value'].to_numpy(), werte)
+    np.testing.assert_allclose(frame['drawdown'].to_numpy(), np.asarray(werte) / np.maximum.accumulate(werte) - 1.0)
+
+
+@pytest.fixture(scope='module')
+def kurs_frames():
+    kurse = synthetic_prices(n_days=5000, n_pairs=8, seed=9)
+    return {ticker: kurse[[ticker]].rename(columns={ticker: 'Schlusskurs'}) for ticker in kurse.columns}
+
+
+def test_shared_price_cache_wie_direkter_abruf(kurs_frames):
+    from portfolio_manager import SharedPriceCache, price_source_key
+    _, direkt = kurs_cache_laeufe(StaticPriceSource(kurs_frames), None, n_laeufe=3)
+    cache = SharedPriceCache()
+    quelle = StaticPriceSource(kurs_frames)
+    abrufe, gecacht = kurs_cache_laeufe(quelle, cache, n_laeufe=3)
+    assert gecacht == direkt
+    assert abrufe == len(kurs_frames) # ein Abruf pro Ticker über alle Portfolios
+    # Teilzeitraum aus einem abdeckenden Eintrag
+    teil = cache.get('P0=X', '2005-01-01', '2006-01-01', source=price_source_key(quelle))
+    assert teil is not None
+    np.testing.assert_array_equal(teil[1], kurs_frames['P0=X'].loc['2005-01-01':'2005-12-31', 'Schlusskurs'].to_numpy())
+    # Eine andere Quelle mit demselben Ticker teilt keine Einträge
+    assert cache.get('P0=X', '2005-01-01', '2006-01-01', source=price_source_key(StaticPriceSource(kurs_frames))) is None
+
+
+def test_shared_price_cache_haelt_budget_ein(kurs_frames):
+    from portfolio_manager import SharedPriceCache
+    cache = SharedPriceCache()
+    kurs_cache_laeufe(StaticPriceSource(kurs_frames), cache, n_laeufe=1)
+    knapp = SharedPriceCache(max_bytes=5 * (cache.current_bytes // len(kurs_frames)))
+    kurs_cache_laeufe(StaticPriceSource(kurs_frames), knapp, n_laeufe=1)
+    assert knapp.stats()['entries'] == 5
+    assert knapp.current_bytes <= knapp.max_bytes
+    assert knapp.evictions
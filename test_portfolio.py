@@ -0,0 +1,75 @@
+"""
+Tests des Positionsbuchs und des Transaktionsprotokolls in portfolio_manager.py (pytest).
+
+Aufruf:
+    python -m pytest -q test_portfolio.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_manager import Portfolio, PortfolioHistory, TransactionLog
+from conftest import StaticPriceSource
+
+
+def _ns(datum):
+    return pd.Timestamp(datum).value
+
+
+@pytest.fixture
+def protokoll():
+    log = TransactionLog(capacity=2) # klein, damit die Spalten beim Anhängen wachsen
+    log.append(_ns('2020-01-02'), 'OPEN_LONG', 'EURUSD=X', 100.0, 1.10)
+    log.append(_ns('2020-01-03'), 'OPEN_SHORT', 'JPY=X', 50.0, 110.0)
+    log.append(_ns('2020-02-03'), 'CLOSE_LONG', 'EURUSD=X', 100.0, 1.20, fees=1.0, pnl=10.0)
+    log.append(_ns('2020-02-04'), 'COVER_SHORT', 'JPY=X', 50.0, 100.0, fees=2.5, pnl=500.0)
+    log.append(_ns('2020-03-02'), 'OPEN_LONG', 'EURUSD=X', 10.0, 1.15)
+    return log
+
+
+def test_trade_pnl_nur_schliessende_transaktionen(protokoll):
+    trades = protokoll.trade_pnl()
+    assert list(trades['side']) == ['CLOSE_LONG', 'COVER_SHORT']
+    assert list(trades['ticker']) == ['EURUSD=X', 'JPY=X']
+    assert list(trades['date']) == [pd.Timestamp('2020-02-03'), pd.Timestamp('2020-02-04')]
+    np.testing.assert_allclose(trades['pnl'], [10.0, 500.0])
+    np.testing.assert_allclose(trades['net_pnl'], [9.0, 497.5]) # nach Gebühren
+    assert list(trades.index) == [0, 1]
+
+
+def test_trade_pnl_pro_ticker(protokoll):
+    trades = protokoll.trade_pnl('JPY=X')
+    assert list(trades['ticker']) == ['JPY=X']
+    np.testing.assert_allclose(trades['net_pnl'], [497.5])
+    assert protokoll.trade_pnl('GBPUSD=X').empty # unbekannter Ticker
+
+
+def test_trade_pnl_aus_portfolio_trades():
+    index = pd.bdate_range('2020-01-01', periods=4, name='Datum')
+    kurse = {'EURUSD=X': pd.DataFrame({'Schlusskurs': [1.0, 1.1, 1.2, 1.3]}, index=index),
+             'JPY=X': pd.DataFrame({'Schlusskurs': [100.0, 90.0, 80.0, 70.0]}, index=index)}
+    portfolio = Portfolio(10000.0, StaticPriceSource(kurse), index[0], index[-1] + pd.Timedelta(days=1),
+                          shared_price_cache=None)
+    portfolio.open_long_position('EURUSD=X', 1000.0, index[0]) # 1000 Stück zu 1.0
+    portfolio.close_long_position('EURUSD=X', index[2]) # zu 1.2
+    portfolio.open_short_position('JPY=X', 900.0, index[1]) # 10 Stück zu 90
+    portfolio.cover_short_position('JPY=X', index[3], 4.0) # 4 Stück zu 70
+
+    trades = portfolio.transactions.trade_pnl()
+    assert list(trades['side']) == ['CLOSE_LONG', 'COVER_SHORT']
+    np.testing.assert_allclose(trades['pnl'], [200.0, 80.0])
+    np.testing.assert_allclose(trades['shares'], [1000.0, 4.0])
+    assert len(portfolio.transactions) == 4
+
+
+@pytest.mark.skipif(int(pd.__version__.split('.')[0]) < 2, reason="ältere pandas-Versionen kopieren die float-Spalten")
+def test_verlaufs_frame_ohne_kopie():
+    historie = PortfolioHistory(capacity=8)
+    for tag, wert in enumerate([100.0, 110.0, 99.0]):
+        historie.append(_ns('2020-01-01') + tag * 86_400 * 10**9, wert, wert / 2, wert / 4)
+    frame = historie.to_frame()
+    for name in PortfolioHistory.COLUMNS:
+        assert np.shares_memory(frame[name].to_numpy(), historie.column(name)), name
+    np.testing.assert_allclose(frame['drawdown'], [0.0, 0.0, 99.0 / 110.0 - 1.0])
+    with pytest.raises(ValueError):
+        historie.column('value')[0] = 0.0 # Puffer sind nach außen schreibgeschützt